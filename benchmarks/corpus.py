@@ -0,0 +1,137 @@
+"""Páginas de detalle de prueba y corpus sintéticos para los benchmarks."""
+
+import os
+import re
+
+MOCK_HTML_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "tests", "mock_html")
+)
+
+# Fixtures de tests/mock_html, una por tipo de anuncio
+FIXTURES = [
+    ("Colones", "Colones/Colones_Example.html"),
+    ("Dollars", "Dollars/Dollars_Example.html"),
+    ("Dollars_EV", "Dollars_EV/Dollars_example.html"),
+    ("Sale", "Sale/Sale_example.html"),
+]
+
+# Marcas del formulario de búsqueda de crautos.com, en el orden del sitio
+BRANDS = [
+    "Acura",
+    "Alfa Romeo",
+    "Asia",
+    "Aston Martin",
+    "Audi",
+    "BAIC",
+    "Bentley",
+    "BMW",
+    "Buick",
+    "BYD",
+    "Cadillac",
+    "Changan",
+    "Chery",
+    "Chevrolet",
+    "Chrysler",
+    "Citroen",
+    "Daewoo",
+    "Daihatsu",
+    "Dodge",
+    "Dongfeng",
+    "Ferrari",
+    "Fiat",
+    "Ford",
+    "Foton",
+    "Freightliner",
+    "GAC",
+    "Geely",
+    "Genesis",
+    "GMC",
+    "Great Wall",
+    "Haval",
+    "Hino",
+    "Honda",
+    "Hummer",
+    "Hyundai",
+    "Infiniti",
+    "International",
+    "Isuzu",
+    "Iveco",
+    "JAC",
+    "Jaguar",
+    "Jeep",
+    "Jetour",
+    "JMC",
+    "Kenworth",
+    "Kia",
+    "Lada",
+    "Lamborghini",
+    "Land Rover",
+    "Lexus",
+    "Lincoln",
+    "Mack",
+    "Mahindra",
+    "Maserati",
+    "Maxus",
+    "Mazda",
+    "McLaren",
+    "Mercedes Benz",
+    "Mercury",
+    "MG",
+    "Mini",
+    "Mitsubishi",
+    "Nissan",
+    "Opel",
+    "Peugeot",
+    "Porsche",
+    "RAM",
+    "Renault",
+    "Rolls Royce",
+    "Rover",
+    "Saab",
+    "Samsung",
+    "Scania",
+    "Seat",
+    "Skoda",
+    "SsangYong",
+    "Subaru",
+    "Suzuki",
+    "Tesla",
+    "Toyota",
+    "Volkswagen",
+    "Volvo",
+    "Zotye",
+]
+
+BODY_TAG = re.compile(r"<body[^>]*>", re.IGNORECASE)
+
+FILLER_BLOCK = (
+    '<div class="row"><table class="table"><tr><td>Extra {index}</td>'
+    "<td>Valor {index}</td></tr></table><p>Texto de relleno {index}</p></div>"
+)
+
+
+def load_fixture_pages():
+    """Devolver (nombre, html) de cada fixture de tests/mock_html."""
+    pages = []
+    for name, relative_path in FIXTURES:
+        with open(os.path.join(MOCK_HTML_DIR, relative_path), encoding="utf-8") as file:
+            pages.append((name, file.read()))
+    return pages
+
+
+def scale_corpus(pages, size):
+    """Repetir las páginas hasta tener size, cada copia con un contenido distinto."""
+    scaled = []
+    for index in range(size):
+        name, html = pages[index % len(pages)]
+        scaled.append((f"{name}-{index}", f"{html}<!-- copia {index} -->"))
+    return scaled
+
+
+def inflate_page(html, blocks):
+    """Agregar blocks bloques de relleno al inicio del body para agrandar el DOM."""
+    filler = "".join(FILLER_BLOCK.format(index=index) for index in range(blocks))
+    match = BODY_TAG.search(html)
+    if match is None:
+        return filler + html
+    return html[: match.end()] + filler + html[match.end() :]
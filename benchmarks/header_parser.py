@@ -0,0 +1,121 @@
+"""Comparar el análisis del encabezado anterior con HeaderParser.
+
+Uso: python benchmarks/header_parser.py [--repeat N] [--number N]
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bs4 import BeautifulSoup
+
+from corpus import BRANDS, load_fixture_pages
+from vehicle_parser import (
+    COLONES_PRICE_PATTERN,
+    DOLARES_PRICE_PATTERN,
+    element_text,
+    get_header_parser,
+)
+
+
+def legacy_find_price(price_texts, pattern):
+    lowest_price = None
+    for text in price_texts:
+        for match in re.findall(pattern, text.strip()):
+            price = int(match.replace(",", ""))
+            if lowest_price is None or price < lowest_price:
+                lowest_price = price
+    return lowest_price
+
+
+def legacy_parse_brand_model_year(brand_model_year, brands):
+    vehicle_details = {}
+    for brand in brands:
+        if brand_model_year.startswith(brand):
+            vehicle_details["Marca"] = brand
+            year = next(
+                (
+                    word
+                    for word in brand_model_year.split()
+                    if word.isdigit() and 1900 <= int(word) <= 2050
+                ),
+                None,
+            )
+            if year:
+                vehicle_details["Año"] = year
+                remaining_text = brand_model_year[len(brand) :].strip()
+                vehicle_details["Modelo"] = remaining_text.replace(year, "").strip()
+            break
+    return vehicle_details
+
+
+def legacy_parse(h1_texts, h3_texts, brands):
+    """Camino anterior: marcas en orden, patrones sin compilar y una pasada
+    por moneda."""
+    vehicle_details = {}
+    if h1_texts:
+        vehicle_details.update(legacy_parse_brand_model_year(h1_texts[0], brands))
+
+    price_texts = h1_texts + h3_texts
+    price_colones = legacy_find_price(price_texts, COLONES_PRICE_PATTERN)
+    if price_colones is not None:
+        vehicle_details["PrecioColones"] = price_colones
+    price_dolares = legacy_find_price(price_texts, DOLARES_PRICE_PATTERN)
+    if price_dolares is not None:
+        vehicle_details["PrecioDolares"] = price_dolares
+    return vehicle_details
+
+
+def load_headers():
+    headers = []
+    for _, html in load_fixture_pages():
+        header_element = BeautifulSoup(html, "html.parser").select_one(".carheader")
+        if header_element is None:
+            continue
+        headers.append(
+            (
+                [element_text(element) for element in header_element("h1")],
+                [element_text(element) for element in header_element("h3")],
+            )
+        )
+    return headers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    headers = load_headers()
+    header_parser = get_header_parser(BRANDS)
+
+    for h1_texts, h3_texts in headers:
+        assert legacy_parse(h1_texts, h3_texts, BRANDS) == header_parser.parse(
+            h1_texts, h3_texts
+        ), h1_texts
+
+    def run_legacy():
+        for h1_texts, h3_texts in headers:
+            legacy_parse(h1_texts, h3_texts, BRANDS)
+
+    def run_header_parser():
+        for h1_texts, h3_texts in headers:
+            header_parser.parse(h1_texts, h3_texts)
+
+    parsed = len(headers) * args.number
+    results = {}
+    for name, function in (("legacy", run_legacy), ("trie", run_header_parser)):
+        best = min(timeit.repeat(function, repeat=args.repeat, number=args.number))
+        results[name] = best
+        print(f"{name:>8}: {best / parsed * 1e6:8.2f} µs per header")
+
+    print(f"Speedup: {results['legacy'] / results['trie']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Benchmark del análisis de páginas de detalle sin navegador ni red.
+
+Recorre las fixtures de tests/mock_html y corpus sintéticos más grandes,
+mide páginas por segundo, tiempo por etapa y memoria máxima, y compara el
+resultado con la línea base guardada.
+
+Uso:
+    python benchmarks/parser_suite.py                  # medir y comparar
+    python benchmarks/parser_suite.py --save-baseline  # guardar la línea base
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bs4 import BeautifulSoup
+
+from corpus import BRANDS, inflate_page, load_fixture_pages, scale_corpus
+from vehicle_parser import parse_fields_table, parse_header_element, parse_vehicle_html
+
+BASELINE_PATH = os.path.join(
+    os.path.dirname(__file__), "baselines", "parser_suite.json"
+)
+
+# Una corrida es una regresión si es más lenta o usa más memoria que la
+# línea base por encima de esta fracción
+REGRESSION_TOLERANCE = 0.25
+
+SCALED_CORPUS_SIZE = 40
+INFLATED_BLOCKS = 500
+
+STAGES = ("soup", "header", "fields")
+
+
+def build_corpora(scaled_size=SCALED_CORPUS_SIZE, inflated_blocks=INFLATED_BLOCKS):
+    fixtures = load_fixture_pages()
+    return {
+        "fixtures": fixtures,
+        f"scaled_x{scaled_size}": scale_corpus(fixtures, scaled_size),
+        f"inflated_dom_{inflated_blocks}": [
+            (name, inflate_page(html, inflated_blocks)) for name, html in fixtures
+        ],
+    }
+
+
+def parse_page_by_stage(html, brands, stage_seconds):
+    """Mismo camino que parse_vehicle_html, cronometrando cada etapa."""
+    start = time.perf_counter()
+    soup = BeautifulSoup(html, "html.parser")
+    parsed = time.perf_counter()
+
+    vehicle_details = {}
+    header_element = soup.select_one(".carheader")
+    if header_element is not None:
+        vehicle_details.update(parse_header_element(header_element, brands))
+    header_done = time.perf_counter()
+
+    vehicle_details.update(parse_fields_table(soup))
+    fields_done = time.perf_counter()
+
+    stage_seconds["soup"] += parsed - start
+    stage_seconds["header"] += header_done - parsed
+    stage_seconds["fields"] += fields_done - header_done
+    return vehicle_details
+
+
+def calibrate(loops=200_000):
+    """Segundos de un ciclo fijo de Python, para comparar entre máquinas."""
+    start = time.perf_counter()
+    total = 0
+    for index in range(loops):
+        total += index % 7
+    return time.perf_counter() - start
+
+
+def run_corpus(pages, brands=BRANDS, repeat=3):
+    """Medir un corpus y devolver páginas por segundo, etapas y memoria."""
+    # Los resultados por etapa deben coincidir con el camino real
+    for name, html in pages[:4]:
+        stage_seconds = dict.fromkeys(STAGES, 0.0)
+        assert parse_page_by_stage(html, brands, stage_seconds) == parse_vehicle_html(
+            html, brands
+        ), name
+
+    best = None
+    for _ in range(repeat):
+        stage_seconds = dict.fromkeys(STAGES, 0.0)
+        start = time.perf_counter()
+        for _, html in pages:
+            parse_page_by_stage(html, brands, stage_seconds)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, stage_seconds)
+
+    # Memoria máxima de analizar una página, sin la basura de las anteriores
+    peak = 0
+    tracemalloc.start()
+    for _, html in pages:
+        gc.collect()
+        tracemalloc.reset_peak()
+        parse_vehicle_html(html, brands)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    elapsed, stage_seconds = best
+    return {
+        "pages": len(pages),
+        "seconds": round(elapsed, 6),
+        "pages_per_second": round(len(pages) / elapsed, 3),
+        "stage_seconds": {
+            stage: round(seconds, 6) for stage, seconds in stage_seconds.items()
+        },
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_suite(corpora=None, repeat=3):
+    corpora = build_corpora() if corpora is None else corpora
+    return {
+        "python": platform.python_version(),
+        "calibration_seconds": round(min(calibrate() for _ in range(3)), 6),
+        "corpora": {
+            name: run_corpus(pages, repeat=repeat) for name, pages in corpora.items()
+        },
+    }
+
+
+def find_regressions(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Comparar con la línea base y devolver un mensaje por regresión.
+
+    El ritmo se normaliza con la calibración de cada corrida para que una
+    máquina más lenta no cuente como regresión.
+    """
+    speed_factor = results["calibration_seconds"] / baseline["calibration_seconds"]
+    regressions = []
+    for name, result in results["corpora"].items():
+        expected = baseline["corpora"].get(name)
+        if expected is None:
+            continue
+
+        normalized_rate = result["pages_per_second"] * speed_factor
+        if normalized_rate < expected["pages_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {normalized_rate:.1f} pages/s (normalized) "
+                f"vs baseline {expected['pages_per_second']:.1f}"
+            )
+        if result["peak_memory_bytes"] > expected["peak_memory_bytes"] * (
+            1 + tolerance
+        ):
+            regressions.append(
+                f"{name}: peak memory {result['peak_memory_bytes']} bytes "
+                f"vs baseline {expected['peak_memory_bytes']}"
+            )
+    return regressions
+
+
+def print_results(results):
+    for name, result in results["corpora"].items():
+        stages = ", ".join(
+            f"{stage} {seconds * 1000:.1f}ms"
+            for stage, seconds in result["stage_seconds"].items()
+        )
+        print(
+            f"{name:>20}: {result['pages']:>4} pages, "
+            f"{result['pages_per_second']:8.1f} pages/s, "
+            f"peak {result['peak_memory_bytes'] / 1024 / 1024:6.1f} MiB ({stages})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Write the results as the new baseline instead of comparing.",
+    )
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = run_suite(repeat=args.repeat)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+        print(f"Baseline saved to {args.baseline}.")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline.")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import logging
+import os
+import shutil
+import tempfile
+
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+FULL_PROFILE = "full"
+LEAN_PROFILE = "lean"
+PROFILES = (FULL_PROFILE, LEAN_PROFILE)
+
+# Recursos que el scrapper no necesita para leer los datos del vehículo
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.css",
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.svg",
+    "*.ico",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.mp4",
+    "*.webm",
+]
+
+# Dominios de terceros (anuncios, analítica, redes sociales y fuentes)
+BLOCKED_THIRD_PARTY_HOSTS = [
+    "googletagmanager.com",
+    "google-analytics.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "adservice.google.com",
+    "facebook.net",
+    "facebook.com",
+    "fonts.googleapis.com",
+    "fonts.gstatic.com",
+    "hotjar.com",
+]
+
+BROWSER_CACHE_DIR = os.path.join(tempfile.gettempdir(), "crautos_browser_cache")
+BROWSER_CACHE_SIZE = 32 * 1024 * 1024
+
+
+def blocked_url_patterns():
+    return BLOCKED_RESOURCE_PATTERNS + [
+        f"*{host}*" for host in BLOCKED_THIRD_PARTY_HOSTS
+    ]
+
+
+def browser_cache_dir():
+    # Un directorio por navegador: las instancias en paralelo no comparten caché
+    os.makedirs(BROWSER_CACHE_DIR, exist_ok=True)
+    return tempfile.mkdtemp(prefix="profile_", dir=BROWSER_CACHE_DIR)
+
+
+def remove_browser_cache_dir(cache_dir):
+    if cache_dir is not None:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def remove_browser_cache(driver):
+    """Borrar el directorio de caché de un navegador que ya se cerró."""
+    remove_browser_cache_dir(getattr(driver, "browser_cache_dir", None))
+
+
+def configure_chromium_options(options, profile=FULL_PROFILE, cache_dir=None):
+    """Ajustar las opciones de Chrome o Edge al perfil de navegación elegido."""
+    if profile != LEAN_PROFILE:
+        return options
+
+    options.add_argument("--headless=new")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--mute-audio")
+    options.add_argument("--autoplay-policy=user-gesture-required")
+    options.add_argument(f"--disk-cache-dir={cache_dir or browser_cache_dir()}")
+    options.add_argument(f"--disk-cache-size={BROWSER_CACHE_SIZE}")
+    options.add_experimental_option(
+        "prefs",
+        {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+            "profile.managed_default_content_settings.media_stream": 2,
+            "profile.managed_default_content_settings.notifications": 2,
+        },
+    )
+    # No esperar imágenes ni subrecursos: el DOM listo basta para leer la página
+    options.page_load_strategy = "eager"
+    return options
+
+
+def configure_firefox_options(options, profile=FULL_PROFILE, cache_dir=None):
+    """Ajustar las opciones de Firefox al perfil de navegación elegido."""
+    if profile != LEAN_PROFILE:
+        return options
+
+    options.add_argument("-headless")
+    options.set_preference("permissions.default.image", 2)
+    options.set_preference("permissions.default.stylesheet", 2)
+    options.set_preference("media.autoplay.default", 5)
+    options.set_preference("gfx.downloadable_fonts.enabled", False)
+    # Firefox no admite bloquear URLs por patrón desde Selenium; la
+    # protección contra rastreo bloquea los anuncios y la analítica
+    options.set_preference("privacy.trackingprotection.enabled", True)
+    options.set_preference(
+        "browser.cache.disk.parent_directory", cache_dir or browser_cache_dir()
+    )
+    options.set_preference("browser.cache.disk.smart_size.enabled", False)
+    options.set_preference("browser.cache.disk.capacity", BROWSER_CACHE_SIZE // 1024)
+    options.page_load_strategy = "eager"
+    return options
+
+
+def block_resources(driver, profile=FULL_PROFILE):
+    """Bloquear en Chrome o Edge las peticiones que el perfil descarta."""
+    if profile != LEAN_PROFILE:
+        return
+
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd(
+            "Network.setBlockedURLs", {"urls": blocked_url_patterns()}
+        )
+    except WebDriverException as e:
+        logger.warning(f"Could not block resources in the browser: {e}")
@@ -0,0 +1,148 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def save_checkpoint(path, state):
+    """Guardar el estado del recorrido de forma atómica."""
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=directory, prefix=".checkpoint-", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+            json.dump(state, file, ensure_ascii=False, indent=2)
+            file.flush()
+            os.fsync(file.fileno())
+        # Reemplazar de una sola vez para no dejar nunca un archivo a medias
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def load_checkpoint(path):
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not read checkpoint {path}: {e}")
+        return None
+
+
+class CrawlState:
+    """Estado de un recorrido en curso, persistido para poder reanudarlo."""
+
+    def __init__(self, path, save_interval=5):
+        self.path = path
+        self.save_interval = save_interval
+        self.total_pages = None
+        self.started_at = None
+        self._completed_pages = set()
+        self._in_flight_urls = set()
+        self._seen_urls = set()
+        self._last_save = 0
+        self._lock = threading.Lock()
+        # Serializa las escrituras sin bloquear a quien solo actualiza el estado
+        self._save_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path, save_interval=5):
+        """Devolver el estado guardado en path o None si no hay un recorrido pendiente."""
+        checkpoint = load_checkpoint(path)
+        if checkpoint is None:
+            return None
+
+        state = cls(path, save_interval)
+        state.total_pages = checkpoint["total_pages"]
+        state.started_at = checkpoint["started_at"]
+        state._completed_pages = set(checkpoint["completed_pages"])
+        state._in_flight_urls = set(checkpoint["in_flight_urls"])
+        state._seen_urls = set(checkpoint["seen_urls"])
+        return state
+
+    def start(self, total_pages):
+        with self._lock:
+            if self.started_at is None:
+                self.started_at = datetime.now().isoformat(timespec="seconds")
+            self.total_pages = total_pages
+        self.save(force=True)
+
+    def pending_pages(self):
+        with self._lock:
+            return [
+                page
+                for page in range(1, self.total_pages + 1)
+                if page not in self._completed_pages
+            ]
+
+    def completed_pages(self):
+        with self._lock:
+            return len(self._completed_pages)
+
+    def in_flight_urls(self):
+        with self._lock:
+            return sorted(self._in_flight_urls)
+
+    def seen_urls(self):
+        with self._lock:
+            return list(self._seen_urls)
+
+    def mark_page_done(self, page):
+        with self._lock:
+            self._completed_pages.add(page)
+        self.save()
+
+    def add_in_flight(self, url):
+        with self._lock:
+            self._in_flight_urls.add(url)
+        self.save()
+
+    def remove_in_flight(self, url):
+        with self._lock:
+            self._in_flight_urls.discard(url)
+        self.save()
+
+    def add_seen(self, url):
+        with self._lock:
+            self._seen_urls.add(url)
+
+    def save(self, force=False):
+        # Si otro hilo ya está guardando, un guardado no forzado se omite
+        if not self._save_lock.acquire(blocking=force):
+            return
+        try:
+            with self._lock:
+                now = time.monotonic()
+                if not force and now - self._last_save < self.save_interval:
+                    return
+                self._last_save = now
+                state = {
+                    "started_at": self.started_at,
+                    "total_pages": self.total_pages,
+                    "completed_pages": list(self._completed_pages),
+                    "in_flight_urls": list(self._in_flight_urls),
+                    "seen_urls": list(self._seen_urls),
+                }
+
+            # Ordenar y escribir fuera de _lock: la escritura crece con los
+            # URLs vistos y no debe frenar a los workers
+            for key in ("completed_pages", "in_flight_urls", "seen_urls"):
+                state[key].sort()
+            save_checkpoint(self.path, state)
+        finally:
+            self._save_lock.release()
+
+    def finish(self):
+        # El recorrido terminó: no hay nada que reanudar
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
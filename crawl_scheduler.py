@@ -0,0 +1,141 @@
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def split_page_ranges(total_pages, chunk_size):
+    """Dividir las páginas 1..total_pages en rangos contiguos de chunk_size páginas."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    return [
+        (first, min(first + chunk_size - 1, total_pages))
+        for first in range(1, total_pages + 1, chunk_size)
+    ]
+
+
+def split_pages(pages, chunk_size):
+    """Agrupar páginas sueltas en rangos contiguos de a lo sumo chunk_size páginas."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    ranges = []
+    for page in sorted(pages):
+        if ranges:
+            first, last = ranges[-1]
+            if page == last + 1 and page - first < chunk_size:
+                ranges[-1] = (first, page)
+                continue
+        ranges.append((page, page))
+    return ranges
+
+
+class PageRangeQueue:
+    """Cola segura entre hilos que reparte rangos de páginas a los workers."""
+
+    def __init__(self, total_pages, chunk_size, pages=None, max_attempts=3):
+        self.total_pages = total_pages
+        self.max_attempts = max_attempts
+        self.failed = []
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._ranges = queue.Queue()
+
+        if pages is None:
+            page_ranges = split_page_ranges(total_pages, chunk_size)
+        else:
+            # Reanudar solo las páginas que quedaron pendientes
+            page_ranges = split_pages(pages, chunk_size)
+
+        for page_range in page_ranges:
+            self._ranges.put(page_range)
+
+    def get(self):
+        try:
+            return self._ranges.get_nowait()
+        except queue.Empty:
+            return None
+
+    def put_back(self, first, last):
+        # Devolver a la cola lo que un worker no alcanzó a procesar
+        with self._lock:
+            attempts = self._attempts.get(first, 0) + 1
+            self._attempts[first] = attempts
+            if attempts >= self.max_attempts:
+                logger.error(
+                    f"Giving up on pages {first}-{last} after {attempts} attempts."
+                )
+                self.failed.append((first, last))
+                return
+
+        logger.info(f"Re-queuing pages {first}-{last}.")
+        self._ranges.put((first, last))
+
+    def pending(self):
+        return self._ranges.qsize()
+
+    def drop_after(self, page):
+        # Descartar los rangos posteriores a page; se conservan los anteriores
+        kept = []
+        while True:
+            try:
+                first, last = self._ranges.get_nowait()
+            except queue.Empty:
+                break
+            if first <= page:
+                kept.append((first, min(last, page)))
+
+        for page_range in kept:
+            self._ranges.put(page_range)
+
+
+class KnownPagesStop:
+    """Detecta cuándo el recorrido incremental solo encuentra páginas conocidas."""
+
+    def __init__(self, max_known_pages):
+        self.max_known_pages = max_known_pages
+        self.stop_page = None
+        self._new_vehicles = {}
+        self._lock = threading.Lock()
+
+    def record_page(self, page, new_vehicles):
+        """Registrar una página y devolver True si ya se debe dejar de paginar."""
+        with self._lock:
+            self._new_vehicles[page] = new_vehicles
+            if self.stop_page is None and new_vehicles == 0:
+                first = page
+                while self._new_vehicles.get(first - 1) == 0:
+                    first -= 1
+                last = page
+                while self._new_vehicles.get(last + 1) == 0:
+                    last += 1
+
+                if last - first + 1 >= self.max_known_pages:
+                    self.stop_page = first + self.max_known_pages - 1
+                    logger.info(
+                        f"Pages {first}-{self.stop_page} had no new vehicles. "
+                        "Stopping the incremental crawl."
+                    )
+            return self.stop_page is not None
+
+    def total_new_vehicles(self):
+        with self._lock:
+            return sum(self._new_vehicles.values())
+
+    def should_skip(self, page):
+        with self._lock:
+            return self.stop_page is not None and page > self.stop_page
+
+
+def run_workers(target, workers_args, name="CrawlWorker"):
+    threads = []
+
+    for index, args in enumerate(workers_args):
+        thread = threading.Thread(target=target, args=args, name=f"{name}-{index}")
+        thread.start()
+        threads.append(thread)
+
+    for thread in threads:
+        thread.join()
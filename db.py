@@ -0,0 +1,555 @@
+import atexit
+import json
+import logging
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import pyodbc
+except ImportError:
+    pyodbc = None
+
+from run_metrics import DB_WRITE, timed
+
+
+SQL_SERVER_CONNECTION = {
+    "driver": "SQL Server",
+    "server": "FABIAN\\SQLEXPRESS",
+    "database": "CRAutos",
+    "trusted_connection": "yes",
+}
+
+DB_POOL_SIZE = 4
+
+# Vehículos por INSERT en lote y segundos máximos que un vehículo espera en memoria
+DB_BATCH_SIZE = 100
+DB_FLUSH_INTERVAL = 30
+
+
+class PoolTimeoutError(Exception):
+    """El pool no entregó una conexión dentro del tiempo de espera."""
+
+
+if pyodbc is not None:
+    DATABASE_ERRORS = (pyodbc.Error, sqlite3.Error, PoolTimeoutError)
+    INTEGRITY_ERRORS = (pyodbc.IntegrityError, sqlite3.IntegrityError)
+else:
+    DATABASE_ERRORS = (sqlite3.Error, PoolTimeoutError)
+    INTEGRITY_ERRORS = (sqlite3.IntegrityError,)
+
+# Columnas de la tabla Cars y la llave correspondiente en el diccionario del vehículo
+CAR_COLUMNS = [
+    ("Brand", "Marca"),
+    ("Model", "Modelo"),
+    ("Year", "Año"),
+    ("PriceColones", "PrecioColones"),
+    ("PriceDollars", "PrecioDolares"),
+    ("EngineCapacity", "Cilindrada"),
+    ("BateryRange", "Autonomía"),
+    ("BateryCapacity", "Batería"),
+    ("Style", "Estilo"),
+    ("Passengers", "# de pasajeros"),
+    ("FuelType", "Combustible"),
+    ("Transmission", "Transmisión"),
+    ("Condition", "Estado"),
+    ("Mileage", "Kilometraje"),
+    ("ExteriorColor", "Color exterior"),
+    ("InteriorColor", "Color interior"),
+    ("Doors", "# de puertas"),
+    ("TaxesPaid", "Ya pagó impuestos"),
+    ("NegotiablePrice", "Precio negociable"),
+    ("AcceptsVehicle", "Se recibe vehículo"),
+    ("Province", "Provincia"),
+    ("Notes", "Notas"),
+    ("DateEntered", "Fecha de ingreso"),
+    ("DateExited", "Fecha de salida"),
+    ("URL", "URL"),
+]
+
+INSERT_CAR_QUERY = "INSERT INTO Cars ({}) VALUES ({})".format(
+    ", ".join(column for column, _ in CAR_COLUMNS),
+    ", ".join("?" for _ in CAR_COLUMNS),
+)
+
+# Columnas que se reescriben al volver a analizar una página guardada. Los
+# precios de Cars son los de la primera vez que se vio el vehículo (los
+# cambios van a CarPriceHistory) y la fecha de salida no sale de la página
+REPARSED_CAR_COLUMNS = [
+    (column, key)
+    for column, key in CAR_COLUMNS
+    if column not in ("PriceColones", "PriceDollars", "DateExited", "URL")
+]
+
+UPDATE_CAR_QUERY = "UPDATE Cars SET {} WHERE URL = ?".format(
+    ", ".join(f"{column} = ?" for column, _ in REPARSED_CAR_COLUMNS)
+)
+
+logger = logging.getLogger(__name__)
+
+
+def connect_sql_server():
+    if pyodbc is None:
+        raise RuntimeError("pyodbc is required to connect to SQL Server.")
+    return pyodbc.connect(**SQL_SERVER_CONNECTION)
+
+
+class ConnectionPool:
+    """Pool de conexiones reutilizables y seguro entre hilos."""
+
+    def __init__(self, connect=connect_sql_server, size=DB_POOL_SIZE, timeout=30):
+        self._connect = connect
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            # Así los llamadores lo tratan como cualquier otro error de la base
+            raise PoolTimeoutError(
+                f"No database connection was free after {self.timeout} seconds."
+            ) from None
+
+    def _discard(self, conn):
+        with self._lock:
+            self._created -= 1
+        try:
+            conn.close()
+        except DATABASE_ERRORS:
+            pass
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        except DATABASE_ERRORS:
+            # La conexión puede haber quedado inutilizable: no devolverla al pool
+            self._discard(conn)
+            raise
+        except BaseException:
+            conn.rollback()
+            self._idle.put(conn)
+            raise
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def cursor(self):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            finally:
+                cursor.close()
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def init_pool(connect=connect_sql_server, size=DB_POOL_SIZE):
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = ConnectionPool(connect, size)
+    return _pool
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def vehicle_exists(url):
+    try:
+        with get_pool().cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM Cars WHERE URL = ?", (url,))
+            return cursor.fetchone()[0] > 0
+    except DATABASE_ERRORS as e:
+        logger.error(f"Error connecting to the database: {e}")
+        return False
+
+
+def save_vehicle_details(vehicle_details):
+    try:
+        with get_pool().cursor() as cursor:
+            cursor.execute(INSERT_CAR_QUERY, car_row(vehicle_details))
+    except DATABASE_ERRORS as e:
+        logger.error(f"Error connecting to the database: {e}")
+
+
+def car_row(vehicle_details, columns=CAR_COLUMNS):
+    return tuple(
+        # Usar un string vacío si "Notas" no está presente
+        vehicle_details.get(key, "" if key == "Notas" else None)
+        for _, key in columns
+    )
+
+
+class BatchWriter:
+    """Acumula filas en memoria y las inserta en lotes con executemany.
+
+    Si un lote falla se inserta fila por fila y lo que no se pudo guardar se
+    escribe en spill_path para reinsertarlo después. Un hilo guarda lo
+    pendiente cada flush_interval segundos.
+    """
+
+    query = None
+    columns = ()
+    # Posición del URL en la fila, para los mensajes de error
+    url_index = -1
+    noun = "rows"
+    saved_metric = "rows_saved"
+
+    def __init__(
+        self,
+        pool=None,
+        batch_size=DB_BATCH_SIZE,
+        flush_interval=DB_FLUSH_INTERVAL,
+        spill_path=None,
+        metrics=None,
+    ):
+        self._pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self.metrics = metrics
+        self.saved = 0
+
+        self._buffer = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+
+        self._thread = threading.Thread(
+            target=self._flush_periodically, name=type(self).__name__, daemon=True
+        )
+        self._thread.start()
+
+        # Si el proceso termina sin cerrar el writer, no perder lo pendiente
+        atexit.register(self.close)
+
+    def _add_row(self, row):
+        with self._buffer_lock:
+            self._buffer.append(row)
+            is_full = len(self._buffer) >= self.batch_size
+
+        if is_full:
+            self.flush()
+
+    def pending(self):
+        with self._buffer_lock:
+            return len(self._buffer)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._buffer_lock:
+                rows, self._buffer = self._buffer, []
+
+            if not rows:
+                return
+
+            saved = self.saved
+            with timed(self.metrics, DB_WRITE):
+                try:
+                    self._insert_many(rows)
+                    self.saved += len(rows)
+                    logger.info(f"Saved a batch of {len(rows)} {self.noun}.")
+                except DATABASE_ERRORS as e:
+                    logger.warning(
+                        f"Batch insert of {len(rows)} {self.noun} failed: {e}. Inserting one by one."
+                    )
+                    self._insert_one_by_one(rows)
+                except Exception as e:
+                    # El lote ya salió del buffer, así que se guarda en disco
+                    logger.error(f"Batch insert of {len(rows)} {self.noun} failed: {e}")
+                    self._spill(rows)
+            if self.metrics is not None:
+                self.metrics.count(self.saved_metric, self.saved - saved)
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+        logger.info(f"{type(self).__name__} closed. {self.saved} {self.noun} saved.")
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                # Un error no debe detener los guardados automáticos
+                logger.error(f"Periodic flush of the {self.noun} buffer failed: {e}")
+
+    def _insert_many(self, rows):
+        with (self._pool or get_pool()).cursor() as cursor:
+            if hasattr(cursor, "fast_executemany"):
+                cursor.fast_executemany = True
+            cursor.executemany(self.query, rows)
+
+    def _insert_one_by_one(self, rows):
+        unsaved_rows = []
+
+        for row in rows:
+            try:
+                with (self._pool or get_pool()).cursor() as cursor:
+                    cursor.execute(self.query, row)
+                self.saved += 1
+            except INTEGRITY_ERRORS as e:
+                logger.error(f"Row for {row[self.url_index]} was not saved: {e}")
+            except DATABASE_ERRORS as e:
+                logger.error(f"Error connecting to the database: {e}")
+                unsaved_rows.append(row)
+            except Exception as e:
+                logger.error(
+                    f"Row for {row[self.url_index]} could not be inserted: {e}"
+                )
+                unsaved_rows.append(row)
+
+        if unsaved_rows:
+            self._spill(unsaved_rows)
+
+    def _spill(self, rows):
+        if self.spill_path is None:
+            logger.error(f"{len(rows)} {self.noun} could not be saved.")
+            return
+
+        # Guardar las filas en disco para poder reinsertarlas después
+        with open(self.spill_path, "a", encoding="utf-8") as file:
+            for row in rows:
+                record = dict(zip(self.columns, row))
+                file.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+        logger.error(
+            f"{len(rows)} {self.noun} could not be saved. See {self.spill_path}."
+        )
+
+
+class VehicleWriter(BatchWriter):
+    """Acumula vehículos en memoria y los inserta en lotes con executemany."""
+
+    query = INSERT_CAR_QUERY
+    columns = tuple(column for column, _ in CAR_COLUMNS)
+    noun = "vehicles"
+    saved_metric = "vehicles_saved"
+
+    def add(self, vehicle_details):
+        self._add_row(car_row(vehicle_details))
+
+
+class VehicleUpdater(BatchWriter):
+    """Reescribe en lotes los datos de vehículos ya guardados, por ejemplo
+    después de corregir el análisis y volver a leer las páginas guardadas."""
+
+    query = UPDATE_CAR_QUERY
+    columns = tuple(column for column, _ in REPARSED_CAR_COLUMNS) + ("URL",)
+    noun = "vehicle updates"
+    saved_metric = "vehicles_updated"
+
+    def add(self, vehicle_details):
+        self._add_row(
+            car_row(vehicle_details, REPARSED_CAR_COLUMNS) + (vehicle_details["URL"],)
+        )
+
+
+INSERT_PRICE_HISTORY_QUERY = (
+    "INSERT INTO CarPriceHistory (URL, PriceColones, PriceDollars, DateRecorded) "
+    "VALUES (?, ?, ?, ?)"
+)
+
+
+def get_last_vehicle_prices():
+    """Último precio conocido de cada vehículo publicado: el del historial o,
+    si nunca cambió, el que se guardó en Cars."""
+    try:
+        with get_pool().cursor() as cursor:
+            cursor.execute(
+                "SELECT c.URL, "
+                "COALESCE(h.PriceColones, c.PriceColones), "
+                "COALESCE(h.PriceDollars, c.PriceDollars) "
+                "FROM Cars c "
+                "LEFT JOIN (SELECT URL, MAX(Id) AS Id FROM CarPriceHistory "
+                "GROUP BY URL) latest ON latest.URL = c.URL "
+                "LEFT JOIN CarPriceHistory h ON h.Id = latest.Id "
+                "WHERE c.DateExited IS NULL"
+            )
+            return {
+                url: (price_colones, price_dollars)
+                for url, price_colones, price_dollars in cursor.fetchall()
+            }
+    except DATABASE_ERRORS as e:
+        logger.error(f"Database error: {e}")
+        return {}
+
+
+class CarPriceHistory(BatchWriter):
+    """Registra en CarPriceHistory solo los cambios de precio de vehículos conocidos.
+
+    Los últimos precios se cargan una vez en memoria; cada observación se
+    compara contra ellos y solo los cambios se insertan, en lotes.
+    """
+
+    query = INSERT_PRICE_HISTORY_QUERY
+    columns = ("URL", "PriceColones", "PriceDollars", "DateRecorded")
+    url_index = 0
+    noun = "price changes"
+    saved_metric = "price_changes_saved"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prices = {}
+
+    def load(self, prices=None):
+        prices = get_last_vehicle_prices() if prices is None else prices
+        with self._buffer_lock:
+            self._prices = {
+                url: (_price(price_colones), _price(price_dollars))
+                for url, (price_colones, price_dollars) in prices.items()
+            }
+        logger.info(f"Loaded the last prices of {len(prices)} vehicles.")
+
+    def record(self, url, price_colones, price_dollars):
+        """Comparar el precio observado y devolver True si cambió."""
+        prices = (_price(price_colones), _price(price_dollars))
+        if prices == (None, None):
+            return False
+
+        with self._buffer_lock:
+            last_prices = self._prices.get(url)
+            # Solo se siguen los vehículos publicados; los nuevos ya tienen su
+            # precio en Cars
+            if last_prices is None:
+                return False
+            # Una moneda que no se pudo leer conserva su último precio
+            prices = tuple(
+                last if new is None else new for new, last in zip(prices, last_prices)
+            )
+            if prices == last_prices:
+                return False
+
+            self._prices[url] = prices
+            self._buffer.append((url, *prices, datetime.now()))
+            is_full = len(self._buffer) >= self.batch_size
+
+        logger.info(f"Price changed for {url}: {last_prices} -> {prices}")
+        if is_full:
+            self.flush()
+        return True
+
+
+def _price(value):
+    # Los precios de la base de datos son DECIMAL y los del sitio enteros
+    return None if value is None else int(value)
+
+
+def update_vehicle_exit_date(url):
+    try:
+        with get_pool().cursor() as cursor:
+            cursor.execute(
+                "UPDATE Cars SET dateExited = ? WHERE URL = ?", (datetime.now(), url)
+            )
+    except DATABASE_ERRORS as e:
+        logger.error(f"Database error: {e}")
+
+
+def update_vehicles_exit_date(urls, batch_size=500):
+    # Un UPDATE por lote de URLs; SQL Server admite hasta 2100 parámetros
+    updated = 0
+    exit_date = datetime.now()
+
+    try:
+        with get_pool().cursor() as cursor:
+            for start in range(0, len(urls), batch_size):
+                batch = list(urls[start : start + batch_size])
+                cursor.execute(
+                    "UPDATE Cars SET dateExited = ? "
+                    "WHERE dateExited IS NULL AND URL IN ({})".format(
+                        ", ".join("?" for _ in batch)
+                    ),
+                    [exit_date] + batch,
+                )
+                # Solo cuenta los vehículos que seguían publicados; pyodbc
+                # devuelve -1 si no conoce el número de filas
+                updated += max(cursor.rowcount, 0)
+    except DATABASE_ERRORS as e:
+        logger.error(f"Database error: {e}")
+        return 0
+
+    logger.info(f"Updated exit date for {updated} vehicles.")
+    return updated
+
+
+def populate_date_exited(url):
+    try:
+        with get_pool().cursor() as cursor:
+            today = datetime.now().strftime("%Y-%m-%d")
+            cursor.execute(
+                "UPDATE Cars SET DateExited = ? WHERE URL = ? AND DateExited IS NULL",
+                (today, url),
+            )
+    except DATABASE_ERRORS as e:
+        logger.error(f"Error connecting to the database: {e}")
+
+
+def get_unsold_vehicle_urls():
+    try:
+        with get_pool().cursor() as cursor:
+            cursor.execute("SELECT URL FROM Cars WHERE dateExited IS NULL")
+            return [row[0] for row in cursor.fetchall()]
+    except DATABASE_ERRORS as e:
+        logger.error(f"Database error: {e}")
+        return []
+
+
+def get_existing_vehicle_urls():
+    try:
+        with get_pool().cursor() as cursor:
+            cursor.execute("SELECT URL FROM Cars")
+            return [row[0] for row in cursor.fetchall()]
+    except DATABASE_ERRORS as e:
+        logger.error(f"Database error: {e}")
+        return []
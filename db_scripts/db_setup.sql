@@ -1,4 +1,7 @@
 -- Drop tables if they exist
+IF OBJECT_ID('dbo.CarPriceHistory', 'U') IS NOT NULL 
+DROP TABLE dbo.CarPriceHistory;
+
 IF OBJECT_ID('dbo.CarImages', 'U') IS NOT NULL 
 DROP TABLE dbo.CarImages;
 
@@ -44,3 +47,14 @@ CREATE TABLE CarImages (
     ImageUrl5 VARCHAR(255),              -- URL of the fifth car image
     FOREIGN KEY (CarId) REFERENCES Cars(Id) -- Establishing foreign key relationship
 );
+
+CREATE TABLE CarPriceHistory (
+    Id INT PRIMARY KEY IDENTITY(1,1),   -- Unique identifier for each price change
+    URL VARCHAR(255) NOT NULL,          -- URL of the vehicle whose price changed
+    PriceColones DECIMAL(18, 2),        -- New price in colones
+    PriceDollars DECIMAL(18, 2),        -- New price in dollars
+    DateRecorded DATETIME NOT NULL,     -- When the new price was seen
+    FOREIGN KEY (URL) REFERENCES Cars(URL) -- Establishing foreign key relationship
+);
+
+CREATE INDEX IX_CarPriceHistory_URL ON CarPriceHistory (URL, Id);
@@ -0,0 +1,154 @@
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+# Páginas de listado o de vehículos que carga un navegador antes de
+# reemplazarlo, para liberar la memoria que acumula
+DRIVER_MAX_PAGES = 50
+
+logger = logging.getLogger(__name__)
+
+
+def is_driver_alive(driver):
+    try:
+        # Cerrar pestañas que hayan quedado abiertas por un error previo
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        return True
+    except WebDriverException as e:
+        logger.warning(f"Browser failed its health check: {e}")
+        return False
+
+
+class DriverPool:
+    """Navegadores abiertos que se reutilizan entre las fases del scrapper."""
+
+    def __init__(
+        self,
+        factory,
+        size,
+        max_pages=DRIVER_MAX_PAGES,
+        health_check=is_driver_alive,
+        on_quit=None,
+    ):
+        self._factory = factory
+        # Limpieza después de cerrar un navegador, como borrar su caché
+        self._on_quit = on_quit
+        self.size = size
+        self.max_pages = max_pages
+        self._health_check = health_check
+        self._idle = queue.LifoQueue()
+        self._pages = {}
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def warm_up(self, count=None):
+        """Abrir en paralelo los navegadores que se van a necesitar."""
+        count = min(count or self.size, self.size)
+
+        def start():
+            try:
+                self._idle.put(self._start())
+            except Exception as e:
+                logger.error(f"Could not start a browser: {e}")
+
+        threads = []
+        for _ in range(count - self._created):
+            with self._lock:
+                if self._created >= self.size:
+                    break
+                self._created += 1
+            thread = threading.Thread(target=start, name="DriverWarmUp")
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+    def _start(self):
+        try:
+            driver = self._factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+        with self._lock:
+            self._pages[id(driver)] = 0
+        return driver
+
+    def _quit(self, driver):
+        with self._lock:
+            self._created -= 1
+            self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            logger.warning(f"Error closing the browser: {e}")
+        finally:
+            if self._on_quit is not None:
+                self._on_quit(driver)
+
+    def acquire(self, timeout=None):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_start = self._created < self.size
+                    if can_start:
+                        self._created += 1
+                if can_start:
+                    return self._start()
+                driver = self._idle.get(timeout=timeout)
+
+            if self._health_check(driver):
+                return driver
+
+            # Reemplazar de forma transparente el navegador caído
+            logger.warning("Replacing a browser that stopped responding.")
+            self._quit(driver)
+
+    def record_page(self, driver, pages=1):
+        with self._lock:
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + pages
+
+    def pages_loaded(self, driver):
+        with self._lock:
+            return self._pages.get(id(driver), 0)
+
+    def needs_recycle(self, driver):
+        return self.pages_loaded(driver) >= self.max_pages
+
+    def release(self, driver):
+        if self.needs_recycle(driver):
+            logger.info(f"Recycling a browser after {self.pages_loaded(driver)} pages.")
+            self._quit(driver)
+        else:
+            self._idle.put(driver)
+
+    def discard(self, driver):
+        self._quit(driver)
+
+    @contextmanager
+    def driver(self):
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._quit(driver)
+        logger.info("Closed all pooled web drivers.")
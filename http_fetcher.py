@@ -0,0 +1,187 @@
+import logging
+import os
+import re
+from contextlib import nullcontext
+from urllib.parse import parse_qs, urlencode, urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from bs4 import BeautifulSoup
+
+from page_cache import conditional_headers
+from rate_limiter import THROTTLE_STATUS_CODES, RequestSlot
+from vehicle_parser import parse_card_prices
+
+
+# Página de inicio del sitio; la variable de entorno CRAUTOS_BASE_PATH permite
+# apuntar el scrapper a otro servidor, por ejemplo a replay_server.py
+CRAUTOS_BASE_PATH = os.environ.get("CRAUTOS_BASE_PATH", "https://crautos.com/index.cfm")
+CRAUTOS_USED_CARS_PATH = urljoin(CRAUTOS_BASE_PATH, "/autosusados/")
+CRAUTOS_SEARCH_RESULTS_PATH = urljoin(
+    CRAUTOS_BASE_PATH, "/autosusados/searchresults.cfm"
+)
+
+# Formulario de búsqueda vacío: "No Importa" en todos los filtros
+DEFAULT_SEARCH_FORM = {"brand": "00"}
+
+# Parámetro del formulario con el número de página de resultados
+SEARCH_PAGE_PARAM = "p"
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+    ),
+    "Accept-Language": "es-CR,es;q=0.9",
+}
+
+logger = logging.getLogger(__name__)
+
+
+class HttpFetcher:
+    """Descarga páginas de crautos.com reutilizando conexiones de un requests.Session."""
+
+    def __init__(
+        self, pool_size=10, timeout=15, retries=3, rate_limiter=None, cache=None
+    ):
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["GET", "POST"],
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def limit(self, url):
+        """Turno del limitador compartido para url, si hay uno configurado."""
+        if self.rate_limiter is None:
+            return nullcontext(RequestSlot())
+        return self.rate_limiter.request(url)
+
+    def _get(self, url, headers=None):
+        with self.limit(url) as slot:
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+            if response.status_code in THROTTLE_STATUS_CODES:
+                slot.failed(f"HTTP {response.status_code}")
+        return response
+
+    def fetch(self, url):
+        response = self._get(url)
+        response.raise_for_status()
+        return response.text
+
+    def fetch_page(self, url):
+        """Descargar una página de detalle pasando por la caché.
+
+        Devuelve (html, changed). Si la página está en caché se hace una
+        solicitud condicional; un 304 o un contenido idéntico dan changed=False.
+        """
+        if self.cache is None:
+            return self.fetch(url), True
+
+        cached_page = self.cache.get(url)
+        response = self._get(url, conditional_headers(cached_page))
+        if response.status_code == 304 and cached_page is not None:
+            return cached_page.html, False
+
+        response.raise_for_status()
+        changed = self.cache.put(
+            url,
+            response.text,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+        )
+        return response.text, changed
+
+    def fetch_search_results(self, form=None):
+        with self.limit(CRAUTOS_SEARCH_RESULTS_PATH) as slot:
+            response = self.session.post(
+                CRAUTOS_SEARCH_RESULTS_PATH,
+                data=form or DEFAULT_SEARCH_FORM,
+                timeout=self.timeout,
+            )
+            if response.status_code in THROTTLE_STATUS_CODES:
+                slot.failed(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        return response.text, response.url
+
+    def fetch_results_page(self, page, form=None):
+        """Descargar directamente la página page de los resultados de búsqueda."""
+        return self.fetch(build_search_results_url(page, form))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def extract_vehicle_links(html, base_url=CRAUTOS_SEARCH_RESULTS_PATH):
+    """Devolver los enlaces de las tarjetas de vehículos de una página de resultados."""
+    return [card["URL"] for card in extract_vehicle_cards(html, base_url)]
+
+
+def extract_vehicle_cards(html, base_url=CRAUTOS_SEARCH_RESULTS_PATH):
+    """Devolver el enlace y los precios de cada tarjeta de una página de resultados."""
+    soup = BeautifulSoup(html, "html.parser")
+    cards = soup.select(".card")
+
+    vehicle_cards = []
+    for index, card in enumerate(cards):
+        # Ignorar el último elemento, igual que en la vista del navegador
+        if index == len(cards) - 1:
+            continue
+        anchor = card.find("a", href=True)
+        if anchor:
+            vehicle_card = {"URL": urljoin(base_url, anchor["href"])}
+            vehicle_card.update(parse_card_prices(list(card.stripped_strings)))
+            vehicle_cards.append(vehicle_card)
+    return vehicle_cards
+
+
+def build_search_results_url(page, form=None):
+    """Construir el URL de la página page de resultados para el formulario dado."""
+    if page < 1:
+        raise ValueError("page must be at least 1")
+
+    params = dict(form or DEFAULT_SEARCH_FORM)
+    params[SEARCH_PAGE_PARAM] = page
+    return f"{CRAUTOS_SEARCH_RESULTS_PATH}?{urlencode(params)}"
+
+
+def extract_total_pages(html, base_url=CRAUTOS_SEARCH_RESULTS_PATH):
+    """Devolver el número de páginas de resultados según la paginación, o None."""
+    soup = BeautifulSoup(html, "html.parser")
+
+    pages = []
+    for link in soup.select(".page-item .page-link"):
+        text = link.get_text(strip=True)
+        if text.isdigit():
+            pages.append(int(text))
+
+        # El botón de la última página solo trae el número en el enlace
+        href = link.get("href")
+        if href:
+            query = parse_qs(urlsplit(urljoin(base_url, href)).query)
+            page = query.get(SEARCH_PAGE_PARAM, [""])[0]
+            if page.isdigit():
+                pages.append(int(page))
+            else:
+                pages.extend(int(number) for number in re.findall(r"\((\d+)\)", href))
+
+    return max(pages, default=None)
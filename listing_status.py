@@ -0,0 +1,5 @@
+# Estado de un anuncio al revisar si sigue publicado
+AVAILABLE = "available"
+EXITED = "exited"
+# No se pudo determinar (timeout, error de red); no cuenta como salida
+UNKNOWN = "unknown"
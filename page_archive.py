@@ -0,0 +1,315 @@
+import gzip
+import hashlib
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+from checkpoint import load_checkpoint, save_checkpoint
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+PAGE_ARCHIVE_DIR = "page_archive"
+
+# Tamaño a partir del cual se empieza un segmento nuevo
+ARCHIVE_SEGMENT_MAX_BYTES = 256 * 1024 * 1024
+
+GZIP_CODEC = "gzip"
+ZSTD_CODEC = "zstd"
+ARCHIVE_CODECS = (GZIP_CODEC, ZSTD_CODEC)
+
+SEGMENT_EXTENSIONS = {GZIP_CODEC: ".gz", ZSTD_CODEC: ".zst"}
+SEGMENT_NAME_RE = re.compile(r"^segment-(\d{6})\.(gz|zst)$")
+
+INDEX_FILE = "index.bin"
+# Datos del archivo que no son páginas, como la lista de marcas
+META_FILE = "meta.json"
+
+# Entrada del índice: hash del URL, fecha de descarga (epoch), segmento,
+# offset y largo del registro comprimido. De tamaño fijo para poder leer el
+# índice mapeado en memoria sin analizarlo
+INDEX_ENTRY = struct.Struct("<16sqIQI")
+
+ArchiveEntry = namedtuple(
+    "ArchiveEntry", ["url_hash", "fetched_at", "segment", "offset", "length"]
+)
+ArchivedPage = namedtuple("ArchivedPage", ["url", "fetched_at", "html"])
+
+
+def url_hash(url):
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=16).digest()
+
+
+def resolve_codec(codec):
+    """Devolver el códec a usar, o gzip si zstandard no está instalado."""
+    if codec not in ARCHIVE_CODECS:
+        raise ValueError(f"unknown archive codec: {codec}")
+    if codec == ZSTD_CODEC and zstandard is None:
+        logger.warning("zstandard is not installed; archiving with gzip instead.")
+        return GZIP_CODEC
+    return codec
+
+
+def segment_name(segment, codec):
+    return f"segment-{segment:06d}{SEGMENT_EXTENSIONS[codec]}"
+
+
+def list_segments(directory):
+    """Devolver {número: nombre de archivo} de los segmentos del directorio."""
+    segments = {}
+    for name in os.listdir(directory):
+        match = SEGMENT_NAME_RE.match(name)
+        if match:
+            segments[int(match.group(1))] = name
+    return segments
+
+
+def compress_record(data, codec):
+    # Cada registro es un miembro gzip o un frame zstd independiente: se
+    # puede descomprimir a partir de su offset sin leer el resto del segmento
+    if codec == ZSTD_CODEC:
+        return zstandard.ZstdCompressor().compress(data)
+    return gzip.compress(data, mtime=0)
+
+
+def decompress_record(data, segment_file):
+    if segment_file.endswith(SEGMENT_EXTENSIONS[ZSTD_CODEC]):
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is needed to read {segment_file}")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+
+
+def encode_record(url, html):
+    return url.encode("utf-8") + b"\n" + html.encode("utf-8")
+
+
+def decode_record(data):
+    url, html = data.split(b"\n", 1)
+    return url.decode("utf-8"), html.decode("utf-8")
+
+
+class PageArchive:
+    """Archivo de solo anexado con el HTML crudo de cada página descargada.
+
+    Los registros se comprimen uno por uno y se agregan al segmento actual;
+    index.bin guarda una entrada de tamaño fijo por registro. Así un error
+    de análisis se corrige volviendo a leer el archivo en lugar de recorrer
+    el sitio otra vez.
+    """
+
+    def __init__(
+        self,
+        directory=PAGE_ARCHIVE_DIR,
+        codec=GZIP_CODEC,
+        segment_max_bytes=ARCHIVE_SEGMENT_MAX_BYTES,
+    ):
+        self.directory = directory
+        self.codec = resolve_codec(codec)
+        self.segment_max_bytes = segment_max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        segments = list_segments(directory)
+        self._segment = max(segments, default=0)
+        self._segment_file = None
+        # Se sigue el último segmento solo si usa el mismo códec
+        last_name = segments.get(self._segment)
+        if last_name != segment_name(self._segment, self.codec):
+            self._segment += 1
+        self._open_segment()
+
+        index_path = os.path.join(directory, INDEX_FILE)
+        self._index_file = open(index_path, "ab")
+        # Descartar una entrada incompleta si una ejecución anterior se cortó
+        misaligned = self._index_file.tell() % INDEX_ENTRY.size
+        if misaligned:
+            self._index_file.truncate(self._index_file.tell() - misaligned)
+            self._index_file.seek(0, os.SEEK_END)
+
+    def _open_segment(self):
+        if self._segment_file is not None:
+            self._segment_file.close()
+        path = os.path.join(self.directory, segment_name(self._segment, self.codec))
+        self._segment_file = open(path, "ab")
+
+    def append(self, url, html, fetched_at=None):
+        """Agregar una página y devolver su entrada del índice."""
+        fetched_at = int(time.time() if fetched_at is None else fetched_at)
+        record = compress_record(encode_record(url, html), self.codec)
+
+        with self._lock:
+            offset = self._segment_file.tell()
+            if offset and offset + len(record) > self.segment_max_bytes:
+                self._segment += 1
+                self._open_segment()
+                offset = 0
+
+            self._segment_file.write(record)
+            self._segment_file.flush()
+
+            entry = ArchiveEntry(
+                url_hash(url), fetched_at, self._segment, offset, len(record)
+            )
+            # El índice se escribe después del registro: una entrada siempre
+            # apunta a datos completos
+            self._index_file.write(INDEX_ENTRY.pack(*entry))
+            self._index_file.flush()
+        return entry
+
+    def set_meta(self, key, value):
+        """Guardar un dato junto a las páginas, por ejemplo la lista de marcas
+        que hace falta para volver a analizarlas sin conexión."""
+        path = os.path.join(self.directory, META_FILE)
+        with self._lock:
+            meta = load_checkpoint(path) or {}
+            meta[key] = value
+            save_checkpoint(path, meta)
+
+    def close(self):
+        with self._lock:
+            self._segment_file.close()
+            self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ArchiveReader:
+    """Lee un PageArchive con el índice mapeado en memoria.
+
+    Puede abrirse mientras otro proceso sigue escribiendo; solo ve las
+    entradas que existían al abrirlo.
+    """
+
+    def __init__(self, directory=PAGE_ARCHIVE_DIR):
+        self.directory = directory
+        self._segments = list_segments(directory)
+        self._by_url = None
+
+        self._index_file = open(os.path.join(directory, INDEX_FILE), "rb")
+        size = os.fstat(self._index_file.fileno()).st_size
+        self._count = size // INDEX_ENTRY.size
+        self._index = None
+        if self._count:
+            self._index = mmap.mmap(
+                self._index_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+    def __len__(self):
+        return self._count
+
+    def entries(self):
+        """Recorrer las entradas del índice en el orden en que se agregaron."""
+        if not self._count:
+            return
+        view = memoryview(self._index)[: self._count * INDEX_ENTRY.size]
+        try:
+            for fields in INDEX_ENTRY.iter_unpack(view):
+                yield ArchiveEntry(*fields)
+        finally:
+            view.release()
+
+    def lookup(self, url):
+        """Entradas de un URL ordenadas por fecha de descarga."""
+        if self._by_url is None:
+            by_url = {}
+            for entry in self.entries():
+                by_url.setdefault(entry.url_hash, []).append(entry)
+            for versions in by_url.values():
+                versions.sort(key=lambda entry: entry.fetched_at)
+            self._by_url = by_url
+        return list(self._by_url.get(url_hash(url), []))
+
+    def get(self, url, fetched_before=None):
+        """Devolver la versión más reciente del URL, o la última descargada
+        antes de fetched_before (epoch), o None si no está archivado."""
+        versions = self.lookup(url)
+        if fetched_before is not None:
+            versions = [
+                entry for entry in versions if entry.fetched_at <= fetched_before
+            ]
+        if not versions:
+            return None
+        return self.read(versions[-1])
+
+    def get_meta(self, key, default=None):
+        meta = load_checkpoint(os.path.join(self.directory, META_FILE)) or {}
+        return meta.get(key, default)
+
+    def read(self, entry):
+        segment_file = self._segments[entry.segment]
+        with open(os.path.join(self.directory, segment_file), "rb") as file:
+            file.seek(entry.offset)
+            data = decompress_record(file.read(entry.length), segment_file)
+        url, html = decode_record(data)
+        return ArchivedPage(url, entry.fetched_at, html)
+
+    def iter_pages(self, since=None, until=None):
+        """Recorrer las páginas en el orden del archivo, descomprimiendo un
+        registro a la vez. Las lecturas de cada segmento son secuenciales."""
+        return self._read_entries(
+            entry
+            for entry in self.entries()
+            if (since is None or entry.fetched_at >= since)
+            and (until is None or entry.fetched_at <= until)
+        )
+
+    def iter_latest_pages(self):
+        """Recorrer solo la versión más reciente de cada URL, en el orden del
+        archivo."""
+        latest = {}
+        for entry in self.entries():
+            last = latest.get(entry.url_hash)
+            # Con la misma fecha gana la entrada agregada después
+            if last is None or entry.fetched_at >= last.fetched_at:
+                latest[entry.url_hash] = entry
+        return self._read_entries(
+            sorted(latest.values(), key=lambda entry: (entry.segment, entry.offset))
+        )
+
+    def _read_entries(self, entries):
+        segment, file = None, None
+        try:
+            for entry in entries:
+                if entry.segment != segment:
+                    if file is not None:
+                        file.close()
+                    segment = entry.segment
+                    file = open(
+                        os.path.join(self.directory, self._segments[segment]), "rb"
+                    )
+                if file.tell() != entry.offset:
+                    file.seek(entry.offset)
+                data = decompress_record(
+                    file.read(entry.length), self._segments[segment]
+                )
+                url, html = decode_record(data)
+                yield ArchivedPage(url, entry.fetched_at, html)
+        finally:
+            if file is not None:
+                file.close()
+
+    def close(self):
+        if self._index is not None:
+            self._index.close()
+        self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
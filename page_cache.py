@@ -0,0 +1,201 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_PATH = "page_cache.sqlite3"
+PAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+CachedPage = namedtuple(
+    "CachedPage", ["url", "html", "etag", "last_modified", "content_hash"]
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def content_hash(html):
+    return hashlib.blake2b(html.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class PageCache:
+    """Caché en disco de páginas HTML por URL con desalojo LRU por tamaño.
+
+    Guarda el HTML comprimido junto con los encabezados ETag y Last-Modified
+    para hacer solicitudes condicionales, y un hash del contenido para saber
+    si una página cambió desde la última descarga.
+    """
+
+    def __init__(self, path=PAGE_CACHE_PATH, max_bytes=PAGE_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        # sqlite3 no permite compartir una conexión entre hilos
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, url):
+        row = (
+            self._connection()
+            .execute(
+                "SELECT body, etag, last_modified, content_hash FROM pages "
+                "WHERE url = ?",
+                (url,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+
+        self._connection().execute(
+            "UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url)
+        )
+        body, etag, last_modified, page_hash = row
+        return CachedPage(
+            url, zlib.decompress(body).decode("utf-8"), etag, last_modified, page_hash
+        )
+
+    def put(self, url, html, etag=None, last_modified=None):
+        """Guardar la página y devolver True si su contenido cambió."""
+        page_hash = content_hash(html)
+        body = zlib.compress(html.encode("utf-8"))
+        now = time.time()
+
+        with self._lock:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                previous = connection.execute(
+                    "SELECT size, content_hash FROM pages WHERE url = ?", (url,)
+                ).fetchone()
+                connection.execute(
+                    "INSERT OR REPLACE INTO pages (url, body, size, etag, "
+                    "last_modified, content_hash, fetched_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (url, body, len(body), etag, last_modified, page_hash, now, now),
+                )
+                # El tamaño se suma en la base y no en memoria: los workers
+                # locales de otros procesos escriben en el mismo caché
+                size = self._total_size(connection)
+                if size > self.max_bytes:
+                    self._evict(connection, size)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+        return previous is None or previous[1] != page_hash
+
+    def _evict(self, connection, size):
+        # Borrar las páginas usadas hace más tiempo hasta bajar del 90 % del
+        # límite, dentro de la transacción de put
+        target = self.max_bytes * 0.9
+        urls = []
+        for url, page_size in connection.execute(
+            "SELECT url, size FROM pages ORDER BY accessed_at"
+        ).fetchall():
+            if size <= target:
+                break
+            urls.append((url,))
+            size -= page_size
+        connection.executemany("DELETE FROM pages WHERE url = ?", urls)
+        logger.info(f"Evicted {len(urls)} pages from the page cache.")
+
+    @staticmethod
+    def _total_size(connection):
+        return connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM pages"
+        ).fetchone()[0]
+
+    def set_meta(self, key, value):
+        """Guardar un dato junto a las páginas, como la lista de marcas que
+        hace falta para volver a analizarlas sin conexión."""
+        self._connection().execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (key, json.dumps(value, ensure_ascii=False)),
+        )
+
+    def get_meta(self, key, default=None):
+        row = (
+            self._connection()
+            .execute("SELECT value FROM meta WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return default if row is None else json.loads(row[0])
+
+    def size(self):
+        return self._total_size(self._connection())
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def __contains__(self, url):
+        return (
+            self._connection()
+            .execute("SELECT 1 FROM pages WHERE url = ?", (url,))
+            .fetchone()
+            is not None
+        )
+
+    def iter_pages(self):
+        """Recorrer las páginas guardadas, por ejemplo para volver a analizarlas
+        sin conexión."""
+        rows = self._connection().execute(
+            "SELECT url, body, etag, last_modified, content_hash FROM pages "
+            "ORDER BY url"
+        )
+        for url, body, etag, last_modified, page_hash in rows:
+            yield CachedPage(
+                url,
+                zlib.decompress(body).decode("utf-8"),
+                etag,
+                last_modified,
+                page_hash,
+            )
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def conditional_headers(cached_page):
+    headers = {}
+    if cached_page is None:
+        return headers
+    if cached_page.etag:
+        headers["If-None-Match"] = cached_page.etag
+    if cached_page.last_modified:
+        headers["If-Modified-Since"] = cached_page.last_modified
+    return headers
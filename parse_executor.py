@@ -0,0 +1,165 @@
+import locale
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+try:
+    import lxml
+except ImportError:
+    lxml = None
+
+from run_metrics import PARSE, REFORMAT
+from vehicle_parser import (
+    HTML_PARSER,
+    LXML_PARSER,
+    parse_vehicle_html,
+    reformat_vehicle_details,
+)
+
+logger = logging.getLogger(__name__)
+
+PARSE_BACKENDS = (HTML_PARSER, LXML_PARSER)
+
+# Páginas por envío a un proceso; lotes más grandes reparten mejor el costo
+# de copiar el HTML entre procesos
+PARSE_BATCH_SIZE = 32
+
+# Lotes en vuelo por proceso; limita cuánto HTML queda esperando en memoria
+PENDING_BATCHES_PER_PROCESS = 2
+
+
+def resolve_backend(backend):
+    """Devolver el analizador a usar, o html.parser si lxml no está instalado."""
+    if backend not in PARSE_BACKENDS:
+        raise ValueError(f"unknown parser backend: {backend}")
+    if backend == LXML_PARSER and lxml is None:
+        logger.warning("lxml is not installed; parsing with html.parser instead.")
+        return HTML_PARSER
+    return backend
+
+
+def _init_worker(time_locale):
+    # Con spawn (Windows) el proceso no hereda el locale que usa strptime
+    # para leer "Fecha de ingreso"
+    try:
+        locale.setlocale(locale.LC_TIME, time_locale)
+    except locale.Error as e:
+        logger.warning(f"Could not set locale {time_locale} in parse worker: {e}")
+
+
+def _parse_batch(batch, brands, features):
+    """Analizar un lote de (key, html) dentro de un proceso del pool.
+
+    Devuelve (key, vehicle_details, error, parse_seconds, reformat_seconds)
+    por página; el error viaja como texto para no depender de que la
+    excepción se pueda serializar.
+    """
+    results = []
+    for key, html in batch:
+        start = time.perf_counter()
+        try:
+            vehicle_details = parse_vehicle_html(html, brands, features)
+            parsed = time.perf_counter()
+            vehicle_details = reformat_vehicle_details(vehicle_details)
+        except Exception as e:
+            results.append((key, None, f"{type(e).__name__}: {e}", 0.0, 0.0))
+            continue
+        results.append(
+            (
+                key,
+                vehicle_details,
+                None,
+                parsed - start,
+                time.perf_counter() - parsed,
+            )
+        )
+    return results
+
+
+def batches(items, size):
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class ParseExecutor:
+    """Analiza páginas de detalle en un pool de procesos para usar todos los
+    núcleos; BeautifulSoup y las expresiones regulares no se reparten entre
+    hilos por el GIL.
+
+    map reparte las páginas en lotes de batch_size (re-análisis del caché o
+    del archivo); parse_page envía una sola página porque durante el recorrido
+    cada página se analiza apenas se descarga.
+    """
+
+    def __init__(
+        self,
+        processes=None,
+        batch_size=PARSE_BATCH_SIZE,
+        backend=HTML_PARSER,
+        metrics=None,
+    ):
+        self.processes = processes or os.cpu_count() or 1
+        self.batch_size = max(1, batch_size)
+        self.features = resolve_backend(backend)
+        self.metrics = metrics
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=_init_worker,
+            initargs=(locale.setlocale(locale.LC_TIME),),
+        )
+        logger.info(
+            f"Parsing with {self.processes} processes, batches of "
+            f"{self.batch_size} pages and the {self.features} backend."
+        )
+
+    def map(self, pages, brands):
+        """Analizar (key, html) por lotes y devolver (key, vehicle_details, error)
+        en el mismo orden. Lee pages a medida que se liberan procesos, así que
+        acepta generadores de cualquier tamaño."""
+        brands = tuple(brands)
+        max_pending = self.processes * PENDING_BATCHES_PER_PROCESS
+        pending = deque()
+        for batch in batches(pages, self.batch_size):
+            pending.append(
+                self._pool.submit(_parse_batch, batch, brands, self.features)
+            )
+            if len(pending) >= max_pending:
+                yield from self._collect(pending.popleft())
+        while pending:
+            yield from self._collect(pending.popleft())
+
+    def parse_page(self, html, brands):
+        """Analizar una sola página en el pool, sin esperar a completar un lote;
+        lanza ValueError si falla."""
+        ((_, vehicle_details, error),) = self.map([(None, html)], brands)
+        if error is not None:
+            raise ValueError(error)
+        return vehicle_details
+
+    def _collect(self, future):
+        for result in future.result():
+            key, vehicle_details, error, parse_seconds, reformat_seconds = result
+            if self.metrics is not None:
+                if error is None:
+                    self.metrics.observe(PARSE, parse_seconds)
+                    self.metrics.observe(REFORMAT, reformat_seconds)
+                    self.metrics.count("vehicles_parsed")
+                else:
+                    self.metrics.count(f"{PARSE}_errors")
+            yield key, vehicle_details, error
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,131 @@
+import logging
+import queue
+import threading
+from collections import namedtuple
+
+from run_metrics import timed
+
+logger = logging.getLogger(__name__)
+
+# Nombre, función, hilos y tamaño de la cola de entrada de una etapa
+Stage = namedtuple("Stage", ["name", "function", "workers", "queue_size"])
+
+# Marca el fin de la entrada de una etapa
+_DONE = object()
+
+
+class Pipeline:
+    """Etapas encadenadas por colas acotadas, cada una con sus propios hilos.
+
+    Cada elemento es un par (key, value): la función de cada etapa recibe el
+    valor y devuelve el de la siguiente. Cuando la cola de una etapa se
+    llena, quien le entrega elementos espera; así la etapa más lenta marca
+    el ritmo sin acumular trabajo en memoria. Al terminar la última etapa se
+    llama on_done(key, value) y si una etapa falla, on_error(key, stage, error).
+    """
+
+    def __init__(self, stages, on_done=None, on_error=None, metrics=None):
+        if not stages:
+            raise ValueError("a pipeline needs at least one stage")
+
+        self.stages = list(stages)
+        self.on_done = on_done
+        self.on_error = on_error
+        self.metrics = metrics
+        self._queues = [queue.Queue(maxsize=stage.queue_size) for stage in stages]
+        self._running = [stage.workers for stage in stages]
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self._threads = []
+        for index, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._run_stage,
+                    args=(index,),
+                    name=f"{stage.name.title()}Worker-{worker}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, key, value):
+        """Entregar un elemento a la primera etapa; espera si su cola está llena."""
+        if self._closed:
+            raise RuntimeError("the pipeline is closed")
+        self._put(0, (key, value))
+
+    def _put(self, index, item):
+        with timed(self.metrics, f"{self.stages[index].name}_queue_wait"):
+            self._queues[index].put(item)
+
+    def _run_stage(self, index):
+        stage = self.stages[index]
+        is_last = index == len(self.stages) - 1
+
+        source = self._queues[index]
+        while True:
+            item = source.get()
+            if item is _DONE:
+                source.task_done()
+                break
+
+            key, value = item
+            try:
+                value = stage.function(value)
+            except Exception as e:
+                logger.error(f"{stage.name} stage failed for {key}: {e}")
+                self._notify(self.on_error, key, stage.name, e)
+            else:
+                if is_last:
+                    self._notify(self.on_done, key, value)
+                else:
+                    self._put(index + 1, (key, value))
+            # Se marca después de pasar el elemento a la siguiente etapa para
+            # que drain no termine con elementos en tránsito
+            source.task_done()
+
+        # El último hilo de la etapa avisa el fin a todos los de la siguiente
+        with self._lock:
+            self._running[index] -= 1
+            finished = self._running[index] == 0
+        if finished and not is_last:
+            for _ in range(self.stages[index + 1].workers):
+                self._queues[index + 1].put(_DONE)
+
+    @staticmethod
+    def _notify(callback, *args):
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"Pipeline callback failed for {args[0]}: {e}")
+
+    def backlog(self):
+        """Elementos esperando en la cola de cada etapa."""
+        return {
+            stage.name: stage_queue.qsize()
+            for stage, stage_queue in zip(self.stages, self._queues)
+        }
+
+    def drain(self):
+        """Esperar a que todo lo entregado hasta ahora termine la última etapa."""
+        for stage_queue in self._queues:
+            stage_queue.join()
+
+    def close(self):
+        """Procesar lo pendiente y detener los hilos."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in range(self.stages[0].workers):
+            self._queues[0].put(_DONE)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Solicitudes por segundo a cada host al inicio y límites del control AIMD
+INITIAL_REQUESTS_PER_SECOND = 4
+MIN_REQUESTS_PER_SECOND = 0.5
+MAX_REQUESTS_PER_SECOND = 20
+MAX_CONCURRENT_REQUESTS_PER_HOST = 8
+
+# Una respuesta es un pico de latencia si tarda LATENCY_SPIKE_FACTOR veces
+# más que el promedio móvil
+LATENCY_SPIKE_FACTOR = 3
+LATENCY_SMOOTHING = 0.1
+MIN_LATENCY_SAMPLES = 10
+
+# Códigos con los que el sitio indica que vamos demasiado rápido
+THROTTLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """Cubeta de fichas segura entre hilos: limita el ritmo medio de solicitudes
+    permitiendo ráfagas de hasta capacity solicitudes."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def acquire(self):
+        """Esperar hasta obtener una ficha y devolver los segundos esperados."""
+        waited = 0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class AimdController:
+    """Ajusta el ritmo de una TokenBucket con aumento aditivo y disminución
+    multiplicativa (AIMD).
+
+    Cada respuesta sana sube el ritmo de modo que crece increase solicitudes
+    por segundo por cada segundo de respuestas sanas. Un error o un pico de
+    latencia lo multiplica por decrease, como máximo una vez cada cooldown
+    segundos para no castigar varias veces la misma ráfaga.
+    """
+
+    def __init__(
+        self,
+        bucket,
+        min_rate=MIN_REQUESTS_PER_SECOND,
+        max_rate=MAX_REQUESTS_PER_SECOND,
+        increase=1.0,
+        decrease=0.5,
+        cooldown=2.0,
+    ):
+        self.bucket = bucket
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.average_latency = None
+        self._samples = 0
+        self._last_decrease = -cooldown
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self):
+        return self.bucket.rate
+
+    def is_latency_spike(self, latency):
+        return (
+            self._samples >= MIN_LATENCY_SAMPLES
+            and latency > self.average_latency * LATENCY_SPIKE_FACTOR
+        )
+
+    def on_success(self, latency):
+        with self._lock:
+            if self.is_latency_spike(latency):
+                self._back_off(f"latency spike of {latency:.2f}s")
+            else:
+                rate = self.bucket.rate + self.increase / self.bucket.rate
+                self.bucket.set_rate(min(rate, self.max_rate))
+
+            if self.average_latency is None:
+                self.average_latency = latency
+            else:
+                self.average_latency += LATENCY_SMOOTHING * (
+                    latency - self.average_latency
+                )
+            self._samples += 1
+
+    def on_error(self, reason="error"):
+        with self._lock:
+            self._back_off(reason)
+
+    def _back_off(self, reason):
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+
+        rate = max(self.bucket.rate * self.decrease, self.min_rate)
+        logger.warning(f"Backing off to {rate:.2f} requests per second after {reason}.")
+        self.bucket.set_rate(rate)
+
+
+class RequestSlot:
+    def __init__(self):
+        self.error = None
+
+    def failed(self, reason="error"):
+        """Marcar la solicitud como fallida aunque no haya lanzado una excepción."""
+        self.error = reason
+
+
+class HostLimit:
+    def __init__(self, rate, max_concurrency, **aimd_options):
+        self.bucket = TokenBucket(rate)
+        self.controller = AimdController(self.bucket, **aimd_options)
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+
+
+class RateLimiter:
+    """Limitador compartido por todos los caminos que descargan de crautos.com.
+
+    Cada host tiene su propia cubeta de fichas, un tope de solicitudes
+    simultáneas y un controlador AIMD que ajusta el ritmo según las
+    respuestas.
+    """
+
+    def __init__(
+        self,
+        rate=INITIAL_REQUESTS_PER_SECOND,
+        max_concurrency=MAX_CONCURRENT_REQUESTS_PER_HOST,
+        **aimd_options,
+    ):
+        self.rate = rate
+        self.max_concurrency = max_concurrency
+        self.aimd_options = aimd_options
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def host_limit(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = HostLimit(
+                    self.rate, self.max_concurrency, **self.aimd_options
+                )
+            return self._hosts[host]
+
+    def current_rate(self, url):
+        return self.host_limit(url).controller.rate
+
+    @contextmanager
+    def request(self, url):
+        """Esperar turno para url y reportar al controlador cómo respondió."""
+        limit = self.host_limit(url)
+        with limit.semaphore:
+            limit.bucket.acquire()
+            slot = RequestSlot()
+            start = time.monotonic()
+            try:
+                yield slot
+            except Exception as e:
+                limit.controller.on_error(type(e).__name__)
+                raise
+
+            if slot.error is not None:
+                limit.controller.on_error(slot.error)
+            else:
+                limit.controller.on_success(time.monotonic() - start)
@@ -0,0 +1,427 @@
+"""Servidor local que imita a crautos.com para pruebas de carga.
+
+Sirve la página de inicio, el formulario de autos usados, páginas de
+resultados generadas con tarjetas .card y paginación .page-item, y las
+páginas de detalle guardadas en tests/mock_html. La latencia, la tasa de
+errores y la proporción de anuncios retirados son configurables.
+
+Uso:
+    python replay_server.py --pages 50 --latency 0.2 --error-rate 0.05
+    CRAUTOS_BASE_PATH=http://127.0.0.1:8000/index.cfm python scrapper.py chrome
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from vehicle_parser import parse_vehicle_html
+
+logger = logging.getLogger(__name__)
+
+MOCK_HTML_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "tests", "mock_html"
+)
+REPLAY_FIXTURES = [
+    "Colones/Colones_Example.html",
+    "Dollars/Dollars_Example.html",
+    "Dollars_EV/Dollars_example.html",
+    "Sale/Sale_example.html",
+]
+REPLAY_BRANDS = ["Audi", "Ford", "Mercedes Benz", "Volvo"]
+
+REPLAY_HOST = "127.0.0.1"
+REPLAY_PORT = 8000
+REPLAY_PAGES = 20
+REPLAY_CARDS_PER_PAGE = 20
+
+USED_CARS_PATH = "/autosusados/"
+SEARCH_RESULTS_PATH = "/autosusados/searchresults.cfm"
+VEHICLE_DETAIL_PATH = "/autosusados/cardetail.cfm"
+
+# Las páginas guardadas apuntan al sitio real; las pestañas del detalle
+# deben quedar como en el sitio, con href="#tab-N"
+SAVED_TAB_LINK = re.compile(r'href="[^"#]*(#tab-\d+)"')
+SAVED_SITE_URL = "https://crautos.com"
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>{title}</title></head>
+<body>{body}</body></html>"""
+
+
+class ReplaySite:
+    """Contenido del sitio de prueba: qué vehículos están publicados, cuáles
+    se retiraron y cómo se ven sus páginas.
+
+    Los vehículos publicados llenan exactamente pages páginas de resultados;
+    los retirados tienen URLs propios que redirigen al listado, como cuando
+    el sitio da de baja un anuncio.
+    """
+
+    def __init__(
+        self,
+        origin,
+        pages=REPLAY_PAGES,
+        cards_per_page=REPLAY_CARDS_PER_PAGE,
+        removed_ratio=0.0,
+        fixtures_dir=MOCK_HTML_DIR,
+    ):
+        if not 0 <= removed_ratio < 1:
+            raise ValueError("removed_ratio must be in [0, 1)")
+
+        self.origin = origin.rstrip("/")
+        self.pages = pages
+        self.cards_per_page = cards_per_page
+
+        listed = pages * cards_per_page
+        removed = round(listed * removed_ratio / (1 - removed_ratio))
+        self.listed_ids = range(1, listed + 1)
+        self.removed_ids = range(listed + 1, listed + removed + 1)
+
+        self.details = []
+        for relative_path in REPLAY_FIXTURES:
+            with open(
+                os.path.join(fixtures_dir, relative_path), encoding="utf-8"
+            ) as file:
+                page = file.read()
+            page = SAVED_TAB_LINK.sub(r'href="\1"', page).replace(
+                SAVED_SITE_URL, self.origin
+            )
+            self.details.append(
+                (page.encode("utf-8"), parse_vehicle_html(page, REPLAY_BRANDS))
+            )
+
+    def vehicle_url(self, vehicle_id):
+        return f"{self.origin}{VEHICLE_DETAIL_PATH}?c={vehicle_id}"
+
+    def vehicle_urls(self, removed=False):
+        ids = self.removed_ids if removed else self.listed_ids
+        return [self.vehicle_url(vehicle_id) for vehicle_id in ids]
+
+    def is_listed(self, vehicle_id):
+        return vehicle_id in self.listed_ids
+
+    def detail(self, vehicle_id):
+        return self.details[(vehicle_id - 1) % len(self.details)]
+
+    def home_page(self):
+        return PAGE_TEMPLATE.format(
+            title="CRAutos",
+            body='<a href="./autosusados"><img alt="Autos usados" src=""></a>',
+        )
+
+    def used_cars_page(self):
+        options = ['<option value="00">No Importa</option>'] + [
+            f'<option value="{index}">{html.escape(brand)}</option>'
+            for index, brand in enumerate(REPLAY_BRANDS, start=1)
+        ]
+        return PAGE_TEMPLATE.format(
+            title="Autos usados",
+            body=(
+                f'<form method="post" action="{SEARCH_RESULTS_PATH}">'
+                f'<select name="brand">{"".join(options)}</select>'
+                '<button type="submit">BUSCAR</button></form>'
+            ),
+        )
+
+    def results_page(self, page, form):
+        page = min(max(page, 1), self.pages)
+        first = (page - 1) * self.cards_per_page
+
+        cards = []
+        for vehicle_id in self.listed_ids[first : first + self.cards_per_page]:
+            _, details = self.detail(vehicle_id)
+            title = " ".join(
+                str(details.get(field) or "") for field in ("Marca", "Modelo", "Año")
+            )
+            cards.append(
+                f'<div class="card"><a href="cardetail.cfm?c={vehicle_id}">'
+                f'<div class="card-body"><h5>{html.escape(title)}</h5>'
+                f"<p>¢ {details.get('PrecioColones') or 0:,}</p>"
+                f"<p>$ {details.get('PrecioDolares') or 0:,}</p></div></a></div>"
+            )
+        # Igual que en el sitio, la última tarjeta no es un vehículo
+        cards.append('<div class="card"><div class="card-body">Publicidad</div></div>')
+
+        return PAGE_TEMPLATE.format(
+            title=f"Resultados, página {page}",
+            body="".join(cards) + self.pagination(page, form),
+        )
+
+    def pagination(self, page, form):
+        def page_url(number):
+            return f"searchresults.cfm?{urlencode({**form, 'p': number})}"
+
+        items = []
+        if page > 1:
+            items.append(
+                f'<li class="page-item page-prev"><a class="page-link" '
+                f'href="{page_url(page - 1)}">&laquo;</a></li>'
+            )
+        for number in range(max(page - 2, 1), min(page + 2, self.pages) + 1):
+            active = " active" if number == page else ""
+            items.append(
+                f'<li class="page-item{active}"><a class="page-link" '
+                f'href="{page_url(number)}">{number}</a></li>'
+            )
+        if page < self.pages:
+            items.append(
+                f'<li class="page-item page-next"><a class="page-link" '
+                f'href="{page_url(page + 1)}">&raquo;</a></li>'
+            )
+        return (
+            f'<ul class="pagination">{"".join(items)}</ul>'
+            f'<a class="btn btn-xs btn-success pull-right" '
+            f'href="{page_url(self.pages)}">Última</a>'
+        )
+
+
+class ReplayServer:
+    """Servidor HTTP del sitio de prueba en un hilo aparte.
+
+    Cada respuesta espera latency segundos (con una variación de ±jitter)
+    y con probabilidad error_rate responde 503 en lugar de la página.
+    """
+
+    def __init__(
+        self,
+        host=REPLAY_HOST,
+        port=REPLAY_PORT,
+        pages=REPLAY_PAGES,
+        cards_per_page=REPLAY_CARDS_PER_PAGE,
+        latency=0.0,
+        jitter=0.5,
+        error_rate=0.0,
+        removed_ratio=0.0,
+        seed=None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+        self.site = ReplaySite(self.origin, pages, cards_per_page, removed_ratio)
+
+    @property
+    def origin(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_path(self):
+        """Valor para la variable de entorno CRAUTOS_BASE_PATH."""
+        return f"{self.origin}/index.cfm"
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="ReplayServer", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Replay server listening on {self.base_path}.")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, key):
+        with self._stats_lock:
+            self._stats[key] = self._stats.get(key, 0) + 1
+
+    def _delay_and_fail(self):
+        with self._random_lock:
+            variation = self._random.uniform(-self.jitter, self.jitter)
+            fail = self._random.random() < self.error_rate
+        if self.latency:
+            time.sleep(max(self.latency * (1 + variation), 0))
+        return fail
+
+    def _handler(self):
+        server = self
+
+        class ReplayHandler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self._route(parse_qs(urlsplit(self.path).query))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                self._route(form)
+
+            def _route(self, params):
+                path = urlsplit(self.path).path
+                params = {key: values[0] for key, values in params.items()}
+
+                if path == "/replay/stats":
+                    return self._send(
+                        200, json.dumps(server.stats()), "application/json"
+                    )
+                if path == "/replay/vehicles":
+                    urls = {
+                        "listed": server.site.vehicle_urls(),
+                        "removed": server.site.vehicle_urls(removed=True),
+                    }
+                    return self._send(200, json.dumps(urls), "application/json")
+
+                route = {
+                    "/": "home",
+                    "/index.cfm": "home",
+                    "/autosusados": "used_cars",
+                    USED_CARS_PATH: "used_cars",
+                    SEARCH_RESULTS_PATH: "results",
+                    VEHICLE_DETAIL_PATH: "detail",
+                }.get(path)
+                if route is None:
+                    server._count("not_found")
+                    return self._send(404, "")
+
+                server._count(route)
+                if server._delay_and_fail():
+                    server._count("errors")
+                    return self._send(503, "Service Unavailable")
+
+                if route == "home":
+                    return self._send(200, server.site.home_page())
+                if route == "used_cars":
+                    return self._send(200, server.site.used_cars_page())
+                if route == "results":
+                    page = params.pop("p", "1")
+                    page = int(page) if page.isdigit() else 1
+                    return self._send(200, server.site.results_page(page, params))
+                return self._detail(params.get("c", ""))
+
+            def _detail(self, vehicle_id):
+                vehicle_id = int(vehicle_id) if vehicle_id.isdigit() else 0
+                if not server.site.is_listed(vehicle_id):
+                    # Anuncio dado de baja: el sitio vuelve al listado
+                    server._count("removed")
+                    self.send_response(302)
+                    self.send_header("Location", USED_CARS_PATH)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                body, _ = server.site.detail(vehicle_id)
+                etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    server._count("not_modified")
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self._send(200, body, headers={"ETag": etag})
+
+            def _send(self, status, body, content_type="text/html", headers=None):
+                if isinstance(body, str):
+                    body = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (ConnectionResetError, BrokenPipeError):
+                    # El cliente cerró una conexión keep-alive; no es un error
+                    # del servidor
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return ReplayHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=REPLAY_HOST)
+    parser.add_argument("--port", type=int, default=REPLAY_PORT)
+    parser.add_argument("--pages", type=int, default=REPLAY_PAGES)
+    parser.add_argument("--cards-per-page", type=int, default=REPLAY_CARDS_PER_PAGE)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to each response."
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.5,
+        help="Random variation of the latency, as a fraction of it.",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of responses answered with HTTP 503.",
+    )
+    parser.add_argument(
+        "--removed-ratio",
+        type=float,
+        default=0.0,
+        help="Fraction of all vehicles whose listing was removed.",
+    )
+    parser.add_argument(
+        "--seed", type=int, help="Seed for reproducible latency and errors."
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    server = ReplayServer(
+        args.host,
+        args.port,
+        args.pages,
+        args.cards_per_page,
+        args.latency,
+        args.jitter,
+        args.error_rate,
+        args.removed_ratio,
+        args.seed,
+    ).start()
+    logger.info(f"Set CRAUTOS_BASE_PATH={server.base_path} to crawl this server.")
+    logger.info(
+        f"Vehicle URLs, including removed ones: {server.origin}/replay/vehicles"
+    )
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        logger.info(f"Requests served: {server.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Etapas del recorrido que se cronometran
+NAVIGATION = "navigation"
+CARD_DISCOVERY = "card_discovery"
+DETAIL_LOAD = "detail_load"
+PARSE = "parse"
+REFORMAT = "reformat"
+DB_WRITE = "db_write"
+SOLD_CHECK = "sold_check"
+STAGES = (
+    NAVIGATION,
+    CARD_DISCOVERY,
+    DETAIL_LOAD,
+    PARSE,
+    REFORMAT,
+    DB_WRITE,
+    SOLD_CHECK,
+)
+
+# Límites superiores en segundos de las cubetas de los histogramas
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+METRICS_PREFIX = "crautos"
+METRICS_PORT = 9108
+
+
+class Histogram:
+    """Histograma acumulado de duraciones con cubetas fijas, como en Prometheus."""
+
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for index, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.bucket_counts[index] += 1
+                break
+
+    def merge(self, other):
+        for index, bucket_count in enumerate(other.bucket_counts):
+            self.bucket_counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def copy(self):
+        histogram = Histogram(self.buckets)
+        histogram.merge(self)
+        return histogram
+
+    def cumulative_counts(self):
+        counts = []
+        running = 0
+        for bucket_count in self.bucket_counts:
+            running += bucket_count
+            counts.append(running)
+        return counts
+
+    def quantile(self, q):
+        """Límite superior de la cubeta donde cae el cuantil q."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, running in zip(self.buckets, self.cumulative_counts()):
+            if running >= rank:
+                return bound
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total, 6),
+            "mean_seconds": round(self.total / self.count, 6) if self.count else None,
+            "max_seconds": round(self.max, 6),
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "buckets": dict(
+                zip([str(bound) for bound in self.buckets], self.cumulative_counts())
+            ),
+        }
+
+
+class RunMetrics:
+    """Tiempos por etapa y contadores por worker de una ejecución.
+
+    Cada medición se guarda bajo el nombre del hilo que la hizo, de modo que
+    el resumen muestra cuánto tiempo pasó cada worker en cada etapa y a qué
+    ritmo avanzó. Se exporta como JSON al final o en formato de texto de
+    Prometheus mientras corre.
+    """
+
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = buckets
+        self.started = time.monotonic()
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _worker(worker):
+        return worker or threading.current_thread().name
+
+    def observe(self, stage, seconds, worker=None):
+        key = (stage, self._worker(worker))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def count(self, name, amount=1, worker=None):
+        key = (name, self._worker(worker))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def time(self, stage, worker=None):
+        """Cronometrar una etapa; si falla se cuenta además en <etapa>_errors."""
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            self.count(f"{stage}_errors", worker=worker)
+            raise
+        finally:
+            self.observe(stage, time.monotonic() - start, worker)
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def summary(self):
+        elapsed = self.elapsed()
+        with self._lock:
+            histograms = {
+                key: histogram.copy() for key, histogram in self._histograms.items()
+            }
+            counters = dict(self._counters)
+
+        stages = {}
+        workers = {}
+        for (stage, worker), histogram in histograms.items():
+            stages.setdefault(stage, Histogram(self.buckets)).merge(histogram)
+            worker_summary = workers.setdefault(
+                worker, {"stages": {}, "counters": {}, "throughput_per_second": {}}
+            )
+            worker_summary["stages"][stage] = {
+                "count": histogram.count,
+                "total_seconds": round(histogram.total, 6),
+            }
+
+        totals = {}
+        for (name, worker), amount in counters.items():
+            totals[name] = totals.get(name, 0) + amount
+            worker_summary = workers.setdefault(
+                worker, {"stages": {}, "counters": {}, "throughput_per_second": {}}
+            )
+            worker_summary["counters"][name] = amount
+            worker_summary["throughput_per_second"][name] = round(amount / elapsed, 6)
+
+        return {
+            "elapsed_seconds": round(elapsed, 3),
+            "stages": {
+                stage: histogram.summary()
+                for stage, histogram in sorted(
+                    stages.items(), key=lambda item: item[1].total, reverse=True
+                )
+            },
+            "counters": totals,
+            "throughput_per_second": {
+                name: round(amount / elapsed, 6) for name, amount in totals.items()
+            },
+            "workers": workers,
+        }
+
+    def write_json(self, path):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.summary(), file, indent=2, ensure_ascii=False)
+        logger.info(f"Run metrics written to {path}.")
+
+    def log_summary(self):
+        summary = self.summary()
+        for stage, stage_summary in summary["stages"].items():
+            logger.info(
+                f"Stage {stage}: {stage_summary['count']} calls, "
+                f"{stage_summary['total_seconds']:.1f}s total, "
+                f"p95 {stage_summary['p95_seconds']}s."
+            )
+        for name, amount in summary["counters"].items():
+            logger.info(
+                f"{name}: {amount} "
+                f"({summary['throughput_per_second'][name]:.3f} per second)."
+            )
+
+    def prometheus_text(self):
+        with self._lock:
+            histograms = sorted(
+                (key, histogram.cumulative_counts(), histogram.count, histogram.total)
+                for key, histogram in self._histograms.items()
+            )
+            counters = sorted(self._counters.items())
+
+        lines = [
+            f"# HELP {METRICS_PREFIX}_stage_seconds Time spent in each crawl stage.",
+            f"# TYPE {METRICS_PREFIX}_stage_seconds histogram",
+        ]
+        for (stage, worker), cumulative, count, total in histograms:
+            labels = f'stage="{stage}",worker="{worker}"'
+            for bound, running in zip(self.buckets, cumulative):
+                lines.append(
+                    f'{METRICS_PREFIX}_stage_seconds_bucket{{{labels},le="{bound}"}} '
+                    f"{running}"
+                )
+            lines.append(
+                f'{METRICS_PREFIX}_stage_seconds_bucket{{{labels},le="+Inf"}} {count}'
+            )
+            lines.append(f"{METRICS_PREFIX}_stage_seconds_sum{{{labels}}} {total}")
+            lines.append(f"{METRICS_PREFIX}_stage_seconds_count{{{labels}}} {count}")
+
+        lines += [
+            f"# HELP {METRICS_PREFIX}_events_total Items processed by each worker.",
+            f"# TYPE {METRICS_PREFIX}_events_total counter",
+        ]
+        for (name, worker), amount in counters:
+            lines.append(
+                f'{METRICS_PREFIX}_events_total{{event="{name}",worker="{worker}"}} '
+                f"{amount}"
+            )
+
+        lines += [
+            f"# HELP {METRICS_PREFIX}_run_seconds Seconds since the run started.",
+            f"# TYPE {METRICS_PREFIX}_run_seconds gauge",
+            f"{METRICS_PREFIX}_run_seconds {self.elapsed()}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def serve_prometheus(self, port=METRICS_PORT, host=""):
+        """Publicar /metrics en un hilo aparte y devolver el servidor."""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(
+            target=server.serve_forever, name="MetricsServer", daemon=True
+        ).start()
+        logger.info(f"Serving Prometheus metrics on port {server.server_port}.")
+        return server
+
+
+def timed(metrics, stage):
+    """Cronometrar con metrics si existe; sin métricas no hace nada."""
+    return metrics.time(stage) if metrics is not None else nullcontext()
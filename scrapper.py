@@ -1,6 +1,5 @@
 # Imports
 import time
-import re
 from datetime import datetime
 import locale
 import logging
@@ -9,6 +8,11 @@ import sys
 import threading
 import random
 import os
+import argparse
+import socket
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -18,6 +22,7 @@ from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.common.exceptions import (
     NoSuchElementException,
     ElementClickInterceptedException,
+    StaleElementReferenceException,
     TimeoutException,
 )
 from selenium.webdriver.support.ui import WebDriverWait
@@ -29,12 +34,97 @@ from webdriver_manager.firefox import GeckoDriverManager
 
 from bs4 import BeautifulSoup
 
-import pyodbc
+import db
+from browser_profiles import (
+    FULL_PROFILE,
+    LEAN_PROFILE,
+    PROFILES,
+    block_resources,
+    browser_cache_dir,
+    configure_chromium_options,
+    configure_firefox_options,
+    remove_browser_cache,
+    remove_browser_cache_dir,
+)
+from checkpoint import CrawlState, load_checkpoint, save_checkpoint
+from crawl_scheduler import KnownPagesStop, PageRangeQueue, run_workers
+from driver_pool import DriverPool, is_driver_alive
+from db import (
+    get_existing_vehicle_urls,
+    get_unsold_vehicle_urls,
+    save_vehicle_details,
+    update_vehicles_exit_date,
+    vehicle_exists,
+)
+from http_fetcher import (
+    CRAUTOS_BASE_PATH,
+    CRAUTOS_SEARCH_RESULTS_PATH,
+    CRAUTOS_USED_CARS_PATH,
+    HttpFetcher,
+    build_search_results_url,
+    extract_total_pages,
+    extract_vehicle_cards,
+)
+from vehicle_parser import (
+    VEHICLE_FIELDS,
+    find_price_colones,
+    find_price_dolares,
+    get_header_parser,
+    HTML_PARSER,
+    parse_card_prices,
+    parse_vehicle_html,
+    reformat_vehicle_details,
+)
+from listing_status import AVAILABLE, EXITED, UNKNOWN
+from sold_checker import find_exited_vehicle_urls, find_exited_vehicle_urls_http
+from page_cache import PAGE_CACHE_MAX_BYTES, PAGE_CACHE_PATH, PageCache
+from page_archive import (
+    ARCHIVE_CODECS,
+    GZIP_CODEC,
+    PAGE_ARCHIVE_DIR,
+    ArchiveReader,
+    PageArchive,
+)
+from rate_limiter import (
+    INITIAL_REQUESTS_PER_SECOND,
+    MAX_REQUESTS_PER_SECOND,
+    MIN_REQUESTS_PER_SECOND,
+    RateLimiter,
+)
+from parse_executor import (
+    PARSE_BACKENDS,
+    PARSE_BATCH_SIZE,
+    ParseExecutor,
+    resolve_backend,
+)
+from pipeline import Pipeline, Stage
+from run_metrics import (
+    CARD_DISCOVERY,
+    DB_WRITE,
+    DETAIL_LOAD,
+    NAVIGATION,
+    PARSE,
+    REFORMAT,
+    SOLD_CHECK,
+    RunMetrics,
+)
+from url_index import UrlIndex
+from work_queue import DONE, FAILED, WorkQueue
+from waits import (
+    LISTING_STATE_WAIT,
+    PAGINATION_WAIT,
+    RESULTS_WAIT,
+    SCROLL_WAIT,
+    SEARCH_WAIT,
+    VEHICLE_DETAIL_WAIT,
+    listing_state,
+    scroll_settled,
+    vehicle_page_state,
+)
 
 
 # GLOBALS
 
-CRAUTOS_BASE_PATH = "https://crautos.com/index.cfm"
 locale.setlocale(locale.LC_TIME, "es_CR.UTF-8")  # Costa Rica
 
 current_date = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -51,35 +141,475 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-existing_vehicle_urls = []
-existing_vehicle_urls_semaphore = threading.Lock()
-database_semaphore = threading.Lock()
+existing_vehicle_urls = UrlIndex()
+# URLs vistos en el listado durante el recorrido actual
+seen_vehicle_urls = UrlIndex()
 sold_vehicles_semaphore = threading.Semaphore()
 
 possible_brands = []
 
-stop_processing = threading.Event()
-start_index = 0
-end_index = float("inf")
+vehicle_writer = None
+crawl_state = None
+
+# Etapas de análisis y guardado de las páginas de detalle descargadas
+vehicle_pipeline = None
+
+# HTML crudo de cada página de detalle, para volver a analizarlo sin el sitio
+page_archive = None
+
+# Pool de procesos para analizar páginas; sin él se analizan en este proceso
+parse_executor = None
+parser_backend = HTML_PARSER
+
+driver_paths = {}
+driver_paths_lock = threading.Lock()
+
+# Todas las descargas de crautos.com pasan por el mismo limitador
+rate_limiter = RateLimiter()
+
+# Caché en disco de las páginas de detalle; None la desactiva
+page_cache = None
+
+# Cambios de precio de los vehículos ya conocidos
+price_history = None
+
+# Tiempos por etapa y contadores por worker de la ejecución
+run_metrics = RunMetrics()
+
+# Número de navegadores que recorren el listado y páginas por rango asignado
+CRAWL_WORKERS = 4
+CRAWL_CHUNK_SIZE = 5
+
+NEXT_PAGE_SELECTOR = ".page-item.page-next .page-link"
+PREV_PAGE_SELECTOR = ".page-item.page-prev .page-link"
+LAST_PAGE_SELECTOR = ".btn-xs.btn-success.pull-right"
+
+# Modo incremental: páginas seguidas sin vehículos nuevos antes de detenerse
+INCREMENTAL_KNOWN_PAGES = 3
+CHECKPOINT_PATH = "crawl_checkpoint.json"
+# Estado del recorrido en curso para reanudarlo si se interrumpe
+CRAWL_STATE_PATH = "crawl_state.json"
+
+# Navegadores que revisan si los vehículos sin fecha de salida siguen publicados
+SOLD_CHECK_BROWSERS = 4
+
+# Número de descargas simultáneas de páginas de detalle con el motor HTTP
+HTTP_WORKERS = 8
+
+# Páginas de resultados que se descargan en paralelo con el motor HTTP
+HTTP_LISTING_WORKERS = 2
+
+# Hilos que analizan páginas de detalle y páginas que esperan en cada etapa;
+# con las colas llenas, los navegadores esperan antes de abrir otra página
+PARSE_WORKERS = 2
+PARSE_QUEUE_SIZE = 16
+PERSIST_QUEUE_SIZE = 64
+
+# Llave con la lista de marcas en el caché de páginas y en el archivo
+BRANDS_META = "brands"
+
+# Cola de trabajo compartida por el coordinador y los workers
+QUEUE_PATH = "crawl_queue.sqlite3"
+QUEUE_LOCAL_WORKERS = 4
+QUEUE_POLL_INTERVAL = 1
+
+PAGE_TASK = "page"
+VEHICLE_TASK = "vehicle"
+SEEN_TASK = "seen"
+LINKS_RESULT = "links"
+VEHICLE_RESULT = "vehicle"
 
 
 def main():
+    global vehicle_writer, vehicle_pipeline, rate_limiter, page_cache, price_history
+    global run_metrics, parse_executor, parser_backend, page_archive
+
+    parser = argparse.ArgumentParser(description="CRAutos scrapper.")
+    parser.add_argument("browser", nargs="?", help="chrome, edge or firefox")
+    parser.add_argument(
+        "--engine",
+        choices=["browser", "http"],
+        default="browser",
+        help="Fetch engine used to crawl the listing and detail pages.",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILES,
+        default=FULL_PROFILE,
+        help=(
+            "lean: headless browsers that skip images, stylesheets, media and "
+            "third-party scripts."
+        ),
+    )
+    parser.add_argument(
+        "--pagination",
+        choices=["click", "url"],
+        default="click",
+        help=(
+            "click: move through the result pages with the next/previous buttons. "
+            "url: open each result page directly by its URL."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=CRAWL_WORKERS,
+        help="Number of browsers crawling the listing pages in parallel.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CRAWL_CHUNK_SIZE,
+        help="Number of listing pages handed to a worker at a time.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Stop paging once several consecutive pages have no new vehicles.",
+    )
+    parser.add_argument(
+        "--known-pages",
+        type=int,
+        default=INCREMENTAL_KNOWN_PAGES,
+        help="Consecutive pages without new vehicles that end an incremental crawl.",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore a saved crawl state and start again from the first page.",
+    )
+    parser.add_argument(
+        "--sold-check",
+        choices=["crawl", "browser", "http"],
+        default="crawl",
+        help=(
+            "crawl: mark vehicles missing from a complete crawl as exited; "
+            "after an incremental or incomplete crawl, check them over HTTP. "
+            "browser: open every unsold vehicle page. "
+            "http: request every unsold vehicle page without a browser."
+        ),
+    )
+    parser.add_argument(
+        "--verify-exits",
+        choices=["browser", "http"],
+        help="With --sold-check crawl, confirm each missing vehicle before marking it.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=db.DB_BATCH_SIZE,
+        help="Number of vehicles inserted per database batch.",
+    )
+    parser.add_argument(
+        "--db-pool-size",
+        type=int,
+        default=db.DB_POOL_SIZE,
+        help="Number of SQL Server connections shared by all workers.",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["standalone", "coordinator", "worker"],
+        default="standalone",
+        help=(
+            "coordinator: queue the result pages in --queue-path and save what "
+            "the workers parse. worker: process queued pages and vehicles."
+        ),
+    )
+    parser.add_argument(
+        "--queue-path",
+        default=QUEUE_PATH,
+        help="SQLite work queue shared by the coordinator and its workers.",
+    )
+    parser.add_argument(
+        "--local-workers",
+        type=int,
+        default=QUEUE_LOCAL_WORKERS,
+        help="Worker processes the coordinator starts on this machine.",
+    )
+    parser.add_argument("--worker-id", help="Name of this worker in the queue.")
+    parser.add_argument(
+        "--requests-per-second",
+        type=float,
+        default=INITIAL_REQUESTS_PER_SECOND,
+        help="Starting request rate per host; it adapts to how the site responds.",
+    )
+    parser.add_argument(
+        "--max-requests-per-second",
+        type=float,
+        default=MAX_REQUESTS_PER_SECOND,
+        help="Ceiling for the adaptive request rate per host.",
+    )
+    parser.add_argument(
+        "--page-cache",
+        default=PAGE_CACHE_PATH,
+        help="SQLite file where detail pages are cached between runs.",
+    )
+    parser.add_argument(
+        "--page-cache-mb",
+        type=int,
+        default=PAGE_CACHE_MAX_BYTES // (1024 * 1024),
+        help="Size of the page cache before the least recently used pages are evicted.",
+    )
+    parser.add_argument(
+        "--no-page-cache",
+        action="store_true",
+        help="Always download detail pages in full and keep no local copy.",
+    )
+    parser.add_argument(
+        "--page-archive",
+        default=PAGE_ARCHIVE_DIR,
+        help="Directory of the compressed archive of raw vehicle pages.",
+    )
+    parser.add_argument(
+        "--archive-codec",
+        choices=ARCHIVE_CODECS,
+        default=GZIP_CODEC,
+        help="Compression of new archive segments; zstd needs the zstandard package.",
+    )
+    parser.add_argument(
+        "--no-page-archive",
+        action="store_true",
+        help="Do not keep the raw HTML of the downloaded vehicle pages.",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=PARSE_WORKERS,
+        help="Threads parsing the downloaded vehicle pages.",
+    )
+    parser.add_argument(
+        "--parse-queue-size",
+        type=int,
+        default=PARSE_QUEUE_SIZE,
+        help="Downloaded pages waiting to be parsed before the fetchers pause.",
+    )
+    parser.add_argument(
+        "--persist-queue-size",
+        type=int,
+        default=PERSIST_QUEUE_SIZE,
+        help="Parsed vehicles waiting for the database writer before parsing pauses.",
+    )
+    parser.add_argument(
+        "--parse-processes",
+        type=int,
+        default=0,
+        help="Parse vehicle pages in this many processes instead of threads (0 disables the process pool).",
+    )
+    parser.add_argument(
+        "--parse-batch-size",
+        type=int,
+        default=PARSE_BATCH_SIZE,
+        help="Pages sent to a parse process at once by --reparse-cache and --reparse-archive; the live crawl sends each page as soon as it is downloaded.",
+    )
+    parser.add_argument(
+        "--parser-backend",
+        choices=PARSE_BACKENDS,
+        default=HTML_PARSER,
+        help="BeautifulSoup parser; lxml is faster but optional.",
+    )
+    parser.add_argument(
+        "--reparse-cache",
+        action="store_true",
+        help="Parse every page in the page cache with all cores, insert new vehicles, rewrite stored ones and exit.",
+    )
+    parser.add_argument(
+        "--reparse-archive",
+        action="store_true",
+        help="Parse the latest archived version of every page with all cores, insert new vehicles, rewrite stored ones and exit.",
+    )
+    parser.add_argument(
+        "--metrics-json",
+        help="File where the per-stage timings and counters are written at the end.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve the run metrics in Prometheus text format on this port.",
+    )
+    args = parser.parse_args()
+    if args.reparse_cache and args.no_page_cache:
+        parser.error("--reparse-cache needs the page cache.")
+
+    run_metrics = RunMetrics()
+    if args.metrics_port is not None:
+        run_metrics.serve_prometheus(args.metrics_port)
+
+    rate_limiter = RateLimiter(
+        args.requests_per_second,
+        min_rate=min(MIN_REQUESTS_PER_SECOND, args.max_requests_per_second),
+        max_rate=args.max_requests_per_second,
+    )
+    if not args.no_page_cache:
+        page_cache = PageCache(args.page_cache, args.page_cache_mb * 1024 * 1024)
+
+    if args.mode == "worker":
+        run_queue_worker(args.queue_path, args.worker_id)
+        run_metrics.write_json(
+            args.metrics_json
+            or os.path.join("logs", f"run_metrics_{current_date}_{os.getpid()}.json")
+        )
+        return
 
     # Verificar si se pasó el navegador como argumento
-    if len(sys.argv) < 2:
+    if args.browser is None:
         logger.warning(
             "No web browser defined to use. Example: py scrapper.py [chrome, edge or firefox]."
         )
         logger.info("Setting Edge as default browser.")
         browser = "edge"
     else:
-        browser = sys.argv[1].lower()
+        browser = args.browser.lower()
+
+    db.init_pool(size=args.db_pool_size)
+
+    vehicle_writer = db.VehicleWriter(
+        batch_size=args.batch_size,
+        spill_path=os.path.join("logs", f"unsaved_vehicles_{current_date}.jsonl"),
+        metrics=run_metrics,
+    )
+    price_history = db.CarPriceHistory(
+        batch_size=args.batch_size,
+        spill_path=os.path.join("logs", f"unsaved_prices_{current_date}.jsonl"),
+        metrics=run_metrics,
+    )
+    price_history.load()
+
+    parser_backend = resolve_backend(args.parser_backend)
+    parse_workers = args.parse_workers
+    reparse = args.reparse_cache or args.reparse_archive
+    if args.parse_processes or reparse:
+        parse_executor = ParseExecutor(
+            args.parse_processes or None,
+            args.parse_batch_size,
+            parser_backend,
+            metrics=run_metrics,
+        )
+        # Cada hilo de análisis espera a un proceso; con menos hilos que
+        # procesos quedarían núcleos sin usar
+        parse_workers = max(parse_workers, parse_executor.processes)
+
+    if reparse:
+        vehicle_updater = db.VehicleUpdater(
+            batch_size=args.batch_size,
+            spill_path=os.path.join(
+                "logs", f"unsaved_vehicle_updates_{current_date}.jsonl"
+            ),
+            metrics=run_metrics,
+        )
+        try:
+            if args.reparse_archive:
+                with ArchiveReader(args.page_archive) as reader:
+                    logger.info(
+                        f"Re-parsing the latest of {len(reader)} archived vehicle pages."
+                    )
+                    reparse_pages(
+                        ((page.url, page.html) for page in reader.iter_latest_pages()),
+                        vehicle_updater,
+                        reader.get_meta(BRANDS_META),
+                    )
+            else:
+                logger.info(f"Re-parsing {len(page_cache)} cached vehicle pages.")
+                reparse_pages(
+                    ((page.url, page.html) for page in page_cache.iter_pages()),
+                    vehicle_updater,
+                    page_cache.get_meta(BRANDS_META),
+                )
+        finally:
+            parse_executor.close()
+            vehicle_updater.close()
+            vehicle_writer.close()
+            price_history.close()
+        db.close_pool()
+        run_metrics.log_summary()
+        run_metrics.write_json(
+            args.metrics_json
+            or os.path.join("logs", f"run_metrics_{current_date}.json")
+        )
+        return
+
+    stages = [
+        Stage("parse", parse_vehicle_stage, parse_workers, args.parse_queue_size),
+        # Un solo hilo consulta y escribe en la base de datos
+        Stage("persist", persist_vehicle, 1, args.persist_queue_size),
+    ]
+    if not args.no_page_archive:
+        page_archive = PageArchive(args.page_archive, args.archive_codec)
+        # Se archiva antes de analizar: una página que falla al analizarse
+        # también queda guardada
+        stages.insert(
+            0, Stage("archive", archive_vehicle_page, 1, args.parse_queue_size)
+        )
+
+    vehicle_pipeline = Pipeline(
+        stages,
+        on_done=vehicle_done,
+        on_error=vehicle_failed,
+        metrics=run_metrics,
+    )
+
+    driver_pool = DriverPool(
+        partial(get_browser_driver, browser, args.profile),
+        max(args.workers, SOLD_CHECK_BROWSERS),
+        on_quit=remove_browser_cache,
+    )
 
     start_time = time.time()
 
-    get_all_data(browser)
+    try:
+        max_known_pages = args.known_pages if args.incremental else None
+        if args.mode == "coordinator":
+            crawl_complete = run_queue_coordinator(
+                args.queue_path,
+                args.local_workers,
+                max_known_pages,
+                resume=not args.restart,
+            )
+        elif args.engine == "http":
+            crawl_complete = get_all_data_http(max_known_pages=max_known_pages)
+        else:
+            crawl_complete = get_all_data(
+                browser,
+                args.workers,
+                args.chunk_size,
+                max_known_pages,
+                resume=not args.restart,
+                driver_pool=driver_pool,
+                pagination=args.pagination,
+            )
+    finally:
+        vehicle_pipeline.close()
+        vehicle_pipeline = None
+        if parse_executor is not None:
+            parse_executor.close()
+            parse_executor = None
+        if page_archive is not None:
+            page_archive.close()
+            page_archive = None
+        vehicle_writer.close()
+        price_history.close()
 
-    check_sold_vehicle(browser)
+    try:
+        if args.sold_check == "crawl" and crawl_complete:
+            logger.info("Sold check: comparing against the complete crawl.")
+            check_sold_vehicles_from_crawl(browser, args.verify_exits, driver_pool)
+        elif args.sold_check == "crawl":
+            # Un recorrido incremental o incompleto no vio todos los vehículos;
+            # revisar cada página sin navegador es lo más rápido
+            logger.info(
+                "Sold check: the crawl was incremental or incomplete; "
+                "requesting every unsold vehicle page over HTTP."
+            )
+            check_sold_vehicles_http()
+        elif args.sold_check == "http":
+            logger.info("Sold check: requesting every unsold vehicle page over HTTP.")
+            check_sold_vehicles_http()
+        else:
+            logger.info("Sold check: opening every unsold vehicle page in a browser.")
+            check_sold_vehicle(browser, driver_pool=driver_pool)
+    finally:
+        driver_pool.close()
+
+    db.close_pool()
 
     end_time = time.time()
     elapsed_time = end_time - start_time
@@ -87,6 +617,10 @@ def main():
     logger.info(
         f"The whole script took {format_elapsed_time(elapsed_time)} to complete."
     )
+    run_metrics.log_summary()
+    run_metrics.write_json(
+        args.metrics_json or os.path.join("logs", f"run_metrics_{current_date}.json")
+    )
 
     os.system("shutdown -s -t 0")
 
@@ -97,238 +631,761 @@ def format_elapsed_time(seconds):
     return f"{int(hours)}h {int(minutes)}m {int(seconds)}s"
 
 
-def get_all_data(browser):
+def get_all_data(
+    browser,
+    workers=CRAWL_WORKERS,
+    chunk_size=CRAWL_CHUNK_SIZE,
+    max_known_pages=None,
+    resume=True,
+    driver_pool=None,
+    pagination="click",
+):
+    global existing_vehicle_urls, seen_vehicle_urls, crawl_state
+
+    if driver_pool is None:
+        driver_pool = DriverPool(
+            partial(get_browser_driver, browser), workers, on_quit=remove_browser_cache
+        )
+        try:
+            return get_all_data(
+                browser,
+                workers,
+                chunk_size,
+                max_known_pages,
+                resume,
+                driver_pool,
+                pagination,
+            )
+        finally:
+            driver_pool.close()
+
+    driver_pool.warm_up(workers)
 
-    start_driver, end_driver = get_drivers(browser)
+    logger.info(f"Starting the scraper with {workers} workers.")
 
-    logger.info("Starting the scraper.")
+    with driver_pool.driver() as driver:
+        total_pages = get_total_pages(driver)
+    logger.info(f"Found {total_pages} pages of vehicles.")
 
-    thread_start = threading.Thread(
-        target=process_from_start, kwargs={"driver": start_driver}, name="StartThread"
+    crawl_state = CrawlState.load(CRAWL_STATE_PATH) if resume else None
+    if crawl_state is None:
+        crawl_state = CrawlState(CRAWL_STATE_PATH)
+    else:
+        logger.info(
+            f"Resuming the crawl started at {crawl_state.started_at}: "
+            f"{crawl_state.completed_pages()} pages already done."
+        )
+    crawl_state.start(total_pages)
+
+    known_pages_stop = None
+    if max_known_pages:
+        # Modo incremental: las páginas más recientes primero, una a la vez
+        known_pages_stop = KnownPagesStop(max_known_pages)
+        chunk_size = 1
+        log_last_checkpoint()
+
+    page_queue = PageRangeQueue(total_pages, chunk_size, crawl_state.pending_pages())
+    existing_vehicle_urls = UrlIndex(get_existing_vehicle_urls())
+    seen_vehicle_urls = UrlIndex(crawl_state.seen_urls())
+
+    if crawl_state.in_flight_urls():
+        with driver_pool.driver() as driver:
+            process_in_flight_vehicles(driver)
+
+    run_workers(
+        process_page_ranges,
+        [
+            (driver_pool, page_queue, total_pages, known_pages_stop, pagination)
+            for _ in range(workers)
+        ],
     )
-    thread_end = threading.Thread(
-        target=process_from_end, kwargs={"driver": end_driver}, name="EndThread"
+
+    if page_queue.pending() or page_queue.failed:
+        logger.error(
+            f"{page_queue.pending() + len(page_queue.failed)} page ranges were left unprocessed."
+        )
+        crawl_state.save(force=True)
+        return False
+
+    # Los vehículos en vuelo quedan en el estado hasta que se guardan
+    if vehicle_pipeline is not None:
+        vehicle_pipeline.drain()
+    crawl_state.finish()
+
+    if known_pages_stop:
+        save_incremental_checkpoint(
+            known_pages_stop, known_pages_stop.stop_page or total_pages
+        )
+        return known_pages_stop.stop_page is None
+
+    logger.info("Data Collection is done. No errors.")
+    return True
+
+
+def process_in_flight_vehicles(driver):
+    # Vehículos que la ejecución anterior dejó a medias
+    for link in crawl_state.in_flight_urls():
+        logger.info(f"Resuming vehicle left in flight: {link}")
+        try:
+            if not is_known_vehicle_url(link):
+                process_vehicle_link(driver, link)
+            else:
+                crawl_state.remove_in_flight(link)
+        except Exception as e:
+            logger.error(f"An error occurred while resuming vehicle {link}: {e}")
+
+
+def reparse_pages(pages, vehicle_updater, brands=None):
+    """Volver a analizar (url, html) ya descargados y guardar los vehículos.
+
+    Los vehículos nuevos se insertan y los que ya están en Cars se reescriben
+    con vehicle_updater, para que una corrección del análisis llegue a las
+    filas guardadas. Los precios no se registran: el HTML puede ser viejo y
+    el historial los fecharía hoy.
+
+    brands es la lista de marcas que se guardó junto a las páginas; solo si
+    falta se descarga la página de autos usados.
+    """
+    global possible_brands
+
+    if brands:
+        possible_brands = brands
+    else:
+        # Un caché o archivo anterior a que se guardaran las marcas
+        logger.warning("No brand list was saved with the pages; downloading it.")
+        with HttpFetcher(pool_size=1, rate_limiter=rate_limiter) as fetcher:
+            possible_brands = extract_brands_from_html(
+                fetcher.fetch(CRAUTOS_USED_CARS_PATH)
+            )
+
+    stored_urls = UrlIndex(get_existing_vehicle_urls())
+    for link, vehicle_details, error in parse_executor.map(pages, possible_brands):
+        if error is not None:
+            logger.error(f"Could not parse cached page {link}: {error}")
+            continue
+        vehicle_details["URL"] = link
+        # add devuelve False si el URL ya estaba guardado
+        if stored_urls.add(link):
+            store_vehicle_details(vehicle_details)
+        else:
+            vehicle_updater.add(vehicle_details)
+
+
+def save_brands(brands):
+    """Guardar las marcas junto a las páginas para volver a analizarlas sin
+    conexión."""
+    if not brands:
+        return
+    for store in (page_cache, page_archive):
+        if store is not None:
+            store.set_meta(BRANDS_META, brands)
+
+
+def log_last_checkpoint():
+    checkpoint = load_checkpoint(CHECKPOINT_PATH)
+    if checkpoint:
+        logger.info(
+            f"Last incremental crawl finished at {checkpoint['finished_at']} "
+            f"on page {checkpoint['last_page']} with {checkpoint['new_vehicles']} new vehicles."
+        )
+
+
+def save_incremental_checkpoint(known_pages_stop, last_page):
+    save_checkpoint(
+        CHECKPOINT_PATH,
+        {
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "last_page": last_page,
+            "new_vehicles": known_pages_stop.total_new_vehicles(),
+        },
     )
 
-    thread_start.start()
-    thread_end.start()
 
-    thread_start.join()
-    thread_end.join()
+def get_all_data_http(
+    workers=HTTP_WORKERS, max_known_pages=None, listing_workers=HTTP_LISTING_WORKERS
+):
+    global possible_brands, existing_vehicle_urls, seen_vehicle_urls
+
+    logger.info(f"Starting the scraper with the HTTP engine ({workers} workers).")
+
+    with HttpFetcher(
+        pool_size=workers + listing_workers,
+        rate_limiter=rate_limiter,
+        cache=page_cache,
+    ) as fetcher:
+        possible_brands = extract_brands_from_html(
+            fetcher.fetch(CRAUTOS_USED_CARS_PATH)
+        )
+        save_brands(possible_brands)
+        existing_vehicle_urls = UrlIndex(get_existing_vehicle_urls())
+        seen_vehicle_urls = UrlIndex()
+
+        known_pages_stop = None
+        if max_known_pages:
+            known_pages_stop = KnownPagesStop(max_known_pages)
+            log_last_checkpoint()
+
+        first_page_html, _ = fetcher.fetch_search_results()
+        total_pages = extract_total_pages(first_page_html)
+        if total_pages is None:
+            logger.warning("Could not read the number of result pages.")
+            total_pages = 1
+        logger.info(f"Found {total_pages} pages of vehicles.")
+
+        # Cada página se pide por su URL, así que se reparten una por una
+        page_queue = PageRangeQueue(total_pages, 1)
+
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="HttpWorker"
+        ) as executor:
+            run_workers(
+                process_result_pages_http,
+                [
+                    (fetcher, executor, page_queue, first_page_html, known_pages_stop)
+                    for _ in range(listing_workers)
+                ],
+                name="HttpListingWorker",
+            )
+
+    if page_queue.pending() or page_queue.failed:
+        logger.error(
+            f"{page_queue.pending() + len(page_queue.failed)} pages were left unprocessed."
+        )
+        return False
+
+    if known_pages_stop:
+        save_incremental_checkpoint(
+            known_pages_stop, known_pages_stop.stop_page or total_pages
+        )
+        return known_pages_stop.stop_page is None
 
     logger.info("Data Collection is done. No errors.")
+    return True
 
 
-def process_from_start(driver):
-    global start_index, end_index, existing_vehicle_urls
-    try:
-        driver.get(CRAUTOS_BASE_PATH)
-        logger.info("Navigated to base URL.")
+def process_result_pages_http(
+    fetcher, executor, page_queue, first_page_html, known_pages_stop=None
+):
+    while True:
+        page_range = page_queue.get()
+        if page_range is None:
+            break
 
-        get_to_all_cars_list(driver)
-        logger.info("Navigated to the list of all cars.")
+        page, _ = page_range
+        if known_pages_stop and known_pages_stop.should_skip(page):
+            continue
 
-        existing_vehicle_urls = get_existing_vehicle_urls()
+        try:
+            if page == 1:
+                html = first_page_html
+            else:
+                with run_metrics.time(NAVIGATION):
+                    html = fetcher.fetch_results_page(page)
+            page_url = build_search_results_url(page)
+            with run_metrics.time(CARD_DISCOVERY):
+                cards = extract_vehicle_cards(html, page_url)
+        except Exception as e:
+            logger.error(f"An error occurred on page {page}: {e}")
+            page_queue.put_back(page, page)
+            continue
 
-        while not stop_processing.is_set():
-            process_current_view_cars(driver)
-            start_index = get_current_page_index(driver)
+        logger.info(f"Found {len(cards)} vehicle links on page {page}.")
+        run_metrics.count("pages")
+        run_metrics.count("vehicle_cards", len(cards))
 
-            # Going to next page
-            try:
-                next_button = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable(
-                        (By.CSS_SELECTOR, ".page-item.page-next .page-link")
-                    )
-                )
-                driver.execute_script("arguments[0].click();", next_button)
-                start_index += 1
+        new_links = filter_new_vehicle_cards(cards)
+        list(executor.map(partial(process_vehicle_link_http, fetcher), new_links))
 
-                current_url = driver.current_url
-                logger.info(
-                    f"Clicked the next page button. Going to page {start_index + 1}"
-                )
-                logger.info(f"Next page URL: {current_url}")
-            except TimeoutException:
-                logger.info("No more pages left to process.")
-                stop_processing.set()
+        if known_pages_stop and known_pages_stop.record_page(page, len(new_links)):
+            page_queue.drop_after(known_pages_stop.stop_page)
 
-            if start_index > end_index:
-                logger.info(f"start_index: {start_index}.")
-                logger.info(f"end_index: {end_index}.")
-                logger.info(
-                    "Start thread is same as End thread. Stopping parallel execution."
-                )
-                stop_processing.set()
 
-    except Exception as e:
-        logger.error(f"An error occurred: {e}")
-        stop_processing.set()
-    finally:
-        driver.quit()
-        logger.info("Closed the web driver.")
+def run_queue_coordinator(
+    queue_path=QUEUE_PATH,
+    local_workers=QUEUE_LOCAL_WORKERS,
+    max_known_pages=None,
+    resume=True,
+):
+    global possible_brands, existing_vehicle_urls, seen_vehicle_urls
 
+    if not resume:
+        WorkQueue.reset(queue_path)
+    work_queue = WorkQueue(queue_path)
 
-def get_drivers(browser):
-    if browser == "chrome":
-        start_driver = get_Chrome_driver()
-        end_driver = get_Chrome_driver()
-    elif browser == "edge":
-        start_driver = get_Edge_driver()
-        end_driver = get_Edge_driver()
-    elif browser == "firefox":
-        start_driver = get_Firexfox_driver()
-        end_driver = get_Firexfox_driver()
-    return start_driver, end_driver
+    total_pages = work_queue.get_meta("total_pages")
+    with HttpFetcher(rate_limiter=rate_limiter) as fetcher:
+        possible_brands = extract_brands_from_html(
+            fetcher.fetch(CRAUTOS_USED_CARS_PATH)
+        )
+        save_brands(possible_brands)
+        if total_pages is None:
+            first_page_html, _ = fetcher.fetch_search_results()
+            total_pages = extract_total_pages(first_page_html) or 1
+            work_queue.put(PAGE_TASK, range(1, total_pages + 1))
+            work_queue.set_meta("total_pages", total_pages)
+        else:
+            logger.info(
+                f"Resuming the work queue at {queue_path}: {work_queue.counts()}"
+            )
 
+    work_queue.set_meta("brands", possible_brands)
+    work_queue.set_meta("finished", False)
+    logger.info(f"Queued {total_pages} pages of vehicles in {queue_path}.")
 
-def process_from_end(driver):
-    global start_index, end_index, existing_vehicle_urls
+    existing_vehicle_urls = UrlIndex(get_existing_vehicle_urls())
+    seen_vehicle_urls = UrlIndex(work_queue.payloads(SEEN_TASK))
+
+    known_pages_stop = None
+    if max_known_pages:
+        known_pages_stop = KnownPagesStop(max_known_pages)
+        log_last_checkpoint()
+
+    workers = start_local_queue_workers(queue_path, local_workers)
     try:
-        driver.get(CRAUTOS_BASE_PATH)
-        logger.info("Navigated to base URL.")
+        while True:
+            # Revisar primero si la cola se vació para no perder los
+            # resultados que lleguen entre las dos consultas
+            drained = work_queue.is_drained()
+            results = work_queue.peek_results()
+            for result in results:
+                handle_queue_result(work_queue, result, total_pages, known_pages_stop)
+            if results:
+                # Confirmar los resultados solo cuando los vehículos ya están
+                # en la base de datos (o en el archivo de no guardados)
+                if vehicle_writer is not None:
+                    vehicle_writer.flush()
+                work_queue.ack_results(results)
+
+            if drained and not results:
+                break
+            # Los workers locales solo terminan cuando se marca "finished":
+            # si todos salieron antes, se cayeron y la cola no avanzará
+            if workers and all(worker.poll() is not None for worker in workers):
+                exit_codes = [worker.returncode for worker in workers]
+                logger.error(
+                    f"All local queue workers exited (codes {exit_codes}); "
+                    f"the queue at {queue_path} is left to resume."
+                )
+                return False
+            if not results:
+                time.sleep(QUEUE_POLL_INTERVAL)
 
-        get_to_all_cars_list(driver)
-        logger.info("Navigated to the list of all cars.")
+        failed_pages = work_queue.payloads(PAGE_TASK, FAILED)
+        failed_vehicles = work_queue.payloads(VEHICLE_TASK, FAILED)
+    finally:
+        work_queue.set_meta("finished", True)
+        for worker in workers:
+            worker.wait()
+        work_queue.close()
+
+    if failed_vehicles:
+        logger.error(f"{len(failed_vehicles)} vehicles could not be processed.")
+    if failed_pages:
+        logger.error(f"{len(failed_pages)} pages were left unprocessed.")
+        return False
 
-        last_page_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable(
-                (By.CSS_SELECTOR, ".btn-xs.btn-success.pull-right")
+    WorkQueue.reset(queue_path)
+
+    if known_pages_stop:
+        save_incremental_checkpoint(
+            known_pages_stop, known_pages_stop.stop_page or total_pages
+        )
+        return known_pages_stop.stop_page is None
+
+    logger.info("Data Collection is done. No errors.")
+    return True
+
+
+def start_local_queue_workers(queue_path, count):
+    # Procesos independientes: el análisis del HTML no compite por el GIL
+    return [
+        subprocess.Popen(
+            local_worker_command(
+                queue_path, f"{socket.gethostname()}-local-{index}", count
             )
         )
-        driver.execute_script("arguments[0].click();", last_page_button)
+        for index in range(count)
+    ]
+
+
+def local_worker_command(queue_path, worker_id, count):
+    # Cada proceso tiene su propio limitador: el ritmo configurado se reparte
+    # entre los workers para que juntos no lo superen
+    max_rate = rate_limiter.aimd_options.get("max_rate", MAX_REQUESTS_PER_SECOND)
+    command = [
+        sys.executable,
+        os.path.abspath(__file__),
+        "--mode",
+        "worker",
+        "--queue-path",
+        queue_path,
+        "--worker-id",
+        worker_id,
+        "--requests-per-second",
+        str(rate_limiter.rate / count),
+        "--max-requests-per-second",
+        str(max_rate / count),
+    ]
+    if page_cache is None:
+        command.append("--no-page-cache")
+    else:
+        command += [
+            "--page-cache",
+            page_cache.path,
+            "--page-cache-mb",
+            str(page_cache.max_bytes // (1024 * 1024)),
+        ]
+    return command
+
+
+def handle_queue_result(work_queue, result, total_pages, known_pages_stop=None):
+    if result.kind == LINKS_RESULT:
+        page, cards = result.data["page"], result.data["cards"]
+        logger.info(f"Found {len(cards)} vehicle links on page {page}.")
+
+        work_queue.put(SEEN_TASK, [card["URL"] for card in cards], status=DONE)
+        new_links = filter_new_vehicle_cards(cards)
+        work_queue.put(VEHICLE_TASK, new_links)
+
+        if known_pages_stop and known_pages_stop.record_page(page, len(new_links)):
+            work_queue.cancel(
+                PAGE_TASK, range(known_pages_stop.stop_page + 1, total_pages + 1)
+            )
+
+    elif result.kind == VEHICLE_RESULT:
+        persist_vehicle(result.data)
 
-        existing_vehicle_urls = get_existing_vehicle_urls()
 
-        while not stop_processing.is_set():
-            process_current_view_cars(driver)
+def run_queue_worker(queue_path=QUEUE_PATH, worker_id=None):
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    work_queue = WorkQueue(queue_path)
+    logger.info(f"Queue worker {worker_id} started on {queue_path}.")
+
+    with HttpFetcher(rate_limiter=rate_limiter, cache=page_cache) as fetcher:
+        while True:
+            brands = work_queue.get_meta("brands")
+            task = work_queue.claim(worker_id) if brands is not None else None
+            if task is None:
+                if work_queue.get_meta("finished"):
+                    break
+                time.sleep(QUEUE_POLL_INTERVAL)
+                continue
 
-            end_index = get_current_page_index(driver)
             try:
-                next_button = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable(
-                        (By.CSS_SELECTOR, ".page-item.page-prev .page-link")
-                    )
+                results = process_queue_task(fetcher, task, brands)
+            except Exception as e:
+                logger.error(
+                    f"An error occurred on {task.kind} task {task.payload}: {e}"
                 )
-                driver.execute_script("arguments[0].click();", next_button)
+                work_queue.fail(task, e)
+                continue
+            work_queue.complete(task, results)
 
-                current_url = driver.current_url
-                logger.info(
-                    f"Clicked the next page button. Going to page {end_index - 1}"
-                )
-                logger.info(f"Next page URL: {current_url}")
-            except TimeoutException:
-                logger.info("No more pages left to process.")
-                stop_processing.set()
+    work_queue.close()
+    logger.info(f"Queue worker {worker_id} finished.")
+
+
+def process_queue_task(fetcher, task, brands):
+    if task.kind == PAGE_TASK:
+        page = int(task.payload)
+        with run_metrics.time(NAVIGATION):
+            html = fetcher.fetch_results_page(page)
+        with run_metrics.time(CARD_DISCOVERY):
+            cards = extract_vehicle_cards(html, build_search_results_url(page))
+        run_metrics.count("pages")
+        run_metrics.count("vehicle_cards", len(cards))
+        return [(LINKS_RESULT, {"page": page, "cards": cards})]
+
+    if task.kind == VEHICLE_TASK:
+        link = task.payload
+        with run_metrics.time(DETAIL_LOAD):
+            html, _ = fetcher.fetch_page(link)
+        vehicle_details = parse_vehicle_page(html, brands)
+        vehicle_details["URL"] = link
+        return [(VEHICLE_RESULT, vehicle_details)]
+
+    raise ValueError(f"Unknown task kind: {task.kind}")
 
-            if end_index < start_index:
-                logger.info(
-                    "End thread is same as Start thread. Stopping parallel execution."
-                )
-                stop_processing.set()
 
+def process_vehicle_link_http(fetcher, link):
+    try:
+        with run_metrics.time(DETAIL_LOAD):
+            html, changed = fetcher.fetch_page(link)
+        # Página idéntica a la copia en caché de un vehículo ya guardado
+        if not changed and vehicle_exists(link):
+            logger.info(f"Vehicle page unchanged since the last fetch: {link}")
+            run_metrics.count("vehicles_unchanged")
+            return
     except Exception as e:
-        logger.error(f"An error occurred: {e}")
-        stop_processing.set()
-    finally:
-        driver.quit()
-        logger.info("Closed the web driver.")
+        logger.error(f"An error occurred while processing vehicle {link}: {e}")
+        existing_vehicle_urls.discard(link)
+        return
 
+    handle_vehicle_page(link, html)
 
-def process_urls(driver, urls):
-    while True:
-        with sold_vehicles_semaphore:
-            if not urls:
+
+def process_page_ranges(
+    driver_pool, page_queue, total_pages, known_pages_stop=None, pagination="click"
+):
+    driver = None
+    try:
+        while True:
+            page_range = page_queue.get()
+            if page_range is None:
+                logger.info("No more pages left to process.")
                 break
-            logger.info(f"Pending Vehicles to check availability: {len(urls)}")
-            url = random.choice(urls)
-            urls.remove(url)
 
+            first, last = page_range
+            logger.info(f"Processing pages {first}-{last}.")
+            for page in range(first, last + 1):
+                if known_pages_stop and known_pages_stop.should_skip(page):
+                    break
+                try:
+                    if driver is None:
+                        driver = driver_pool.acquire()
+                        if pagination == "click":
+                            with run_metrics.time(NAVIGATION):
+                                open_results_list(driver)
+                    with run_metrics.time(NAVIGATION):
+                        if pagination == "url":
+                            open_results_page(driver, page)
+                        else:
+                            navigate_to_page(driver, page, total_pages)
+                    new_vehicles = process_current_view_cars(driver)
+                    # La página de resultados y una pestaña por vehículo nuevo
+                    driver_pool.record_page(driver, 1 + new_vehicles)
+                    run_metrics.count("pages")
+                except Exception as e:
+                    logger.error(f"An error occurred on page {page}: {e}")
+                    page_queue.put_back(page, last)
+                    # El pool revisa el navegador antes de volver a entregarlo
+                    if driver is not None:
+                        driver_pool.release(driver)
+                        driver = None
+                    break
+
+                crawl_state.mark_page_done(page)
+
+                if known_pages_stop and known_pages_stop.record_page(
+                    page, new_vehicles
+                ):
+                    page_queue.drop_after(known_pages_stop.stop_page)
+
+                if driver_pool.needs_recycle(driver):
+                    driver_pool.release(driver)
+                    driver = None
+
+    finally:
+        if driver is not None:
+            driver_pool.release(driver)
+
+
+def open_results_page(driver, page):
+    # Acceso directo a la página sin recorrer las anteriores
+    url = build_search_results_url(page)
+    with rate_limiter.request(url):
+        driver.get(url)
+        get_current_page_index(driver)
+    logger.info(f"Opened results page {page}. URL: {driver.current_url}")
+
+
+def open_results_list(driver):
+    # Un navegador del pool puede estar ya en el listado de resultados
+    if driver.find_elements(By.CSS_SELECTOR, ".page-item.active .page-link"):
+        return
+
+    with rate_limiter.request(CRAUTOS_BASE_PATH):
+        driver.get(CRAUTOS_BASE_PATH)
+    logger.info("Navigated to base URL.")
+
+    get_to_all_cars_list(driver)
+    logger.info("Navigated to the list of all cars.")
+
+
+def get_total_pages(driver):
+    with rate_limiter.request(CRAUTOS_BASE_PATH):
+        driver.get(CRAUTOS_BASE_PATH)
+    logger.info("Navigated to base URL.")
+
+    get_to_all_cars_list(driver)
+    logger.info("Navigated to the list of all cars.")
+
+    first_page = get_current_page_index(driver)
+    return change_page(driver, LAST_PAGE_SELECTOR, first_page)
+
+
+def navigate_to_page(driver, target_page, total_pages):
+    current_page = get_current_page_index(driver)
+
+    # Saltar a la última página si queda más cerca que caminar desde la actual
+    if total_pages - target_page + 1 < abs(current_page - target_page):
+        current_page = change_page(driver, LAST_PAGE_SELECTOR, current_page)
+
+    while current_page != target_page:
+        if current_page < target_page:
+            current_page = change_page(driver, NEXT_PAGE_SELECTOR, current_page)
+        else:
+            current_page = change_page(driver, PREV_PAGE_SELECTOR, current_page)
+
+    logger.info(f"Current page: {current_page}. URL: {driver.current_url}")
+
+
+def change_page(driver, selector, current_page):
+    # Cada clic carga una página de resultados nueva del sitio
+    with rate_limiter.request(CRAUTOS_SEARCH_RESULTS_PATH):
+        click_page_button(driver, selector)
+        return wait_for_page_change(driver, current_page)
+
+
+def click_page_button(driver, selector):
+    button = PAGINATION_WAIT.until(
+        driver, EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
+    )
+    driver.execute_script("arguments[0].click();", button)
+
+
+def wait_for_page_change(driver, previous_page):
+    def page_changed(driver):
         try:
-            driver.get(url)
-            # Esperar hasta que el elemento esté presente
-            WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located(
-                    (
-                        By.CSS_SELECTOR,
-                        "a[href='#tab-1'].active[data-bs-toggle='tab'][aria-selected='true'][role='tab']",
-                    )
-                )
-            )
-            logger.info(f"Vehicle at {url} is still available.")
-        except (NoSuchElementException, Exception):
-            logger.info(f"Vehicle at {url} is no longer available. Updating exit date.")
-            update_vehicle_exit_date(url)
+            current_page = get_current_page_index(driver)
+        except StaleElementReferenceException:
+            return False
+        return current_page if current_page != previous_page else False
+
+    return PAGINATION_WAIT.until(driver, page_changed)
+
+
+def get_browser_driver(browser, profile=FULL_PROFILE):
+    if browser == "chrome":
+        return get_Chrome_driver(profile)
+    elif browser == "edge":
+        return get_Edge_driver(profile)
+    elif browser == "firefox":
+        return get_Firexfox_driver(profile)
+    raise ValueError(f"Unsupported browser: {browser}")
 
 
-def check_sold_vehicle(browser):
-    driver_A, driver_B = get_drivers(browser)
-    driver_C, driver_D = get_drivers(browser)
+def process_urls(driver_pool, urls, exited_urls):
+    driver = None
+    try:
+        while True:
+            with sold_vehicles_semaphore:
+                if not urls:
+                    break
+                logger.info(f"Pending Vehicles to check availability: {len(urls)}")
+                url = urls.pop()
+
+            if driver is None:
+                driver = driver_pool.acquire()
+
+            try:
+                with run_metrics.time(SOLD_CHECK), rate_limiter.request(url):
+                    driver.get(url)
+                    # Termina en cuanto la página indica si el anuncio sigue publicado
+                    state = LISTING_STATE_WAIT.until(driver, listing_state)
+            except Exception as e:
+                if not is_driver_alive(driver):
+                    # El navegador se cayó: el vehículo no se pudo revisar
+                    with sold_vehicles_semaphore:
+                        urls.append(url)
+                    driver_pool.discard(driver)
+                    driver = None
+                    continue
+
+                # Un timeout no prueba que el anuncio salió: una página lenta
+                # sigue publicada. Se revisa de nuevo en la próxima ejecución
+                logger.warning(f"Could not check the availability of {url}: {e}")
+                state = UNKNOWN
+
+            run_metrics.count(f"vehicles_{state}")
+            if state == AVAILABLE:
+                logger.info(f"Vehicle at {url} is still available.")
+            elif state == EXITED:
+                logger.info(f"Vehicle at {url} is no longer available.")
+                with sold_vehicles_semaphore:
+                    exited_urls.append(url)
+
+            driver_pool.record_page(driver)
+            if driver_pool.needs_recycle(driver):
+                driver_pool.release(driver)
+                driver = None
+    finally:
+        if driver is not None:
+            driver_pool.release(driver)
+
+
+def check_sold_vehicle(browser, urls=None, driver_pool=None):
+    if driver_pool is None:
+        driver_pool = DriverPool(
+            partial(get_browser_driver, browser),
+            SOLD_CHECK_BROWSERS,
+            on_quit=remove_browser_cache,
+        )
+        try:
+            return check_sold_vehicle(browser, urls, driver_pool)
+        finally:
+            driver_pool.close()
 
-    drivers = [driver_A, driver_B, driver_C, driver_D]
+    driver_pool.warm_up(SOLD_CHECK_BROWSERS)
 
     logger.info("Checking sold vehicles")
 
-    urls = get_unsold_vehicle_urls()
+    if urls is None:
+        urls = get_unsold_vehicle_urls()
+    # Mezclar para repartir los vehículos entre los navegadores
+    urls = list(urls)
+    random.shuffle(urls)
 
-    threads = []
+    exited_urls = []
 
-    for driver in drivers:
-        thread = threading.Thread(target=process_urls, args=(driver, urls))
-        thread.start()
-        threads.append(thread)
+    run_workers(
+        process_urls,
+        [(driver_pool, urls, exited_urls) for _ in range(SOLD_CHECK_BROWSERS)],
+        name="SoldCheckWorker",
+    )
 
-    for thread in threads:
-        thread.join()
+    mark_vehicles_exited(exited_urls)
 
-    for driver in drivers:
-        driver.quit()
 
+def check_sold_vehicles_http(urls=None):
+    logger.info("Checking sold vehicles over HTTP.")
 
-def update_vehicle_exit_date(url):
-    try:
-        with pyodbc.connect(
-            driver="SQL Server",
-            server="FABIAN\\SQLEXPRESS",
-            database="CRAutos",
-            trusted_connection="yes",
-        ) as conn:
-            with database_semaphore:
-                cursor = conn.cursor()
-                current_date = datetime.now()
-                cursor.execute(
-                    "UPDATE Cars SET dateExited = ? WHERE URL = ?", (current_date, url)
-                )
-                conn.commit()
-                cursor.close()
-    except pyodbc.Error as e:
-        logger.error(f"Database error: {e}")
+    if urls is None:
+        urls = get_unsold_vehicle_urls()
 
+    mark_vehicles_exited(
+        find_exited_vehicle_urls_http(
+            urls, rate_limiter=rate_limiter, cache=page_cache, metrics=run_metrics
+        )
+    )
 
-def get_unsold_vehicle_urls():
-    try:
-        with pyodbc.connect(
-            driver="SQL Server",
-            server="FABIAN\\SQLEXPRESS",
-            database="CRAutos",
-            trusted_connection="yes",
-        ) as conn:
-            with database_semaphore:
-                cursor = conn.cursor()
-                cursor.execute("SELECT URL FROM Cars WHERE dateExited IS NULL")
-                urls = cursor.fetchall()
-                cursor.close()
-                return [url.URL for url in urls]
-    except pyodbc.Error as e:
-        logger.error(f"Database error: {e}")
-        return []
+
+def check_sold_vehicles_from_crawl(browser, verify=None, driver_pool=None):
+    logger.info("Checking sold vehicles against the current crawl.")
+
+    exited_urls = find_exited_vehicle_urls(get_unsold_vehicle_urls(), seen_vehicle_urls)
+
+    # Confirmar uno por uno solo los vehículos que desaparecieron del listado
+    if verify == "browser" and exited_urls:
+        check_sold_vehicle(browser, exited_urls, driver_pool)
+    elif verify == "http" and exited_urls:
+        check_sold_vehicles_http(exited_urls)
+    else:
+        mark_vehicles_exited(exited_urls)
+
+
+def mark_vehicles_exited(urls):
+    with run_metrics.time(DB_WRITE):
+        updated = update_vehicles_exit_date(urls)
+    run_metrics.count("exit_dates_updated", updated)
 
 
 def get_current_page_index(driver):
-    current_page_element = WebDriverWait(driver, 10).until(
+    current_page_element = PAGINATION_WAIT.until(
+        driver,
         EC.presence_of_element_located(
             (By.CSS_SELECTOR, ".page-item.active .page-link")
-        )
+        ),
     )
 
     active_page_number = current_page_element.text.strip()
@@ -336,7 +1393,20 @@ def get_current_page_index(driver):
     return int(active_page_number)
 
 
-def get_Chrome_driver():
+def get_driver_path(browser):
+    # Resolver el ejecutable del driver una sola vez por ejecución
+    with driver_paths_lock:
+        if browser not in driver_paths:
+            if browser == "chrome":
+                driver_paths[browser] = ChromeDriverManager().install()
+            elif browser == "edge":
+                driver_paths[browser] = EdgeChromiumDriverManager().install()
+            elif browser == "firefox":
+                driver_paths[browser] = GeckoDriverManager().install()
+        return driver_paths[browser]
+
+
+def get_Chrome_driver(profile=FULL_PROFILE):
     options = webdriver.ChromeOptions()
     options.add_argument("enable-automation")
     options.add_argument("--no-sandbox")
@@ -346,15 +1416,24 @@ def get_Chrome_driver():
     options.add_argument("--window-size=1920,1080")
     options.add_argument("--disable-infobars")
     options.add_argument("--disable-translate")
+    # Se borra al cerrar el navegador en DriverPool
+    cache_dir = browser_cache_dir() if profile == LEAN_PROFILE else None
+    configure_chromium_options(options, profile, cache_dir)
 
-    logger.info("Starting the scraper with Chrome.")
-    driver = webdriver.Chrome(
-        service=ChromeService(ChromeDriverManager().install()), options=options
-    )
+    logger.info(f"Starting the scraper with Chrome ({profile} profile).")
+    try:
+        driver = webdriver.Chrome(
+            service=ChromeService(get_driver_path("chrome")), options=options
+        )
+    except Exception:
+        remove_browser_cache_dir(cache_dir)
+        raise
+    driver.browser_cache_dir = cache_dir
+    block_resources(driver, profile)
     return driver
 
 
-def get_Edge_driver():
+def get_Edge_driver(profile=FULL_PROFILE):
     options = webdriver.EdgeOptions()
     options.add_argument("enable-automation")
     options.add_argument("--no-sandbox")
@@ -364,23 +1443,40 @@ def get_Edge_driver():
     options.add_argument("--window-size=1920,1080")
     options.add_argument("--disable-infobars")
     options.add_argument("--disable-translate")
+    # Se borra al cerrar el navegador en DriverPool
+    cache_dir = browser_cache_dir() if profile == LEAN_PROFILE else None
+    configure_chromium_options(options, profile, cache_dir)
 
-    logger.info("Starting the scraper with Edge.")
-    driver = webdriver.Edge(
-        service=EdgeService(EdgeChromiumDriverManager().install()), options=options
-    )
+    logger.info(f"Starting the scraper with Edge ({profile} profile).")
+    try:
+        driver = webdriver.Edge(
+            service=EdgeService(get_driver_path("edge")), options=options
+        )
+    except Exception:
+        remove_browser_cache_dir(cache_dir)
+        raise
+    driver.browser_cache_dir = cache_dir
+    block_resources(driver, profile)
     return driver
 
 
-def get_Firexfox_driver():
+def get_Firexfox_driver(profile=FULL_PROFILE):
     options = webdriver.FirefoxOptions()
     options.add_argument("--width=1920")
     options.add_argument("--height=1080")
+    # Se borra al cerrar el navegador en DriverPool
+    cache_dir = browser_cache_dir() if profile == LEAN_PROFILE else None
+    configure_firefox_options(options, profile, cache_dir)
 
-    logger.info("Starting the scraper with Firefox.")
-    driver = webdriver.Firefox(
-        service=FirefoxService(GeckoDriverManager().install()), options=options
-    )
+    logger.info(f"Starting the scraper with Firefox ({profile} profile).")
+    try:
+        driver = webdriver.Firefox(
+            service=FirefoxService(get_driver_path("firefox")), options=options
+        )
+    except Exception:
+        remove_browser_cache_dir(cache_dir)
+        raise
+    driver.browser_cache_dir = cache_dir
     return driver
 
 
@@ -392,6 +1488,7 @@ def get_to_all_cars_list(driver):
 
     global possible_brands
     possible_brands = extract_brands_from_driver(driver)
+    save_brands(possible_brands)
 
     press_search_button(driver)
 
@@ -400,14 +1497,20 @@ def process_current_view_cars(driver):
 
     logger.info("Processing current view of cars.")
     try:
-        vehicle_cards = WebDriverWait(driver, 10).until(
-            EC.visibility_of_all_elements_located((By.CSS_SELECTOR, ".card"))
-        )
+        with run_metrics.time(CARD_DISCOVERY):
+            vehicle_cards = RESULTS_WAIT.until(
+                driver,
+                EC.visibility_of_all_elements_located((By.CSS_SELECTOR, ".card")),
+            )
         logger.info(f"Found {len(vehicle_cards)} vehicle cards.")
+        run_metrics.count("vehicle_cards", len(vehicle_cards))
     except Exception as e:
+        # process_page_ranges vuelve a encolar la página un número limitado de veces
         logger.error(f"An error occurred while processing vehicles view: {e}")
-        process_current_view_cars(driver)
+        raise
 
+    new_vehicles = 0
+    unread_cards = 0
     for index, card in enumerate(vehicle_cards):
         # Ignorar el último elemento
         if index == len(vehicle_cards) - 1:
@@ -415,59 +1518,100 @@ def process_current_view_cars(driver):
         try:
             # Encontrar el enlace del vehículo
             link = card.find_element(By.TAG_NAME, "a").get_attribute("href")
+        except Exception as e:
+            logger.error(f"Could not read the link of a vehicle card: {e}")
+            unread_cards += 1
+            continue
+        if not link:
+            logger.error("Found a vehicle card without a link.")
+            unread_cards += 1
+            continue
+
+        try:
             logger.info(f"Found vehicle link: {link}")
 
             # Verificar si el URL ya existe en la base de datos
-            if link in existing_vehicle_urls:
-                logger.info(
-                    f"Vehicle link {link} already exists in the database. Skipping."
-                )
-                with existing_vehicle_urls_semaphore:
-                    existing_vehicle_urls.remove(link)
+            if is_known_vehicle_url(link):
+                if price_history is not None:
+                    record_vehicle_prices(
+                        link, parse_card_prices(card.text.splitlines())
+                    )
                 continue
-            try:
-                vehicle_details = process_vehicle_card(driver, link)
+            new_vehicles += 1
+            process_vehicle_link(driver, link)
 
-                if vehicle_exists(link):
-                    logger.info(f"Updated exit date for existing vehicle: {link}")
-                else:
-                    save_vehicle_details(vehicle_details)
-                    logger.info(f"Saved new vehicle details: {link}")
+        except Exception as e:
+            logger.error(f"An error occurred while processing vehicles cards view: {e}")
+    logger.info(f"Current length of existing_vehicle_urls {len(existing_vehicle_urls)}")
 
-            except Exception as e:
-                logger.error(
-                    f"An error occurred while processing vehicle card for: {e}"
-                )
-                logger.info(f"Ignoring current vehicle. Processing next one")
+    # Un vehículo que no quedó en seen_vehicle_urls se daría por salido en la
+    # revisión contra el recorrido: la página se reintenta o queda fallida
+    if unread_cards:
+        raise RuntimeError(f"{unread_cards} vehicle cards could not be read.")
 
-            # Cerrar la pestaña actual
-            driver.close()
-            logger.info("Closed current tab.")
+    return new_vehicles
 
-            # Regresar a la pestaña original
-            driver.switch_to.window(driver.window_handles[0])
-            logger.info("Switched back to original tab.")
 
-        except Exception as e:
-            logger.error(f"An error occurred while processing vehicles cards view: {e}")
-    with existing_vehicle_urls_semaphore:
-        logger.info(
-            f"Current length of existing_vehicle_urls {len(existing_vehicle_urls)}"
-        )
+def process_vehicle_link(driver, link):
+    if crawl_state is not None:
+        crawl_state.add_in_flight(link)
 
+    html = None
+    try:
+        html = load_vehicle_page(driver, link)
+    except Exception as e:
+        logger.error(f"An error occurred while processing vehicle card for: {e}")
+        logger.info("Ignoring current vehicle. Processing next one")
+        existing_vehicle_urls.discard(link)
+
+    # Cerrar la pestaña del vehículo solo si llegó a abrirse; si window.open
+    # falló, la pestaña actual es la del listado
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+        logger.info("Closed current tab.")
+
+    # Regresar a la pestaña original
+    driver.switch_to.window(handles[0])
+    logger.info("Switched back to original tab.")
+
+    if html is None:
+        vehicle_done(link)
+    else:
+        handle_vehicle_page(link, html)
 
-def process_vehicle_card(driver, link):
 
-    # Abrir el enlace en una nueva pestaña
-    driver.execute_script("window.open(arguments[0]);", link)
-    logger.info("Opened vehicle link in a new tab.")
+def handle_vehicle_page(link, html):
+    """Entregar la página al pipeline, o analizarla y guardarla en este hilo
+    si no hay pipeline."""
+    if vehicle_pipeline is not None:
+        # Espera si el análisis va atrasado
+        vehicle_pipeline.submit(link, (link, html))
+        return
+
+    try:
+        persist_vehicle(parse_vehicle_stage(archive_vehicle_page((link, html))))
+    except Exception as e:
+        vehicle_failed(link, "inline", e)
+        return
+    vehicle_done(link)
 
-    # Cambiar al nuevo contexto de la pestaña
-    driver.switch_to.window(driver.window_handles[1])
-    logger.info("Switched to new tab.")
 
-    vehicle_details = capture_vehicle_details(driver)
+def archive_vehicle_page(page):
+    link, html = page
+    if page_archive is not None:
+        try:
+            page_archive.append(link, html)
+        except OSError as e:
+            # Sin archivo la página igual se analiza y se guarda
+            logger.error(f"Could not archive vehicle page {link}: {e}")
+    return page
+
 
+def parse_vehicle_stage(page):
+    link, html = page
+    vehicle_details = parse_vehicle_page(html, possible_brands)
     vehicle_details["URL"] = link
 
     marca = vehicle_details.get("Marca")
@@ -478,62 +1622,123 @@ def process_vehicle_card(driver, link):
     return vehicle_details
 
 
-def vehicle_exists(url):
-    try:
-        with pyodbc.connect(
-            driver="SQL Server",
-            server="FABIAN\\SQLEXPRESS",
-            database="CRAutos",
-            trusted_connection="yes",
-        ) as conn:
-            with database_semaphore:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM Cars WHERE URL = ?", url)
-                count = cursor.fetchone()[0]
-                cursor.close()
-                return count > 0
-    except pyodbc.Error as e:
-        logger.error(f"Error connecting to the database: {e}")
-        return False
+def persist_vehicle(vehicle_details):
+    link = vehicle_details["URL"]
+    if vehicle_exists(link):
+        record_vehicle_prices(link, vehicle_details)
+        logger.info(f"Recorded the price of existing vehicle: {link}")
+    else:
+        store_vehicle_details(vehicle_details)
+        logger.info(f"Saved new vehicle details: {link}")
 
 
-def populate_date_exited(url):
-    try:
-        with pyodbc.connect(
-            driver="SQL Server",
-            server="FABIAN\\SQLEXPRESS",
-            database="CRAutos",
-            trusted_connection="yes",
-        ) as conn:
-            cursor = conn.cursor()
-            today = datetime.now().strftime("%Y-%m-%d")
-            cursor.execute(
-                "UPDATE Cars SET DateExited = ? WHERE URL = ? AND DateExited IS NULL",
-                (today, url),
-            )
-            conn.commit()
-            cursor.close()
-    except pyodbc.Error as e:
-        logger.error(f"Error connecting to the database: {e}")
+def vehicle_done(link, vehicle_details=None):
+    if crawl_state is not None:
+        crawl_state.remove_in_flight(link)
+
+
+def vehicle_failed(link, stage, error):
+    logger.error(f"Vehicle {link} failed in the {stage} stage: {error}")
+    # Otro worker o la siguiente ejecución puede volver a intentarlo
+    existing_vehicle_urls.discard(link)
+    vehicle_done(link)
+
+
+def filter_new_vehicle_cards(cards):
+    """Devolver los enlaces nuevos y registrar el precio de los ya conocidos."""
+    new_links = []
+    for card in cards:
+        if is_known_vehicle_url(card["URL"]):
+            record_vehicle_prices(card["URL"], card)
+        else:
+            new_links.append(card["URL"])
+    return new_links
+
+
+def record_vehicle_prices(link, vehicle_details):
+    if price_history is not None:
+        price_history.record(
+            link,
+            vehicle_details.get("PrecioColones"),
+            vehicle_details.get("PrecioDolares"),
+        )
+
+
+def is_known_vehicle_url(link):
+    seen_vehicle_urls.add(link)
+    if crawl_state is not None:
+        crawl_state.add_seen(link)
+
+    # Registrar el URL al verlo para que ningún otro worker lo procese de nuevo
+    if not existing_vehicle_urls.add(link):
+        logger.info(f"Vehicle link {link} already exists in the database. Skipping.")
+        return True
+    return False
+
+
+def store_vehicle_details(vehicle_details):
+    if vehicle_writer is not None:
+        vehicle_writer.add(vehicle_details)
+    else:
+        with run_metrics.time(DB_WRITE):
+            save_vehicle_details(vehicle_details)
+
+
+def load_vehicle_page(driver, link):
+    with rate_limiter.request(link):
+        # Abrir el enlace en una nueva pestaña
+        driver.execute_script("window.open(arguments[0]);", link)
+        logger.info("Opened vehicle link in a new tab.")
+
+        # Cambiar al nuevo contexto de la pestaña
+        driver.switch_to.window(driver.window_handles[1])
+        logger.info("Switched to new tab.")
+
+        return wait_for_vehicle_page(driver)
 
 
 def capture_vehicle_details(driver):
     logger.info("Capturing vehicle details.")
-    vehicle_details = {}
 
-    header_details = capture_vehicle_header_details(driver)
-    fields_details = capture_vehicle_fields_details(driver)
-
-    vehicle_details.update(header_details)
-    vehicle_details.update(fields_details)
+    # Esperar el encabezado y luego analizar el HTML completo de una sola vez
+    vehicle_details = parse_vehicle_page(wait_for_vehicle_page(driver), possible_brands)
 
     logger.info(vehicle_details)
 
-    return reformat_vehicle_details(vehicle_details)
+    return vehicle_details
+
+
+def wait_for_vehicle_page(driver):
+    with run_metrics.time(DETAIL_LOAD):
+        try:
+            if VEHICLE_DETAIL_WAIT.until(driver, vehicle_page_state) == EXITED:
+                logger.warning(f"Vehicle page has no header: {driver.current_url}")
+        except TimeoutException as e:
+            logger.error(f"Error finding header element: {e}")
+
+        html = driver.page_source
+    if page_cache is not None:
+        # Guardar el HTML para poder volver a analizarlo sin conexión
+        page_cache.put(driver.current_url, html)
+
+    return html
+
+
+def parse_vehicle_page(html, brands):
+    if parse_executor is not None:
+        # El pool registra los tiempos de análisis de cada página
+        return parse_executor.parse_page(html, brands)
+
+    with run_metrics.time(PARSE):
+        vehicle_details = parse_vehicle_html(html, brands, parser_backend)
+
+    with run_metrics.time(REFORMAT):
+        vehicle_details = reformat_vehicle_details(vehicle_details)
+    run_metrics.count("vehicles_parsed")
+    return vehicle_details
 
 
 def capture_vehicle_header_details(driver):
-    vehicle_details = {}
     logger.info("Capturing vehicle header details.")
 
     # Obtener el elemento del encabezado
@@ -543,58 +1748,20 @@ def capture_vehicle_header_details(driver):
             EC.presence_of_element_located((By.CSS_SELECTOR, ".carheader"))
         )
 
-        header_text = WebDriverWait(header_element, 5).until(
+        WebDriverWait(header_element, 5).until(
             EC.presence_of_all_elements_located((By.TAG_NAME, "h1"))
         )
     except (TimeoutException, NoSuchElementException) as e:
         logger.error(f"Error finding header element or text: {e}")
         return None
 
-    if header_text:
-        # Obtener el texto del encabezado
-        brand_model_year = header_text[0].text.strip()
-        # Dividir el texto en palabras
-        brand_model = brand_model_year.split()
-
-        # Buscar la marca en el texto utilizando la lista de marcas posibles
-        for brand in possible_brands:
-            # Verificar si el texto comienza con la marca
-            if brand_model_year.startswith(brand):
-                vehicle_details["Marca"] = brand
-
-                # Encontrar el año en el texto
-                for word in brand_model:
-                    if word.isdigit() and 1900 <= int(word) <= 2050:
-                        vehicle_details["Año"] = word
-                        break  # Salir del bucle una vez encontrado el año
-
-                # Asumir que el modelo es el texto restante después de quitar marca y año
-                if "Marca" in vehicle_details and "Año" in vehicle_details:
-                    # Obtener el texto restante después de la marca
-                    remaining_text = brand_model_year[len(brand) :].strip()
-
-                    # Eliminar el año del texto restante
-                    if vehicle_details["Año"] in remaining_text:
-                        remaining_text = remaining_text.replace(
-                            vehicle_details["Año"], ""
-                        ).strip()
-
-                    # Guardar el modelo
-                    vehicle_details["Modelo"] = remaining_text
-
-                break
+    # Leer los textos una sola vez: cada .text es una llamada al navegador
+    h1_texts, h3_texts = extract_header_texts(header_element)
+    vehicle_details = get_header_parser(possible_brands).parse(h1_texts, h3_texts)
 
     logger.info(f"Brand found: {vehicle_details.get('Marca')}")
     logger.info(f"Model found: {vehicle_details.get('Modelo')}")
     logger.info(f"Year found: {vehicle_details.get('Año')}")
-    # Capturar precios en colones y dólares utilizando las nuevas funciones
-    price_colones = extract_price_colones(header_element)
-    if price_colones is not None:
-        vehicle_details["PrecioColones"] = price_colones
-
-    price_dolares = extract_price_dolares(header_element)
-    if price_dolares is not None:
-        vehicle_details["PrecioDolares"] = price_dolares
 
     return vehicle_details
 
@@ -602,27 +1769,7 @@ def capture_vehicle_header_details(driver):
 def capture_vehicle_fields_details(driver):
     vehicle_details = {}
 
-    fields = [
-        "Cilindrada",
-        "Estilo",
-        "# de pasajeros",
-        "Combustible",
-        "Transmisión",
-        "Estado",
-        "Kilometraje",
-        "Color exterior",
-        "Color interior",
-        "# de puertas",
-        "Ya pagó impuestos",
-        "Precio negociable",
-        "Se recibe vehículo",
-        "Provincia",
-        "Fecha de ingreso",
-        "Autonomía",
-        "Batería",
-    ]
-
-    for field in fields:
+    for field in VEHICLE_FIELDS:
         try:
             element = driver.find_element(
                 By.XPATH, f"//td[contains(text(), '{field}')]/following-sibling::td"
@@ -696,7 +1843,10 @@ def capture_vehicle_details_2(driver):
 
 
 def extract_brands_from_driver(driver):
-    html_content = driver.page_source
+    return extract_brands_from_html(driver.page_source)
+
+
+def extract_brands_from_html(html_content):
     soup = BeautifulSoup(html_content, "html.parser")
 
     brands = []
@@ -711,249 +1861,34 @@ def extract_brands_from_driver(driver):
     return brands
 
 
-def extract_price_colones(header_element):
-    logger.info("Extracting price in colones from header element.")
+def extract_header_texts(header_element):
+    h1_texts = [
+        element.text for element in header_element.find_elements(By.TAG_NAME, "h1")
+    ]
+    h3_texts = [
+        element.text for element in header_element.find_elements(By.TAG_NAME, "h3")
+    ]
+    return h1_texts, h3_texts
 
-    price_elements = header_element.find_elements(
-        By.TAG_NAME, "h1"
-    ) + header_element.find_elements(By.TAG_NAME, "h3")
 
-    logger.info(
-        f"Found {len(price_elements)} price elements: {[element.text for element in price_elements]}"
-    )
+def extract_price_colones(header_element):
+    logger.info("Extracting price in colones from header element.")
 
-    # Expresión regular para encontrar precios en colones
-    # Busca ¢ seguido de un número, delimitado por un espacio, paréntesis o fin de línea
-    colones_price_pattern = r"¢\s*([\d,]+)(?=\s|\)|$)"
+    price_texts = sum(extract_header_texts(header_element), [])
 
-    colones_prices = []
-    for element in price_elements:
-        text = element.text.strip()
-        matches = re.findall(colones_price_pattern, text)
+    logger.info(f"Found {len(price_texts)} price elements: {price_texts}")
 
-        for match in matches:
-            try:
-                # Convertir el precio encontrado a un número entero
-                colones_price = int(match.replace(",", ""))  # Eliminar comas
-                colones_prices.append(colones_price)
-                logger.info(f"Found colones price: {colones_price}")
-            except ValueError as e:
-                logger.error(f"Error converting price to int: {e}")
-
-    # Si hay precios en colones, devolver el más bajo
-    if colones_prices:
-        min_price = min(colones_prices)
-        logger.info(f"Lowest colones price found: {min_price}")
-        return min_price
-    else:
-        logger.warning("No colones prices found.")
-        return None
+    return find_price_colones(price_texts)
 
 
 def extract_price_dolares(header_element):
     logger.info("Extracting price in dollars from header element.")
 
-    price_elements = header_element.find_elements(
-        By.TAG_NAME, "h1"
-    ) + header_element.find_elements(By.TAG_NAME, "h3")
-
-    logger.info(
-        f"Found {len(price_elements)} price elements: {[element.text for element in price_elements]}"
-    )
-
-    # Expresión regular para encontrar precios en dólares
-    dolares_price_pattern = (
-        r"\$\s*([\d,]+)(?=\s|\))"  # Busca $ seguido de un número y espacio o )
-    )
-
-    dolares_prices = []
-    for element in price_elements:
-        text = element.text.strip()
-        matches = re.findall(dolares_price_pattern, text)
-
-        for match in matches:
-            # Convertir el precio encontrado a un número entero
-            dolares_price = int(match.replace(",", ""))  # Eliminar comas
-            dolares_prices.append(dolares_price)
-            logger.info(f"Found dollar price: {dolares_price}")
+    price_texts = sum(extract_header_texts(header_element), [])
 
-    # Si hay precios en dólares, devolver el más bajo
-    if dolares_prices:
-        min_price = min(dolares_prices)
-        logger.info(f"Lowest dollar price found: {min_price}")
-        return min_price
+    logger.info(f"Found {len(price_texts)} price elements: {price_texts}")
 
-    logger.warning("No dollar prices found.")
-    return None
-
-
-def get_existing_vehicle_urls():
-    existing_urls = []
-
-    try:
-        with pyodbc.connect(
-            driver="SQL Server",
-            server="FABIAN\\SQLEXPRESS",
-            database="CRAutos",
-            trusted_connection="yes",
-        ) as conn:
-            cursor = conn.cursor()
-
-            with database_semaphore:
-                # Ejecutar la consulta
-                cursor.execute("SELECT URL FROM Cars")
-
-                # Obtener los resultados
-                rows = cursor.fetchall()
-
-                for row in rows:
-                    existing_urls.append(row.URL)
-
-                # Cerrar la conexión
-                cursor.close()
-                conn.close()
-
-    except pyodbc.Error as e:
-        logger.error(f"Database error: {e}")
-
-    return existing_urls
-
-
-def save_vehicle_details(vehicle_details):
-    try:
-
-        with pyodbc.connect(
-            driver="SQL Server",
-            server="FABIAN\\SQLEXPRESS",
-            database="CRAutos",
-            trusted_connection="yes",
-        ) as conn:
-            with database_semaphore:
-                cursor = conn.cursor()
-
-                # Insert vehicle details into the Cars table
-                cursor.execute(
-                    """
-                    INSERT INTO Cars (
-                        Brand, Model, Year, PriceColones, PriceDollars,
-                        EngineCapacity, BateryRange, BateryCapacity, Style, Passengers, FuelType,
-                        Transmission, Condition, Mileage,
-                        ExteriorColor, InteriorColor, Doors, TaxesPaid,
-                        NegotiablePrice, AcceptsVehicle, Province,
-                        Notes, DateEntered, DateExited, URL
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        vehicle_details.get("Marca"),
-                        vehicle_details.get("Modelo"),
-                        vehicle_details.get("Año"),
-                        vehicle_details.get("PrecioColones"),
-                        vehicle_details.get("PrecioDolares"),
-                        vehicle_details.get("Cilindrada"),
-                        vehicle_details.get("Autonomía"),
-                        vehicle_details.get("Batería"),
-                        vehicle_details.get("Estilo"),
-                        vehicle_details.get("# de pasajeros"),
-                        vehicle_details.get("Combustible"),
-                        vehicle_details.get("Transmisión"),
-                        vehicle_details.get("Estado"),
-                        vehicle_details.get("Kilometraje"),
-                        vehicle_details.get("Color exterior"),
-                        vehicle_details.get("Color interior"),
-                        vehicle_details.get("# de puertas"),
-                        vehicle_details.get("Ya pagó impuestos"),
-                        vehicle_details.get("Precio negociable"),
-                        vehicle_details.get("Se recibe vehículo"),
-                        vehicle_details.get("Provincia"),
-                        vehicle_details.get(
-                            "Notas", ""
-                        ),  # Use an empty string if "Notas" not present
-                        vehicle_details.get("Fecha de ingreso"),
-                        vehicle_details.get("Fecha de salida"),
-                        vehicle_details.get("URL"),
-                    ),
-                )
-
-                # Commit the transaction
-                conn.commit()
-                cursor.close()
-
-    except pyodbc.Error as e:
-        logger.error(f"Error connecting to the database: {e}")
-
-
-def reformat_vehicle_details(vehicle_details):
-    # Reformatear Cilindrada
-    logger.info(f"Reformating Vehicle details: {vehicle_details}")
-
-    if "Cilindrada" in vehicle_details and vehicle_details["Cilindrada"] is not None:
-        logger.info("Reformating engine Capacity")
-        vehicle_details["Cilindrada"] = vehicle_details["Cilindrada"].replace(" cc", "")
-
-    # Reformatear Fecha de ingreso
-    if "Fecha de ingreso" in vehicle_details:
-        logger.info("Reformating DateEntered")
-        date_str = vehicle_details["Fecha de ingreso"]
-        # Convertir a formato de fecha
-        try:
-            # Intenta convertir la fecha en el formato actual
-            date_object = datetime.strptime(date_str, "%d de %B del %Y")
-            # Reformatea a 'YYYY-MM-DD' que es el formato estándar para SQL
-            vehicle_details["Fecha de ingreso"] = date_object.strftime("%Y-%m-%d")
-        except ValueError:
-            print(f"Date format error for: {date_str}")
-            # Si hay un error, asigna None o un valor predeterminado
-            vehicle_details["Fecha de ingreso"] = None
-
-    # Reformatear Kilometraje
-
-    if "Kilometraje" in vehicle_details:
-        logger.info("Reformating Mileage")
-        mileage_value = re.search(
-            r"([\d,]+)\s*(kms|millas)", vehicle_details["Kilometraje"], re.IGNORECASE
-        )
-
-        if mileage_value:
-            try:
-                # Convertir a entero, manejando posibles errores
-                mileage = int(mileage_value.group(1).replace(",", ""))
-                if "millas" in mileage_value.group(2).lower():  # Si está en millas
-                    mileage = int(mileage * 1.60934)  # Convertir millas a kilómetros
-                vehicle_details["Kilometraje"] = mileage  # Guardar en kilómetros
-            except ValueError:
-                print(f"Invalid mileage value: {vehicle_details['Kilometraje']}")
-                vehicle_details["Kilometraje"] = (
-                    None  # O asignar un valor predeterminado
-                )
-        else:
-            print(f"Kilometraje format error: {vehicle_details['Kilometraje']}")
-            vehicle_details["Kilometraje"] = None  # O asignar un valor predeterminado
-
-    if "Autonomía" in vehicle_details and vehicle_details["Autonomía"] is not None:
-        logger.info("Reformating Autonomy")
-        autonomy_value = re.search(
-            r"([\d,]+)\s*(kms|millas)", vehicle_details["Autonomía"], re.IGNORECASE
-        )
-
-        if autonomy_value:
-            try:
-                # Convertir a entero, manejando posibles errores
-                autonomy = int(autonomy_value.group(1).replace(",", ""))
-                if "millas" in autonomy_value.group(2).lower():  # Si está en millas
-                    autonomy = int(autonomy * 1.60934)  # Convertir millas a kilómetros
-                vehicle_details["Autonomía"] = autonomy  # Guardar en kilómetros
-            except ValueError:
-                print(f"Invalid autonomy value: {vehicle_details['Autonomía']}")
-                vehicle_details["Autonomía"] = None  # O asignar un valor predeterminado
-        else:
-            print(f"Autonomy format error: {vehicle_details['Autonomía']}")
-            vehicle_details["Autonomía"] = None  # O asignar un valor predeterminado
-
-    if "Batería" in vehicle_details and vehicle_details["Batería"] is not None:
-        logger.info("Reformating Battery")
-        vehicle_details["Batería"] = vehicle_details["Batería"].replace(" kWh", "")
-
-    return vehicle_details
+    return find_price_dolares(price_texts)
 
 
 def find_used_cars_section(driver):
@@ -976,11 +1911,12 @@ def scroll_to_bottom(driver):
         # Desplazarse hacia abajo
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
 
-        # Esperar que se cargue el contenido nuevo
-        time.sleep(1)  # Ajusta este tiempo si es necesario
+        # Esperar que se cargue el contenido nuevo o que la red quede inactiva
+        try:
+            new_height = SCROLL_WAIT.until(driver, scroll_settled(last_height))
+        except TimeoutException:
+            break
 
-        # Calcular la nueva altura y comparar con la anterior
-        new_height = driver.execute_script("return document.body.scrollHeight")
         if new_height == last_height:  # Si no hay más contenido, salimos del bucle
             break
         last_height = new_height
@@ -999,10 +1935,11 @@ def press_search_button(driver):
     try:
 
         # Buscar el botón utilizando el texto "Buscar"
-        search_button = WebDriverWait(driver, 1000).until(
+        search_button = SEARCH_WAIT.until(
+            driver,
             EC.element_to_be_clickable(
                 (By.XPATH, "//button[contains(text(), 'BUSCAR')]")
-            )
+            ),
         )
 
         # Intenta hacer clic en el botón
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from http_fetcher import HttpFetcher
+from listing_status import AVAILABLE, EXITED, UNKNOWN
+from page_cache import conditional_headers
+from run_metrics import SOLD_CHECK, timed
+
+logger = logging.getLogger(__name__)
+
+
+def find_exited_vehicle_urls(open_urls, seen_urls):
+    """Devolver los vehículos abiertos en la base de datos que no aparecieron en el recorrido."""
+    exited_urls = [url for url in open_urls if url not in seen_urls]
+    logger.info(
+        f"{len(exited_urls)} of {len(open_urls)} open vehicles were not found in the listing."
+    )
+    return exited_urls
+
+
+# La pestaña "Información" solo existe mientras el anuncio está publicado
+AVAILABLE_MARKER = b"#tab-1"
+PROBE_BYTES = 64 * 1024
+
+SOLD_CHECK_CONCURRENCY = 20
+SOLD_CHECK_REQUESTS_PER_SECOND = 10
+
+
+class HostRateLimiter:
+    """Espacia el inicio de las solicitudes a cada host."""
+
+    def __init__(self, requests_per_second):
+        self.interval = 1 / requests_per_second
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url):
+        host = urlsplit(url).netloc
+        loop = asyncio.get_running_loop()
+
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+
+        await asyncio.sleep(slot - now)
+
+
+def probe_vehicle_page(session, url, timeout=10, cache=None):
+    """Decidir si el anuncio sigue publicado leyendo solo el inicio de la página."""
+    headers = conditional_headers(cache.get(url)) if cache is not None else {}
+    try:
+        with session.get(
+            url, timeout=timeout, stream=True, headers=headers
+        ) as response:
+            # Sin cambios desde la copia en caché, que estaba publicada
+            if response.status_code == 304:
+                return AVAILABLE
+            if response.status_code in (404, 410):
+                return EXITED
+            if response.status_code != 200:
+                return UNKNOWN
+
+            body = b""
+            for chunk in response.iter_content(chunk_size=8192):
+                body += chunk
+                if AVAILABLE_MARKER in body:
+                    return AVAILABLE
+                if len(body) >= PROBE_BYTES:
+                    break
+            return EXITED
+    except requests.RequestException as e:
+        logger.warning(f"Could not check vehicle at {url}: {e}")
+        return UNKNOWN
+
+
+async def check_availability(
+    urls,
+    concurrency=SOLD_CHECK_CONCURRENCY,
+    requests_per_second=SOLD_CHECK_REQUESTS_PER_SECOND,
+    timeout=10,
+    rate_limiter=None,
+    cache=None,
+    metrics=None,
+):
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = HostRateLimiter(requests_per_second)
+    loop = asyncio.get_running_loop()
+
+    with HttpFetcher(
+        pool_size=concurrency, rate_limiter=rate_limiter
+    ) as fetcher, ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="SoldCheck"
+    ) as executor:
+
+        def probe(url):
+            with timed(metrics, SOLD_CHECK), fetcher.limit(url) as slot:
+                status = probe_vehicle_page(fetcher.session, url, timeout, cache)
+                if status == UNKNOWN:
+                    slot.failed("unknown vehicle status")
+            if metrics is not None:
+                metrics.count(f"vehicles_{status}")
+            return status
+
+        async def check(url):
+            async with semaphore:
+                # Con un limitador compartido, el ritmo lo decide su control AIMD
+                if rate_limiter is None:
+                    await limiter.wait(url)
+                status = await loop.run_in_executor(executor, probe, url)
+                return url, status
+
+        results = await asyncio.gather(*(check(url) for url in urls))
+
+    return dict(results)
+
+
+def find_exited_vehicle_urls_http(urls, **kwargs):
+    """Revisar los URLs por HTTP y devolver los que ya no están publicados."""
+    statuses = asyncio.run(check_availability(urls, **kwargs))
+
+    exited_urls = [url for url, status in statuses.items() if status == EXITED]
+    unknown = sum(1 for status in statuses.values() if status == UNKNOWN)
+    logger.info(
+        f"Checked {len(statuses)} vehicles: {len(exited_urls)} exited, {unknown} could not be checked."
+    )
+    return exited_urls
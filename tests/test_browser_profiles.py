@@ -0,0 +1,91 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from selenium import webdriver
+
+import browser_profiles
+from browser_profiles import (
+    FULL_PROFILE,
+    LEAN_PROFILE,
+    block_resources,
+    blocked_url_patterns,
+    configure_chromium_options,
+    configure_firefox_options,
+    remove_browser_cache,
+)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.commands.append((cmd, params))
+
+
+def test_full_profile_keeps_options_unchanged():
+    options = configure_chromium_options(webdriver.ChromeOptions(), FULL_PROFILE)
+    assert options.arguments == []
+    assert options.page_load_strategy == "normal"
+
+
+def test_lean_chromium_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(browser_profiles, "BROWSER_CACHE_DIR", str(tmp_path))
+
+    options = configure_chromium_options(webdriver.EdgeOptions(), LEAN_PROFILE)
+
+    assert "--headless=new" in options.arguments
+    assert "--blink-settings=imagesEnabled=false" in options.arguments
+    assert any(
+        argument.startswith(f"--disk-cache-dir={tmp_path}")
+        for argument in options.arguments
+    )
+    assert options.page_load_strategy == "eager"
+    prefs = options.experimental_options["prefs"]
+    assert prefs["profile.managed_default_content_settings.images"] == 2
+
+
+def test_lean_firefox_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(browser_profiles, "BROWSER_CACHE_DIR", str(tmp_path))
+
+    options = configure_firefox_options(webdriver.FirefoxOptions(), LEAN_PROFILE)
+
+    assert "-headless" in options.arguments
+    assert options.preferences["permissions.default.image"] == 2
+    assert options.preferences["permissions.default.stylesheet"] == 2
+    assert options.page_load_strategy == "eager"
+
+
+def test_block_resources_only_for_lean_profile():
+    driver = FakeDriver()
+    block_resources(driver, FULL_PROFILE)
+    assert driver.commands == []
+
+    block_resources(driver, LEAN_PROFILE)
+    assert driver.commands[-1] == (
+        "Network.setBlockedURLs",
+        {"urls": blocked_url_patterns()},
+    )
+    assert "*.css" in blocked_url_patterns()
+    assert "*googletagmanager.com*" in blocked_url_patterns()
+
+
+def test_remove_browser_cache_deletes_the_driver_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(browser_profiles, "BROWSER_CACHE_DIR", str(tmp_path))
+    cache_dir = browser_profiles.browser_cache_dir()
+    open(os.path.join(cache_dir, "data_0"), "w").close()
+
+    options = configure_chromium_options(
+        webdriver.ChromeOptions(), LEAN_PROFILE, cache_dir
+    )
+    assert f"--disk-cache-dir={cache_dir}" in options.arguments
+
+    driver = FakeDriver()
+    driver.browser_cache_dir = cache_dir
+    remove_browser_cache(driver)
+    assert not os.path.exists(cache_dir)
+
+    # Navegadores del perfil completo no tienen directorio propio
+    remove_browser_cache(FakeDriver())
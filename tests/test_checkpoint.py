@@ -0,0 +1,74 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from checkpoint import CrawlState, load_checkpoint, save_checkpoint
+
+
+def test_save_and_load_checkpoint(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+
+    assert load_checkpoint(path) is None
+
+    save_checkpoint(path, {"last_page": 4, "new_vehicles": 37})
+    save_checkpoint(path, {"last_page": 5, "new_vehicles": 40})
+
+    assert load_checkpoint(path) == {"last_page": 5, "new_vehicles": 40}
+    # No quedan archivos temporales junto al checkpoint
+    assert os.listdir(tmp_path) == ["checkpoint.json"]
+
+
+def test_load_corrupt_checkpoint_returns_none(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    path.write_text("{not json")
+
+    assert load_checkpoint(str(path)) is None
+
+
+def test_crawl_state_resumes_pending_pages_and_in_flight_urls(tmp_path):
+    path = str(tmp_path / "crawl_state.json")
+
+    state = CrawlState(path)
+    state.start(6)
+    state.mark_page_done(1)
+    state.mark_page_done(2)
+    state.mark_page_done(5)
+    state.add_seen("https://a")
+    state.add_in_flight("https://b")
+    state.add_in_flight("https://c")
+    state.remove_in_flight("https://c")
+    state.save(force=True)
+
+    resumed = CrawlState.load(path)
+    resumed.start(7)
+
+    assert resumed.started_at == state.started_at
+    assert resumed.pending_pages() == [3, 4, 6, 7]
+    assert resumed.in_flight_urls() == ["https://b"]
+    assert resumed.seen_urls() == ["https://a"]
+
+
+def test_crawl_state_finish_removes_file(tmp_path):
+    path = str(tmp_path / "crawl_state.json")
+
+    state = CrawlState(path)
+    state.start(3)
+    state.finish()
+
+    assert CrawlState.load(path) is None
+
+
+def test_crawl_state_throttles_saves_between_pages(tmp_path):
+    path = str(tmp_path / "crawl_state.json")
+
+    state = CrawlState(path, save_interval=60)
+    state.start(3)
+    state.mark_page_done(1)
+    state.add_seen("https://a")
+
+    # Solo start escribió; las páginas siguientes esperan el intervalo
+    assert CrawlState.load(path).pending_pages() == [1, 2, 3]
+
+    state.save(force=True)
+    assert CrawlState.load(path).pending_pages() == [2, 3]
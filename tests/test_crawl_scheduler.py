@@ -0,0 +1,100 @@
+import pytest
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from crawl_scheduler import (
+    KnownPagesStop,
+    PageRangeQueue,
+    run_workers,
+    split_page_ranges,
+    split_pages,
+)
+
+
+def test_split_page_ranges_covers_every_page_once():
+    ranges = split_page_ranges(12, 5)
+    assert ranges == [(1, 5), (6, 10), (11, 12)]
+
+
+def test_split_page_ranges_rejects_empty_chunks():
+    with pytest.raises(ValueError):
+        split_page_ranges(10, 0)
+
+
+def test_page_range_queue_put_back():
+    page_queue = PageRangeQueue(3, 3)
+    assert page_queue.get() == (1, 3)
+    assert page_queue.get() is None
+
+    page_queue.put_back(2, 3)
+    assert page_queue.pending() == 1
+    assert page_queue.get() == (2, 3)
+
+
+def test_workers_process_each_page_exactly_once():
+    page_queue = PageRangeQueue(103, 4)
+    processed = []
+    lock = threading.Lock()
+
+    def worker(page_queue):
+        while True:
+            page_range = page_queue.get()
+            if page_range is None:
+                break
+            first, last = page_range
+            with lock:
+                processed.extend(range(first, last + 1))
+
+    run_workers(worker, [(page_queue,) for _ in range(6)])
+
+    assert sorted(processed) == list(range(1, 104))
+
+
+def test_drop_after_keeps_only_earlier_pages():
+    page_queue = PageRangeQueue(20, 4)
+    assert page_queue.get() == (1, 4)
+
+    page_queue.drop_after(6)
+
+    assert page_queue.get() == (5, 6)
+    assert page_queue.get() is None
+
+
+def test_known_pages_stop_after_consecutive_known_pages():
+    known_pages_stop = KnownPagesStop(3)
+
+    assert not known_pages_stop.record_page(1, 12)
+    assert not known_pages_stop.record_page(2, 0)
+    assert not known_pages_stop.record_page(3, 4)
+    assert not known_pages_stop.record_page(4, 0)
+    assert not known_pages_stop.record_page(6, 0)
+    assert known_pages_stop.record_page(5, 0)
+
+    assert known_pages_stop.stop_page == 6
+    assert known_pages_stop.should_skip(7)
+    assert not known_pages_stop.should_skip(6)
+    assert known_pages_stop.total_new_vehicles() == 16
+
+
+def test_page_range_queue_from_pending_pages():
+    assert split_pages([9, 3, 4, 5, 6, 7, 12], 3) == [(3, 5), (6, 7), (9, 9), (12, 12)]
+
+    page_queue = PageRangeQueue(12, 3, pages=[2, 3, 10])
+    assert page_queue.get() == (2, 3)
+    assert page_queue.get() == (10, 10)
+    assert page_queue.get() is None
+
+
+def test_put_back_gives_up_after_max_attempts():
+    page_queue = PageRangeQueue(4, 4, max_attempts=2)
+    assert page_queue.get() == (1, 4)
+
+    page_queue.put_back(2, 4)
+    assert page_queue.get() == (2, 4)
+
+    page_queue.put_back(2, 4)
+    assert page_queue.get() is None
+    assert page_queue.failed == [(2, 4)]
@@ -0,0 +1,319 @@
+import pytest
+import sys
+import os
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import db
+
+
+CARS_TABLE = """
+CREATE TABLE Cars (
+    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    {},
+    UNIQUE (URL)
+)
+""".format(
+    ",\n    ".join(column for column, _ in db.CAR_COLUMNS)
+)
+
+
+@pytest.fixture
+def sqlite_pool(tmp_path):
+    database = str(tmp_path / "cars.db")
+
+    with sqlite3.connect(database) as conn:
+        conn.execute(CARS_TABLE)
+
+    connections = []
+
+    def connect():
+        conn = sqlite3.connect(database, check_same_thread=False)
+        connections.append(conn)
+        return conn
+
+    pool = db.init_pool(connect, size=2)
+    pool.opened = connections
+    yield pool
+    db.close_pool()
+
+
+def test_save_and_find_vehicle(sqlite_pool):
+    db.save_vehicle_details(
+        {"Marca": "Volvo", "Modelo": "S60", "Año": "2012", "URL": "https://a"}
+    )
+
+    assert db.vehicle_exists("https://a")
+    assert not db.vehicle_exists("https://b")
+    assert db.get_existing_vehicle_urls() == ["https://a"]
+    assert db.get_unsold_vehicle_urls() == ["https://a"]
+
+    db.update_vehicle_exit_date("https://a")
+    assert db.get_unsold_vehicle_urls() == []
+
+
+def test_pool_reuses_connections_across_threads(sqlite_pool):
+    def worker(index):
+        for offset in range(10):
+            db.save_vehicle_details({"URL": f"https://car/{index}/{offset}"})
+            db.vehicle_exists(f"https://car/{index}/{offset}")
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(db.get_existing_vehicle_urls()) == 60
+    assert len(sqlite_pool.opened) <= sqlite_pool.size
+
+
+def test_pool_discards_connection_after_database_error(sqlite_pool):
+    with pytest.raises(sqlite3.Error):
+        with sqlite_pool.cursor() as cursor:
+            cursor.execute("SELECT * FROM MissingTable")
+
+    # La conexión fallida se descarta y se abre una nueva
+    assert db.get_existing_vehicle_urls() == []
+    assert len(sqlite_pool.opened) == 2
+
+
+def test_exhausted_pool_raises_a_database_error(sqlite_pool):
+    sqlite_pool.timeout = 0.05
+    with sqlite_pool.connection(), sqlite_pool.connection():
+        with pytest.raises(db.PoolTimeoutError):
+            with sqlite_pool.connection():
+                pass
+        # Los llamadores lo manejan como cualquier error de la base de datos
+        assert not db.vehicle_exists("https://a")
+        assert db.get_unsold_vehicle_urls() == []
+
+
+def test_duplicate_insert_is_logged_not_raised(sqlite_pool):
+    db.save_vehicle_details({"URL": "https://a"})
+    db.save_vehicle_details({"URL": "https://a"})
+
+    assert db.get_existing_vehicle_urls() == ["https://a"]
+
+
+def test_vehicle_writer_flushes_on_batch_size(sqlite_pool):
+    writer = db.VehicleWriter(batch_size=3, flush_interval=60)
+
+    writer.add({"URL": "https://a"})
+    writer.add({"URL": "https://b"})
+    assert db.get_existing_vehicle_urls() == []
+    assert writer.pending() == 2
+
+    writer.add({"URL": "https://c"})
+    assert sorted(db.get_existing_vehicle_urls()) == [
+        "https://a",
+        "https://b",
+        "https://c",
+    ]
+    writer.close()
+
+
+def test_vehicle_writer_flushes_on_interval_and_close(sqlite_pool):
+    writer = db.VehicleWriter(batch_size=100, flush_interval=0.05)
+    writer.add({"URL": "https://a"})
+
+    for _ in range(100):
+        if db.get_existing_vehicle_urls():
+            break
+        time.sleep(0.01)
+    assert db.get_existing_vehicle_urls() == ["https://a"]
+
+    writer.add({"URL": "https://b"})
+    writer.close()
+    assert sorted(db.get_existing_vehicle_urls()) == ["https://a", "https://b"]
+
+
+def test_vehicle_writer_isolates_duplicate_rows(sqlite_pool):
+    db.save_vehicle_details({"URL": "https://a"})
+
+    writer = db.VehicleWriter(batch_size=10, flush_interval=60)
+    for url in ["https://a", "https://b", "https://c"]:
+        writer.add({"URL": url})
+    writer.close()
+
+    assert sorted(db.get_existing_vehicle_urls()) == [
+        "https://a",
+        "https://b",
+        "https://c",
+    ]
+    assert writer.saved == 2
+
+
+def test_vehicle_writer_spills_rows_it_cannot_save(sqlite_pool, tmp_path):
+    spill_path = tmp_path / "unsaved.jsonl"
+    writer = db.VehicleWriter(batch_size=10, flush_interval=60, spill_path=spill_path)
+    writer.add({"Marca": "Volvo", "URL": "https://a"})
+
+    with sqlite_pool.cursor() as cursor:
+        cursor.execute("DROP TABLE Cars")
+    writer.close()
+
+    records = [json.loads(line) for line in spill_path.read_text().splitlines()]
+    assert len(records) == 1
+    assert records[0]["Brand"] == "Volvo"
+    assert records[0]["URL"] == "https://a"
+
+
+class ExhaustedPool:
+    """Pool sin conexiones libres: cursor() falla como _acquire al agotar la espera."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def cursor(self):
+        self.calls += 1
+        raise queue.Empty()
+
+
+def test_vehicle_writer_spills_batch_on_unexpected_errors(tmp_path):
+    spill_path = tmp_path / "unsaved.jsonl"
+    pool = ExhaustedPool()
+    writer = db.VehicleWriter(
+        pool=pool, batch_size=100, flush_interval=0.05, spill_path=spill_path
+    )
+    writer.add({"URL": "https://a"})
+
+    deadline = time.time() + 2
+    while not spill_path.exists() and time.time() < deadline:
+        time.sleep(0.01)
+    # El hilo periódico sigue vivo y guarda lo que llega después
+    writer.add({"URL": "https://b"})
+    deadline = time.time() + 2
+    while writer.pending() and time.time() < deadline:
+        time.sleep(0.01)
+    writer.close()
+
+    records = [json.loads(line) for line in spill_path.read_text().splitlines()]
+    assert [record["URL"] for record in records] == ["https://a", "https://b"]
+    assert writer.saved == 0
+
+
+def test_update_vehicles_exit_date_in_batches(sqlite_pool):
+    urls = [f"https://car/{number}" for number in range(12)]
+    for url in urls:
+        db.save_vehicle_details({"URL": url})
+
+    assert db.update_vehicles_exit_date(urls[:7], batch_size=3) == 7
+    assert sorted(db.get_unsold_vehicle_urls()) == sorted(urls[7:])
+    # Los ya salidos y los que no existen no se cuentan
+    assert db.update_vehicles_exit_date(urls[5:9] + ["https://missing"]) == 2
+    assert sorted(db.get_unsold_vehicle_urls()) == sorted(urls[9:])
+
+
+
+def test_vehicle_updater_rewrites_parsed_columns_of_stored_rows(sqlite_pool):
+    db.save_vehicle_details(
+        {
+            "Marca": "Mercedes",
+            "Modelo": "Benz C200",
+            "Año": 2015,
+            "PrecioColones": 9000000,
+            "URL": "https://a",
+        }
+    )
+    db.update_vehicle_exit_date("https://a")
+
+    updater = db.VehicleUpdater(batch_size=10, flush_interval=60)
+    updater.add(
+        {
+            "Marca": "Mercedes Benz",
+            "Modelo": "C200",
+            "Año": 2015,
+            "PrecioColones": 8500000,
+            "URL": "https://a",
+        }
+    )
+    updater.close()
+
+    with sqlite_pool.cursor() as cursor:
+        cursor.execute(
+            "SELECT Brand, Model, PriceColones, DateExited IS NOT NULL FROM Cars"
+        )
+        # Solo cambian las columnas analizadas; el precio y la salida se conservan
+        assert cursor.fetchall() == [("Mercedes Benz", "C200", 9000000, 1)]
+    assert updater.saved == 1
+
+PRICE_HISTORY_TABLE = """
+CREATE TABLE CarPriceHistory (
+    Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    URL, PriceColones, PriceDollars, DateRecorded
+)
+"""
+
+
+def test_price_history_writes_only_changes(sqlite_pool):
+    with sqlite_pool.cursor() as cursor:
+        cursor.execute(PRICE_HISTORY_TABLE)
+    db.save_vehicle_details(
+        {"URL": "https://a", "PrecioColones": 7500000, "PrecioDolares": 14395}
+    )
+    db.save_vehicle_details({"URL": "https://b", "PrecioColones": 5000000})
+
+    history = db.CarPriceHistory(batch_size=2, flush_interval=60)
+    history.load()
+
+    assert not history.record("https://a", 7500000, 14395)
+    assert not history.record("https://a", 7500000, None)
+    assert not history.record("https://new", 1000000, None)
+    assert history.record("https://a", 7000000, 13400)
+    assert history.pending() == 1
+    assert history.record("https://b", 4800000, None)
+    assert history.pending() == 0
+
+    assert history.record("https://a", 6900000, 13200)
+    history.close()
+
+    with sqlite_pool.cursor() as cursor:
+        cursor.execute(
+            "SELECT URL, PriceColones, PriceDollars FROM CarPriceHistory ORDER BY Id"
+        )
+        assert cursor.fetchall() == [
+            ("https://a", 7000000, 13400),
+            ("https://b", 4800000, None),
+            ("https://a", 6900000, 13200),
+        ]
+
+    # El último precio del historial es el punto de partida de la próxima ejecución
+    assert db.get_last_vehicle_prices() == {
+        "https://a": (6900000, 13200),
+        "https://b": (4800000, None),
+    }
+
+
+def test_price_history_flushes_on_interval_and_spills_failures(sqlite_pool, tmp_path):
+    spill_path = tmp_path / "unsaved_prices.jsonl"
+    history = db.CarPriceHistory(
+        batch_size=100, flush_interval=0.05, spill_path=spill_path
+    )
+    history.load({"https://a": (7500000, 14395)})
+
+    # Sin tabla CarPriceHistory el lote y cada fila fallan
+    assert history.record("https://a", 7000000, 13400)
+    deadline = time.time() + 2
+    while not spill_path.exists() and time.time() < deadline:
+        time.sleep(0.01)
+    assert history.pending() == 0
+
+    with sqlite_pool.cursor() as cursor:
+        cursor.execute(PRICE_HISTORY_TABLE)
+    assert history.record("https://a", 6900000, 13200)
+    history.close()
+
+    records = [json.loads(line) for line in spill_path.read_text().splitlines()]
+    assert [(record["URL"], record["PriceColones"]) for record in records] == [
+        ("https://a", 7000000)
+    ]
+    with sqlite_pool.cursor() as cursor:
+        cursor.execute("SELECT URL, PriceColones FROM CarPriceHistory")
+        assert cursor.fetchall() == [("https://a", 6900000)]
+    assert history.saved == 1
@@ -0,0 +1,126 @@
+import sys
+import os
+import itertools
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from driver_pool import DriverPool
+
+
+class FakeDriver:
+    _ids = itertools.count(1)
+
+    def __init__(self):
+        self.id = next(self._ids)
+        self.alive = True
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def health_check(driver):
+    return driver.alive
+
+
+def make_pool(size=2, max_pages=50):
+    started = []
+
+    def factory():
+        driver = FakeDriver()
+        started.append(driver)
+        return driver
+
+    pool = DriverPool(factory, size, max_pages=max_pages, health_check=health_check)
+    return pool, started
+
+
+def test_released_driver_is_reused():
+    pool, started = make_pool()
+
+    with pool.driver() as first:
+        pass
+    with pool.driver() as second:
+        pass
+
+    assert first is second
+    assert len(started) == 1
+
+
+def test_dead_driver_is_replaced_on_acquire():
+    pool, started = make_pool(size=1)
+
+    driver = pool.acquire()
+    driver.alive = False
+    pool.release(driver)
+
+    replacement = pool.acquire()
+    assert replacement is not driver
+    assert driver.quit_called
+    assert len(started) == 2
+
+
+def test_driver_is_recycled_after_max_pages():
+    pool, started = make_pool(size=1, max_pages=3)
+
+    driver = pool.acquire()
+    for _ in range(3):
+        pool.record_page(driver)
+    assert pool.needs_recycle(driver)
+    pool.release(driver)
+
+    assert driver.quit_called
+    fresh = pool.acquire()
+    assert fresh is not driver
+    assert pool.pages_loaded(fresh) == 0
+
+
+def test_record_page_counts_several_loads_at_once():
+    pool, started = make_pool(size=1, max_pages=50)
+
+    driver = pool.acquire()
+    pool.record_page(driver)
+    assert not pool.needs_recycle(driver)
+    # Un listado con sus pestañas de detalle
+    pool.record_page(driver, 49)
+    assert pool.pages_loaded(driver) == 50
+    assert pool.needs_recycle(driver)
+
+
+def test_warm_up_starts_browsers_up_to_pool_size():
+    pool, started = make_pool(size=3)
+
+    pool.warm_up(5)
+    assert len(started) == 3
+
+    drivers = [pool.acquire() for _ in range(3)]
+    assert len(started) == 3
+    assert {driver.id for driver in drivers} == {driver.id for driver in started}
+
+    for driver in drivers:
+        pool.release(driver)
+    pool.close()
+    assert all(driver.quit_called for driver in started)
+
+
+def test_on_quit_runs_for_recycled_discarded_and_closed_drivers():
+    quit_drivers = []
+    pool = DriverPool(
+        FakeDriver,
+        3,
+        max_pages=1,
+        health_check=health_check,
+        on_quit=quit_drivers.append,
+    )
+
+    recycled = pool.acquire()
+    pool.record_page(recycled)
+    pool.release(recycled)
+    discarded = pool.acquire()
+    pool.discard(discarded)
+    idle = pool.acquire()
+    pool.release(idle)
+    pool.close()
+
+    assert quit_drivers == [recycled, discarded, idle]
+    assert all(driver.quit_called for driver in quit_drivers)
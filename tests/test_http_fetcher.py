@@ -0,0 +1,142 @@
+import pytest
+import sys
+import os
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import http_fetcher
+from http_fetcher import (
+    CRAUTOS_SEARCH_RESULTS_PATH,
+    SEARCH_PAGE_PARAM,
+    HttpFetcher,
+    build_search_results_url,
+    extract_total_pages,
+    extract_vehicle_cards,
+    extract_vehicle_links,
+)
+from page_cache import PageCache
+from replay_server import SEARCH_RESULTS_PATH, ReplayServer
+from vehicle_parser import parse_vehicle_html
+
+BRANDS = ["Audi", "Ford", "Mercedes Benz", "Volvo"]
+
+
+RESULTS_HTML = """
+<div class="card"><a href="cardetail.cfm?c=1">Uno</a><h3>¢ 7,500,000</h3><p>($ 14,395)</p></div>
+<div class="card"><a href="cardetail.cfm?c=2">Dos</a></div>
+<div class="card"><a href="#">Publicidad</a></div>
+<ul class="pagination">
+  <li class="page-item page-prev"><a class="page-link" href="#">&laquo;</a></li>
+  <li class="page-item active"><a class="page-link" href="#">1</a></li>
+  <li class="page-item"><a class="page-link" href="searchresults.cfm?p=2">2</a></li>
+  <li class="page-item page-next"><a class="page-link" href="searchresults.cfm?p=2">&raquo;</a></li>
+  <li class="page-item"><a class="page-link btn-xs" href="searchresults.cfm?p=287">Última</a></li>
+</ul>
+"""
+
+
+def test_build_search_results_url():
+    url = build_search_results_url(7, {"brand": "00", "yearfrom": "2015"})
+
+    assert url.startswith(CRAUTOS_SEARCH_RESULTS_PATH + "?")
+    assert parse_qs(urlsplit(url).query) == {
+        "brand": ["00"],
+        "yearfrom": ["2015"],
+        SEARCH_PAGE_PARAM: ["7"],
+    }
+
+
+def test_build_search_results_url_rejects_invalid_pages():
+    with pytest.raises(ValueError):
+        build_search_results_url(0)
+
+
+def test_extract_total_pages():
+    assert extract_total_pages(RESULTS_HTML) == 287
+    assert extract_total_pages("<p>Sin resultados</p>") is None
+
+
+def test_extract_total_pages_from_javascript_links():
+    html = (
+        '<li class="page-item">'
+        '<a class="page-link" href="javascript:goPage(41)">&raquo;&raquo;</a></li>'
+    )
+    assert extract_total_pages(html) == 41
+
+
+def test_extract_vehicle_links_skips_last_card():
+    assert extract_vehicle_links(RESULTS_HTML) == [
+        urljoin(CRAUTOS_SEARCH_RESULTS_PATH, "cardetail.cfm?c=1"),
+        urljoin(CRAUTOS_SEARCH_RESULTS_PATH, "cardetail.cfm?c=2"),
+    ]
+
+
+def test_extract_vehicle_cards_reads_prices():
+    cards = extract_vehicle_cards(RESULTS_HTML)
+
+    assert cards[0] == {
+        "URL": urljoin(CRAUTOS_SEARCH_RESULTS_PATH, "cardetail.cfm?c=1"),
+        "PrecioColones": 7500000,
+        "PrecioDolares": 14395,
+    }
+    assert cards[1]["PrecioColones"] is None
+
+
+@pytest.fixture
+def server(monkeypatch):
+    with ReplayServer(port=0, pages=3, cards_per_page=4) as server:
+        # Las búsquedas usan el URL del módulo; se apunta al servidor local
+        monkeypatch.setattr(
+            http_fetcher,
+            "CRAUTOS_SEARCH_RESULTS_PATH",
+            server.origin + SEARCH_RESULTS_PATH,
+        )
+        yield server
+
+
+def test_fetch_page_downloads_the_fixture_detail_page(server):
+    url = server.site.vehicle_urls()[0]
+    with HttpFetcher(pool_size=1) as fetcher:
+        html, changed = fetcher.fetch_page(url)
+
+    assert changed
+    vehicle_details = parse_vehicle_html(html, BRANDS)
+    assert vehicle_details["Marca"] == "Volvo"
+    assert vehicle_details["PrecioColones"] == 7500000
+
+
+def test_fetch_page_revalidates_cached_pages(server, tmp_path):
+    url = server.site.vehicle_urls()[1]
+    cache = PageCache(str(tmp_path / "cache.sqlite3"))
+    with HttpFetcher(pool_size=1, cache=cache) as fetcher:
+        first_html, first_changed = fetcher.fetch_page(url)
+        second_html, second_changed = fetcher.fetch_page(url)
+    cache.close()
+
+    assert first_changed and not second_changed
+    assert second_html == first_html
+    assert server.stats()["not_modified"] == 1
+
+
+def test_fetch_search_results_and_result_pages(server):
+    with HttpFetcher(pool_size=1) as fetcher:
+        first_page, results_url = fetcher.fetch_search_results()
+        last_page = fetcher.fetch_results_page(3)
+
+    assert extract_total_pages(first_page, results_url) == 3
+    assert extract_vehicle_links(first_page, results_url) == (
+        server.site.vehicle_urls()[:4]
+    )
+    assert (
+        extract_vehicle_links(last_page, build_search_results_url(3))
+        == server.site.vehicle_urls()[8:]
+    )
+
+
+def test_fetch_raises_on_http_errors(server):
+    with HttpFetcher(pool_size=1, retries=0) as fetcher:
+        with pytest.raises(requests.HTTPError):
+            fetcher.fetch(f"{server.origin}/no-existe")
@@ -0,0 +1,141 @@
+import pytest
+import sys
+import os
+import gzip
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import page_archive
+from page_archive import (
+    GZIP_CODEC,
+    INDEX_ENTRY,
+    INDEX_FILE,
+    ZSTD_CODEC,
+    ArchiveReader,
+    PageArchive,
+    list_segments,
+    resolve_codec,
+)
+
+URL = "https://crautos.com/autosusados/cardetail.cfm?c=1"
+OTHER_URL = "https://crautos.com/autosusados/cardetail.cfm?c=2"
+
+
+def test_get_returns_the_latest_version_or_the_one_before_a_date(tmp_path):
+    with PageArchive(str(tmp_path)) as archive:
+        archive.append(URL, "<p>primera</p>", fetched_at=100)
+        archive.append(OTHER_URL, "<p>otro</p>", fetched_at=150)
+        archive.append(URL, "<p>segunda</p>", fetched_at=200)
+
+    with ArchiveReader(str(tmp_path)) as reader:
+        assert len(reader) == 3
+        assert reader.get(URL).html == "<p>segunda</p>"
+        assert reader.get(URL, fetched_before=199).html == "<p>primera</p>"
+        assert reader.get(URL, fetched_before=99) is None
+        assert reader.get("https://crautos.com/otro") is None
+        assert [entry.fetched_at for entry in reader.lookup(URL)] == [100, 200]
+
+
+def test_iter_pages_streams_every_segment_in_order(tmp_path):
+    pages = [(f"{URL}{index}", f"<p>{'x' * 200} {index}</p>") for index in range(10)]
+    with PageArchive(str(tmp_path), segment_max_bytes=300) as archive:
+        for index, (url, html) in enumerate(pages):
+            archive.append(url, html, fetched_at=index)
+
+    assert len(list_segments(str(tmp_path))) > 1
+    with ArchiveReader(str(tmp_path)) as reader:
+        assert [(page.url, page.html) for page in reader.iter_pages()] == pages
+        assert [page.fetched_at for page in reader.iter_pages(since=3, until=5)] == [
+            3,
+            4,
+            5,
+        ]
+
+
+def test_iter_latest_pages_skips_older_versions(tmp_path):
+    with PageArchive(str(tmp_path), segment_max_bytes=100) as archive:
+        archive.append(URL, "<p>segunda</p>", fetched_at=200)
+        archive.append(OTHER_URL, "<p>otro</p>", fetched_at=150)
+        archive.append(URL, "<p>primera</p>", fetched_at=100)
+        archive.append(OTHER_URL, "<p>otro otra vez</p>", fetched_at=150)
+
+    with ArchiveReader(str(tmp_path)) as reader:
+        assert [(page.url, page.html) for page in reader.iter_latest_pages()] == [
+            (URL, "<p>segunda</p>"),
+            (OTHER_URL, "<p>otro otra vez</p>"),
+        ]
+
+
+def test_meta_is_kept_with_the_pages(tmp_path):
+    with PageArchive(str(tmp_path)) as archive:
+        archive.set_meta("brands", ["Audi"])
+        archive.set_meta("brands", ["Audi", "Mercedes Benz"])
+        archive.append(URL, "<p>primera</p>", fetched_at=100)
+
+    with ArchiveReader(str(tmp_path)) as reader:
+        assert reader.get_meta("brands") == ["Audi", "Mercedes Benz"]
+        assert reader.get_meta("missing", []) == []
+        assert len(list(reader.iter_pages())) == 1
+
+
+def test_gzip_segments_are_plain_multi_member_gzip_files(tmp_path):
+    with PageArchive(str(tmp_path)) as archive:
+        archive.append(URL, "<p>uno</p>")
+        archive.append(OTHER_URL, "<p>dos</p>")
+
+    (segment_file,) = list_segments(str(tmp_path)).values()
+    with gzip.open(tmp_path / segment_file) as file:
+        assert file.read() == (
+            f"{URL}\n<p>uno</p>{OTHER_URL}\n<p>dos</p>".encode("utf-8")
+        )
+
+
+def test_reopening_continues_the_archive_and_drops_a_torn_index_entry(tmp_path):
+    with PageArchive(str(tmp_path)) as archive:
+        archive.append(URL, "<p>primera</p>", fetched_at=100)
+    # Una escritura cortada a la mitad del índice
+    with open(tmp_path / INDEX_FILE, "ab") as file:
+        file.write(b"\0" * (INDEX_ENTRY.size // 2))
+
+    with PageArchive(str(tmp_path)) as archive:
+        archive.append(OTHER_URL, "<p>otro</p>", fetched_at=200)
+
+    assert os.path.getsize(tmp_path / INDEX_FILE) == 2 * INDEX_ENTRY.size
+    assert len(list_segments(str(tmp_path))) == 1
+    with ArchiveReader(str(tmp_path)) as reader:
+        assert [page.url for page in reader.iter_pages()] == [URL, OTHER_URL]
+
+
+def test_empty_archive_has_no_pages(tmp_path):
+    PageArchive(str(tmp_path)).close()
+
+    with ArchiveReader(str(tmp_path)) as reader:
+        assert len(reader) == 0
+        assert list(reader.iter_pages()) == []
+        assert reader.get(URL) is None
+
+
+def test_resolve_codec_falls_back_without_zstandard(monkeypatch):
+    monkeypatch.setattr(page_archive, "zstandard", None)
+    assert resolve_codec(ZSTD_CODEC) == GZIP_CODEC
+
+    with pytest.raises(ValueError):
+        resolve_codec("bz2")
+
+
+def test_zstd_segments_can_follow_gzip_segments(tmp_path):
+    pytest.importorskip("zstandard")
+    with PageArchive(str(tmp_path)) as archive:
+        archive.append(URL, "<p>gzip</p>")
+    with PageArchive(str(tmp_path), codec=ZSTD_CODEC) as archive:
+        archive.append(OTHER_URL, "<p>zstd</p>")
+
+    assert sorted(list_segments(str(tmp_path)).values()) == [
+        "segment-000001.gz",
+        "segment-000002.zst",
+    ]
+    with ArchiveReader(str(tmp_path)) as reader:
+        assert [page.html for page in reader.iter_pages()] == [
+            "<p>gzip</p>",
+            "<p>zstd</p>",
+        ]
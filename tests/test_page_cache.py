@@ -0,0 +1,127 @@
+import pytest
+import sys
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from http_fetcher import HttpFetcher
+from page_cache import PageCache, conditional_headers
+
+
+def test_put_and_get_round_trip(tmp_path):
+    cache = PageCache(str(tmp_path / "cache.sqlite3"))
+
+    assert cache.put("https://a", "<html>á</html>", etag='"v1"')
+    page = cache.get("https://a")
+
+    assert page.html == "<html>á</html>"
+    assert conditional_headers(page) == {"If-None-Match": '"v1"'}
+    assert cache.get("https://missing") is None
+
+
+def test_put_reports_whether_content_changed(tmp_path):
+    cache = PageCache(str(tmp_path / "cache.sqlite3"))
+
+    assert cache.put("https://a", "<html>1</html>")
+    assert not cache.put("https://a", "<html>1</html>")
+    assert cache.put("https://a", "<html>2</html>")
+    assert len(cache) == 1
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = PageCache(path, max_bytes=10**9)
+    pages = {f"https://{index}": os.urandom(2000).hex() for index in range(5)}
+    for url, html in pages.items():
+        cache.put(url, html)
+
+    page_size = cache.size() // 5
+    cache = PageCache(path, max_bytes=page_size * 4)
+    cache.get("https://0")
+    cache.put("https://5", os.urandom(2000).hex())
+
+    assert "https://0" in cache
+    assert "https://1" not in cache
+    assert cache.size() <= cache.max_bytes
+
+
+def test_size_limit_is_shared_between_cache_instances(tmp_path):
+    # Como dos workers locales en procesos distintos sobre el mismo archivo
+    path = str(tmp_path / "cache.sqlite3")
+    html = os.urandom(2000).hex()
+    first = PageCache(path, max_bytes=10**9)
+    first.put("https://probe", html)
+    page_size = first.size()
+    first.max_bytes = page_size * 4
+    second = PageCache(path, max_bytes=page_size * 4)
+
+    for index in range(5):
+        first.put(f"https://first/{index}", os.urandom(2000).hex())
+        second.put(f"https://second/{index}", os.urandom(2000).hex())
+
+    assert first.size() == second.size()
+    assert second.size() <= page_size * 4
+
+
+def test_meta_is_kept_with_the_pages(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = PageCache(path)
+    assert cache.get_meta("brands") is None
+    cache.set_meta("brands", ["Audi", "Mercedes Benz"])
+    cache.close()
+
+    assert PageCache(path).get_meta("brands") == ["Audi", "Mercedes Benz"]
+
+
+def test_iter_pages_for_offline_parsing(tmp_path):
+    cache = PageCache(str(tmp_path / "cache.sqlite3"))
+    cache.put("https://b", "<p>b</p>")
+    cache.put("https://a", "<p>a</p>")
+
+    assert [(page.url, page.html) for page in cache.iter_pages()] == [
+        ("https://a", "<p>a</p>"),
+        ("https://b", "<p>b</p>"),
+    ]
+
+
+class EtagHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = b"<html>detalle</html>"
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def etag_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), EtagHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_fetch_page_uses_conditional_requests(tmp_path, etag_server):
+    cache = PageCache(str(tmp_path / "cache.sqlite3"))
+    url = f"{etag_server}/cardetail.cfm?c=1"
+
+    with HttpFetcher(cache=cache) as fetcher:
+        assert fetcher.fetch_page(url) == ("<html>detalle</html>", True)
+        assert fetcher.fetch_page(url) == ("<html>detalle</html>", False)
+
+    assert EtagHandler.requests[-2:] == [None, '"v1"']
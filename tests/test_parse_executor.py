@@ -0,0 +1,98 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import parse_executor
+from parse_executor import ParseExecutor, batches, resolve_backend
+from run_metrics import RunMetrics
+from vehicle_parser import (
+    HTML_PARSER,
+    LXML_PARSER,
+    parse_vehicle_html,
+    reformat_vehicle_details,
+)
+
+# Ruta a los archivos HTML de prueba
+HTML_DIR = os.path.join(os.path.dirname(__file__), "mock_html")
+
+BRANDS = ["Audi", "Ford", "Mercedes Benz", "Volvo"]
+
+PAGES = [
+    "Colones/Colones_Example.html",
+    "Dollars/Dollars_Example.html",
+    "Dollars_EV/Dollars_example.html",
+    "Sale/Sale_example.html",
+]
+
+
+def load_local_html(file_name):
+    with open(os.path.join(HTML_DIR, file_name), encoding="utf-8") as file:
+        return file.read()
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with ParseExecutor(processes=2, batch_size=3) as executor:
+        yield executor
+
+
+def test_map_matches_in_process_parsing_and_keeps_order(executor):
+    pages = [
+        (f"page-{index}", load_local_html(PAGES[index % 4])) for index in range(10)
+    ]
+
+    results = list(executor.map(iter(pages), BRANDS))
+
+    assert [key for key, _, _ in results] == [key for key, _ in pages]
+    for (_, html), (_, vehicle_details, error) in zip(pages, results):
+        assert error is None
+        assert vehicle_details == reformat_vehicle_details(
+            parse_vehicle_html(html, BRANDS)
+        )
+
+
+def test_failed_pages_are_reported_without_stopping_the_batch(executor):
+    html = load_local_html(PAGES[0])
+    results = list(executor.map([("good", html), ("bad", None)], BRANDS))
+
+    assert results[0][2] is None
+    assert results[1][0] == "bad"
+    assert results[1][1] is None
+    assert results[1][2].startswith("TypeError")
+
+    with pytest.raises(ValueError):
+        executor.parse_page(None, BRANDS)
+
+
+def test_parse_page_records_metrics():
+    metrics = RunMetrics()
+    with ParseExecutor(processes=1, metrics=metrics) as executor:
+        vehicle_details = executor.parse_page(load_local_html(PAGES[0]), BRANDS)
+
+    assert vehicle_details["Marca"] == "Volvo"
+    summary = metrics.summary()
+    assert summary["stages"]["parse"]["count"] == 1
+    assert summary["counters"]["vehicles_parsed"] == 1
+
+
+def test_batches_split_any_iterable():
+    assert list(batches(iter(range(7)), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_resolve_backend_falls_back_without_lxml(monkeypatch):
+    monkeypatch.setattr(parse_executor, "lxml", None)
+    assert resolve_backend(LXML_PARSER) == HTML_PARSER
+
+    with pytest.raises(ValueError):
+        resolve_backend("html5")
+
+
+def test_lxml_backend_parses_like_html_parser():
+    pytest.importorskip("lxml")
+    for file_name in PAGES:
+        html = load_local_html(file_name)
+        assert parse_vehicle_html(html, BRANDS, LXML_PARSER) == parse_vehicle_html(
+            html, BRANDS
+        )
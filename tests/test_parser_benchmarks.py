@@ -0,0 +1,65 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+)
+
+from corpus import inflate_page, load_fixture_pages, scale_corpus
+from parser_suite import STAGES, find_regressions, run_corpus
+from vehicle_parser import parse_vehicle_html
+
+BRANDS = ["Audi", "Ford", "Mercedes Benz", "Volvo"]
+
+
+def test_scaled_corpus_cycles_fixtures_with_distinct_pages():
+    pages = scale_corpus([("a", "<p>a</p>"), ("b", "<p>b</p>")], 5)
+    assert [name for name, _ in pages] == ["a-0", "b-1", "a-2", "b-3", "a-4"]
+    assert len({html for _, html in pages}) == 5
+
+
+def test_inflated_page_parses_like_the_original():
+    name, html = load_fixture_pages()[0]
+    inflated = inflate_page(html, 50)
+
+    assert len(inflated) > len(html)
+    assert parse_vehicle_html(inflated, BRANDS) == parse_vehicle_html(html, BRANDS)
+
+
+def test_run_corpus_reports_rate_stages_and_memory():
+    result = run_corpus(load_fixture_pages(), BRANDS, repeat=1)
+
+    assert result["pages"] == 4
+    assert result["pages_per_second"] > 0
+    assert set(result["stage_seconds"]) == set(STAGES)
+    assert result["peak_memory_bytes"] > 0
+
+
+@pytest.mark.parametrize(
+    "calibration, pages_per_second, peak, regressions",
+    [
+        (1.0, 90, 100, 0),
+        (1.0, 70, 100, 1),
+        # Máquina dos veces más lenta: 45 páginas por segundo equivalen a 90
+        (2.0, 45, 100, 0),
+        (1.0, 100, 130, 1),
+    ],
+)
+def test_find_regressions(calibration, pages_per_second, peak, regressions):
+    baseline = {
+        "calibration_seconds": 1.0,
+        "corpora": {"fixtures": {"pages_per_second": 100, "peak_memory_bytes": 100}},
+    }
+    results = {
+        "calibration_seconds": calibration,
+        "corpora": {
+            "fixtures": {
+                "pages_per_second": pages_per_second,
+                "peak_memory_bytes": peak,
+            },
+            "new_corpus": {"pages_per_second": 1, "peak_memory_bytes": 1},
+        },
+    }
+    assert len(find_regressions(results, baseline)) == regressions
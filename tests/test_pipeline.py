@@ -0,0 +1,96 @@
+import pytest
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline import Pipeline, Stage
+from run_metrics import RunMetrics
+
+
+def test_items_pass_through_every_stage():
+    done = {}
+    stages = [
+        Stage("parse", lambda value: value * 2, 3, 4),
+        Stage("persist", lambda value: value + 1, 1, 4),
+    ]
+    with Pipeline(stages, on_done=done.__setitem__) as pipeline:
+        for index in range(20):
+            pipeline.submit(f"item-{index}", index)
+
+    assert done == {f"item-{index}": index * 2 + 1 for index in range(20)}
+
+
+def test_failed_items_reach_on_error_and_skip_later_stages():
+    done, errors = [], []
+
+    def parse(value):
+        if value == 3:
+            raise ValueError("bad page")
+        return value
+
+    stages = [Stage("parse", parse, 2, 2), Stage("persist", lambda value: value, 1, 2)]
+    pipeline = Pipeline(
+        stages,
+        on_done=lambda key, value: done.append(key),
+        on_error=lambda key, stage, error: errors.append((key, stage, str(error))),
+    )
+    for index in range(5):
+        pipeline.submit(index, index)
+    pipeline.close()
+
+    assert sorted(done) == [0, 1, 2, 4]
+    assert errors == [(3, "parse", "bad page")]
+
+
+def test_full_queue_blocks_submit_until_the_stage_catches_up():
+    release = threading.Event()
+    metrics = RunMetrics()
+    pipeline = Pipeline(
+        [Stage("persist", lambda value: release.wait(), 1, 1)], metrics=metrics
+    )
+    # Uno lo procesa el hilo y otro ocupa la cola
+    pipeline.submit("a", 1)
+    pipeline.submit("b", 2)
+
+    submitted = threading.Event()
+    producer = threading.Thread(
+        target=lambda: (pipeline.submit("c", 3), submitted.set())
+    )
+    producer.start()
+    assert not submitted.wait(0.2)
+
+    release.set()
+    assert submitted.wait(2)
+    producer.join()
+    pipeline.close()
+
+    assert metrics.summary()["stages"]["persist_queue_wait"]["count"] == 3
+
+
+def test_drain_waits_for_items_in_every_stage():
+    done = []
+    stages = [
+        Stage("parse", lambda value: value, 2, 8),
+        Stage("persist", lambda value: value, 1, 8),
+    ]
+    pipeline = Pipeline(stages, on_done=lambda key, value: done.append(key))
+    for index in range(10):
+        pipeline.submit(index, index)
+
+    pipeline.drain()
+    assert sorted(done) == list(range(10))
+
+    # Después de drain el pipeline sigue aceptando elementos
+    pipeline.submit(10, 10)
+    pipeline.close()
+    assert len(done) == 11
+
+
+def test_closed_pipeline_rejects_items():
+    pipeline = Pipeline([Stage("parse", lambda value: value, 1, 1)])
+    pipeline.close()
+
+    with pytest.raises(RuntimeError):
+        pipeline.submit("a", 1)
@@ -0,0 +1,100 @@
+import pytest
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from rate_limiter import (
+    MIN_LATENCY_SAMPLES,
+    AimdController,
+    RateLimiter,
+    TokenBucket,
+)
+
+
+def test_token_bucket_limits_rate_after_burst():
+    bucket = TokenBucket(rate=50, capacity=5)
+    start = time.monotonic()
+    for _ in range(15):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+
+    # 5 fichas de ráfaga y 10 más a 50 por segundo
+    assert elapsed == pytest.approx(0.2, abs=0.08)
+
+
+def test_aimd_increases_additively_and_decreases_multiplicatively():
+    bucket = TokenBucket(rate=4)
+    controller = AimdController(bucket, min_rate=1, max_rate=5, cooldown=0)
+
+    controller.on_success(0.1)
+    assert bucket.rate == pytest.approx(4.25)
+
+    controller.on_error()
+    assert bucket.rate == pytest.approx(2.125)
+
+    for _ in range(100):
+        controller.on_success(0.1)
+    assert bucket.rate == 5
+
+    for _ in range(10):
+        controller.on_error()
+    assert bucket.rate == 1
+
+
+def test_aimd_backs_off_on_latency_spike():
+    bucket = TokenBucket(rate=4)
+    controller = AimdController(bucket, max_rate=4, cooldown=0)
+    for _ in range(MIN_LATENCY_SAMPLES):
+        controller.on_success(0.1)
+    assert bucket.rate == 4
+
+    controller.on_success(1.0)
+    assert bucket.rate == 2
+
+
+def test_aimd_cooldown_ignores_errors_from_the_same_burst():
+    bucket = TokenBucket(rate=8)
+    controller = AimdController(bucket, cooldown=60)
+
+    controller.on_error()
+    controller.on_error()
+    assert bucket.rate == 4
+
+
+def test_rate_limiter_reports_errors_and_caps_concurrency():
+    limiter = RateLimiter(rate=100, max_concurrency=2, cooldown=0)
+    url = "https://crautos.com/autosusados/"
+
+    with pytest.raises(TimeoutError):
+        with limiter.request(url):
+            raise TimeoutError
+    with limiter.request(url) as slot:
+        slot.failed("HTTP 503")
+    assert limiter.current_rate(url) == 25
+
+    # Otro host tiene su propio ritmo
+    assert limiter.current_rate("https://example.com/") == 100
+
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def fetch():
+        with limiter.request(url):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+
+    threads = [threading.Thread(target=fetch) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) <= 2
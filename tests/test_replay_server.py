@@ -0,0 +1,93 @@
+import pytest
+import sys
+import os
+import subprocess
+from urllib.parse import urljoin
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from http_fetcher import extract_total_pages, extract_vehicle_cards
+from page_cache import PageCache
+from replay_server import SEARCH_RESULTS_PATH, USED_CARS_PATH, ReplayServer
+from listing_status import AVAILABLE, EXITED
+from sold_checker import probe_vehicle_page
+from vehicle_parser import parse_vehicle_html
+
+BRANDS = ["Audi", "Ford", "Mercedes Benz", "Volvo"]
+
+
+@pytest.fixture
+def server():
+    with ReplayServer(port=0, pages=3, cards_per_page=4, removed_ratio=0.2) as server:
+        yield server
+
+
+def test_results_pages_have_cards_and_pagination(server):
+    search_url = server.origin + SEARCH_RESULTS_PATH
+    with requests.Session() as session:
+        first_page = session.post(search_url, data={"brand": "00"}).text
+        last_page_url = f"{search_url}?brand=00&p=3"
+        last_page = session.get(last_page_url).text
+
+    assert extract_total_pages(first_page, search_url) == 3
+    cards = extract_vehicle_cards(last_page, last_page_url)
+    assert [card["URL"] for card in cards] == server.site.vehicle_urls()[8:]
+    assert cards[0]["PrecioColones"] == 7500000
+    assert cards[0]["PrecioDolares"] == 14395
+
+
+def test_detail_pages_serve_the_fixtures(server):
+    url = server.site.vehicle_urls()[1]
+    with requests.Session() as session:
+        vehicle_details = parse_vehicle_html(session.get(url).text, BRANDS)
+        state = probe_vehicle_page(session, url)
+
+    assert vehicle_details["Marca"] == "Mercedes Benz"
+    assert vehicle_details["PrecioDolares"] == 15500
+    assert state == AVAILABLE
+
+
+def test_removed_listings_redirect_to_the_listing(server):
+    removed_urls = server.site.vehicle_urls(removed=True)
+
+    assert len(removed_urls) == 3
+    with requests.Session() as session:
+        assert probe_vehicle_page(session, removed_urls[0]) == EXITED
+    assert server.stats()["removed"] == 1
+
+
+def test_conditional_requests_get_not_modified(server, tmp_path):
+    url = server.site.vehicle_urls()[0]
+    cache = PageCache(str(tmp_path / "cache.sqlite3"))
+    with requests.Session() as session:
+        response = session.get(url)
+        cache.put(url, response.text, response.headers["ETag"])
+        assert probe_vehicle_page(session, url, cache=cache) == AVAILABLE
+
+    assert server.stats()["not_modified"] == 1
+    cache.close()
+
+
+def test_error_rate_answers_service_unavailable():
+    with ReplayServer(port=0, error_rate=1.0, seed=1) as server:
+        response = requests.get(server.origin + USED_CARS_PATH)
+    assert response.status_code == 503
+
+
+def test_base_path_can_be_overridden():
+    base_path = "http://127.0.0.1:8000/index.cfm"
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import http_fetcher; print(http_fetcher.CRAUTOS_SEARCH_RESULTS_PATH)",
+        ],
+        cwd=os.path.join(os.path.dirname(__file__), ".."),
+        env={**os.environ, "CRAUTOS_BASE_PATH": base_path},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert output.strip() == urljoin(base_path, SEARCH_RESULTS_PATH)
@@ -0,0 +1,88 @@
+import pytest
+import sys
+import os
+import json
+import threading
+import urllib.request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from run_metrics import DB_WRITE, PARSE, Histogram, RunMetrics, timed
+
+
+def test_histogram_counts_buckets_and_quantiles():
+    histogram = Histogram(buckets=(0.1, 1, 10))
+    for seconds in (0.05, 0.5, 0.5, 5):
+        histogram.observe(seconds)
+
+    assert histogram.cumulative_counts() == [1, 3, 4]
+    assert histogram.quantile(0.5) == 1
+    assert histogram.quantile(0.95) == 10
+    assert histogram.summary()["total_seconds"] == pytest.approx(6.05)
+
+
+def test_run_metrics_groups_stages_and_counters_by_worker():
+    metrics = RunMetrics()
+    metrics.observe(PARSE, 0.2, worker="a")
+    metrics.observe(PARSE, 0.4, worker="b")
+    metrics.count("pages", 3, worker="a")
+    metrics.count("pages", 2, worker="b")
+
+    summary = metrics.summary()
+    assert summary["stages"][PARSE]["count"] == 2
+    assert summary["stages"][PARSE]["total_seconds"] == pytest.approx(0.6)
+    assert summary["counters"] == {"pages": 5}
+    assert summary["workers"]["a"]["counters"] == {"pages": 3}
+    assert summary["workers"]["b"]["stages"][PARSE]["count"] == 1
+    assert summary["workers"]["a"]["throughput_per_second"]["pages"] > 0
+
+
+def test_time_uses_thread_name_and_counts_errors():
+    metrics = RunMetrics()
+
+    def work():
+        with pytest.raises(ValueError):
+            with metrics.time(DB_WRITE):
+                raise ValueError("boom")
+
+    thread = threading.Thread(target=work, name="Worker-7")
+    thread.start()
+    thread.join()
+
+    worker = metrics.summary()["workers"]["Worker-7"]
+    assert worker["stages"][DB_WRITE]["count"] == 1
+    assert worker["counters"] == {"db_write_errors": 1}
+
+
+def test_timed_without_metrics_does_nothing():
+    with timed(None, PARSE):
+        pass
+
+
+def test_write_json(tmp_path):
+    metrics = RunMetrics()
+    metrics.observe(PARSE, 0.01)
+    path = tmp_path / "metrics.json"
+    metrics.write_json(path)
+
+    assert json.loads(path.read_text(encoding="utf-8"))["stages"][PARSE]["count"] == 1
+
+
+def test_prometheus_endpoint():
+    metrics = RunMetrics(buckets=(0.1, 1))
+    metrics.observe(PARSE, 0.5, worker="w")
+    metrics.count("pages", worker="w")
+
+    server = metrics.serve_prometheus(port=0, host="127.0.0.1")
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url) as response:
+            text = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert 'crautos_stage_seconds_bucket{stage="parse",worker="w",le="0.1"} 0' in text
+    assert 'crautos_stage_seconds_bucket{stage="parse",worker="w",le="1"} 1' in text
+    assert 'crautos_stage_seconds_count{stage="parse",worker="w"} 1' in text
+    assert 'crautos_events_total{event="pages",worker="w"} 1' in text
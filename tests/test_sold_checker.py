@@ -0,0 +1,94 @@
+import pytest
+import sys
+import os
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from listing_status import AVAILABLE, EXITED, UNKNOWN
+from sold_checker import (
+    HostRateLimiter,
+    check_availability,
+    find_exited_vehicle_urls,
+    find_exited_vehicle_urls_http,
+)
+from url_index import UrlIndex
+
+
+def test_find_exited_vehicle_urls_returns_open_urls_missing_from_crawl():
+    open_urls = ["https://a", "https://b", "https://c"]
+    seen_urls = UrlIndex(["https://b", "https://new"])
+
+    assert find_exited_vehicle_urls(open_urls, seen_urls) == ["https://a", "https://c"]
+
+
+def test_find_exited_vehicle_urls_with_nothing_missing():
+    assert find_exited_vehicle_urls(["https://a"], {"https://a"}) == []
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    pages = {
+        "/available": (200, b"<html>" + b" " * 20000 + b"<a href='#tab-1'>"),
+        "/removed": (200, b"<html>Anuncio no encontrado</html>"),
+        "/gone": (404, b"Not found"),
+        "/forbidden": (403, b"Forbidden"),
+    }
+
+    def do_GET(self):
+        status, body = self.pages.get(self.path, (404, b""))
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_check_availability_against_stub_server(stub_server):
+    urls = [f"{stub_server}{path}" for path in StubHandler.pages]
+
+    statuses = asyncio.run(
+        check_availability(urls, concurrency=4, requests_per_second=100)
+    )
+
+    assert statuses == {
+        f"{stub_server}/available": AVAILABLE,
+        f"{stub_server}/removed": EXITED,
+        f"{stub_server}/gone": EXITED,
+        f"{stub_server}/forbidden": UNKNOWN,
+    }
+
+
+def test_find_exited_vehicle_urls_http(stub_server):
+    urls = [f"{stub_server}/available", f"{stub_server}/gone"]
+
+    assert find_exited_vehicle_urls_http(urls, requests_per_second=100) == [
+        f"{stub_server}/gone"
+    ]
+
+
+def test_host_rate_limiter_spaces_requests_per_host():
+    async def run():
+        limiter = HostRateLimiter(requests_per_second=20)
+        start = time.monotonic()
+        await asyncio.gather(
+            *(limiter.wait("http://same-host/page") for _ in range(5)),
+            limiter.wait("http://other-host/page"),
+        )
+        return time.monotonic() - start
+
+    # 5 solicitudes al mismo host a 20 por segundo: al menos 4 intervalos de 50 ms
+    assert asyncio.run(run()) >= 0.19
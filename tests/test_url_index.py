@@ -0,0 +1,44 @@
+import pytest
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from url_index import UrlIndex
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_url_index_lookup_add_and_discard(compact):
+    index = UrlIndex(["https://a", "https://b"], compact=compact)
+
+    assert "https://a" in index
+    assert "https://c" not in index
+    assert len(index) == 2
+
+    assert index.add("https://c")
+    assert not index.add("https://a")
+    assert len(index) == 3
+
+    index.discard("https://c")
+    assert "https://c" not in index
+
+
+def test_url_index_add_claims_url_for_a_single_thread():
+    index = UrlIndex(compact=True)
+    claimed = []
+    lock = threading.Lock()
+
+    def worker():
+        for number in range(500):
+            if index.add(f"https://crautos.com/cardetail.cfm?c={number}"):
+                with lock:
+                    claimed.append(number)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == list(range(500))
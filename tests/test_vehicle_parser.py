@@ -0,0 +1,170 @@
+import pytest
+import sys
+import os
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from vehicle_parser import (
+    VEHICLE_FIELDS,
+    BrandTrie,
+    HeaderParser,
+    find_price_colones,
+    find_price_dolares,
+    get_header_parser,
+    parse_fields_table,
+    parse_vehicle_html,
+)
+
+# Ruta a los archivos HTML de prueba
+HTML_DIR = os.path.join(os.path.dirname(__file__), "mock_html")
+
+BRANDS = ["Audi", "Ford", "Mercedes Benz", "Volvo"]
+
+
+def load_local_html(file_name):
+    with open(os.path.join(HTML_DIR, file_name), encoding="utf-8") as file:
+        return file.read()
+
+
+def test_parse_vehicle_html_colones_listing():
+    vehicle_details = parse_vehicle_html(
+        load_local_html("Colones/Colones_Example.html"), BRANDS
+    )
+    assert vehicle_details["Marca"] == "Volvo"
+    assert vehicle_details["Modelo"] == "S60"
+    assert vehicle_details["Año"] == "2012"
+    assert vehicle_details["PrecioColones"] == 7500000
+    assert vehicle_details["PrecioDolares"] == 14395
+    assert vehicle_details["Cilindrada"] == "2000 cc"
+    assert vehicle_details["Estilo"] == "Sedán"
+    assert vehicle_details["# de pasajeros"] == "5"
+    assert vehicle_details["Combustible"] == "Gasolina"
+    assert vehicle_details["Transmisión"] == "Automática/Dual"
+    assert vehicle_details["Estado"] == "Excelente"
+    assert vehicle_details["Kilometraje"] == "98,000 kms"
+    assert vehicle_details["Color exterior"] == "BEIGE"
+    assert vehicle_details["# de puertas"] == "4"
+    assert vehicle_details["Ya pagó impuestos"] == "SI"
+    assert vehicle_details["Precio negociable"] == "SI"
+    assert vehicle_details["Se recibe vehículo"] == "NO"
+    assert vehicle_details["Provincia"] == "San José"
+    assert vehicle_details["Fecha de ingreso"] == "03 de Julio del 2024"
+    assert vehicle_details["Autonomía"] is None
+    assert vehicle_details["Batería"] is None
+
+
+def test_parse_vehicle_html_dolares_listing():
+    vehicle_details = parse_vehicle_html(
+        load_local_html("Dollars/Dollars_Example.html"), BRANDS
+    )
+    assert vehicle_details["Marca"] == "Mercedes Benz"
+    assert vehicle_details["Modelo"] == "B200"
+    assert vehicle_details["Año"] == "2013"
+    assert vehicle_details["PrecioColones"] == 8075500
+    assert vehicle_details["PrecioDolares"] == 15500
+    assert vehicle_details["Kilometraje"] == "93,000 kms"
+    assert vehicle_details["Fecha de ingreso"] == "01 de Agosto del 2024"
+
+
+def test_parse_vehicle_html_electric_listing():
+    vehicle_details = parse_vehicle_html(
+        load_local_html("Dollars_EV/Dollars_example.html"), BRANDS
+    )
+    assert vehicle_details["Marca"] == "Audi"
+    assert vehicle_details["Modelo"] == "E-TRON"
+    assert vehicle_details["PrecioColones"] == 33865000
+    assert vehicle_details["PrecioDolares"] == 65000
+    assert vehicle_details["Combustible"] == "Eléctrico"
+    assert vehicle_details["Cilindrada"] is None
+    assert vehicle_details["Autonomía"] == "ND"
+    assert vehicle_details["Batería"] == "ND"
+
+
+def test_parse_vehicle_html_sale_listing_uses_lowest_price():
+    vehicle_details = parse_vehicle_html(
+        load_local_html("Sale/Sale_example.html"), BRANDS
+    )
+    assert vehicle_details["Marca"] == "Ford"
+    assert vehicle_details["Modelo"] == "FIGO"
+    assert vehicle_details["Año"] == "2017"
+    assert vehicle_details["PrecioColones"] == 4600000
+    assert vehicle_details["PrecioDolares"] == 8829
+
+
+def test_parse_vehicle_html_returns_all_fields():
+    vehicle_details = parse_vehicle_html("<html><body></body></html>", BRANDS)
+    assert set(vehicle_details) == set(VEHICLE_FIELDS)
+    assert all(value is None for value in vehicle_details.values())
+
+
+def test_parse_fields_table_fills_every_field_in_one_label():
+    html = (
+        "<table><tr><td>Color exterior / Color interior</td><td>Rojo</td>"
+        "<td>Estilo</td><td>Sedán</td></tr></table>"
+    )
+    vehicle_details = parse_fields_table(BeautifulSoup(html, "html.parser"))
+
+    assert vehicle_details["Color exterior"] == "Rojo"
+    assert vehicle_details["Color interior"] == "Rojo"
+    assert vehicle_details["Estilo"] == "Sedán"
+
+
+@pytest.mark.parametrize(
+    "texts, colones, dolares",
+    [
+        (["¢  7,500,000", "($ 14,395)*"], 7500000, 14395),
+        (["$ 15,500", "(¢  8,075,500)*"], 8075500, 15500),
+        (["Volvo S60 2012"], None, None),
+    ],
+)
+def test_find_prices(texts, colones, dolares):
+    assert find_price_colones(texts) == colones
+    assert find_price_dolares(texts) == dolares
+
+
+def test_brand_trie_prefers_longest_brand():
+    trie = BrandTrie(["Mercedes", "Mercedes Benz", "Mini"])
+    assert trie.longest_prefix("Mercedes Benz B200 2013") == "Mercedes Benz"
+    assert trie.longest_prefix("Mercedes AMG 2020") == "Mercedes"
+    assert trie.longest_prefix("Mini Cooper 2015") == "Mini"
+    assert trie.longest_prefix("Mazda 3 2015") is None
+
+
+@pytest.mark.parametrize(
+    "h1_texts, h3_texts, expected",
+    [
+        (
+            ["Volvo S60 2012", "¢  7,500,000"],
+            ["($ 14,395)*"],
+            {
+                "Marca": "Volvo",
+                "Modelo": "S60",
+                "Año": "2012",
+                "PrecioColones": 7500000,
+                "PrecioDolares": 14395,
+            },
+        ),
+        (
+            ["Mercedes Benz B200 2013", "$ 15,500"],
+            ["(¢  8,075,500)*"],
+            {
+                "Marca": "Mercedes Benz",
+                "Modelo": "B200",
+                "Año": "2013",
+                "PrecioColones": 8075500,
+                "PrecioDolares": 15500,
+            },
+        ),
+        (["Ford Figo"], [], {"Marca": "Ford"}),
+        (["Mazda 3 2015", "¢ 5,000,000"], [], {"PrecioColones": 5000000}),
+        ([], [], {}),
+    ],
+)
+def test_header_parser(h1_texts, h3_texts, expected):
+    assert HeaderParser(BRANDS).parse(h1_texts, h3_texts) == expected
+
+
+def test_get_header_parser_reuses_parser_for_same_brands():
+    assert get_header_parser(BRANDS) is get_header_parser(list(BRANDS))
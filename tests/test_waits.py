@@ -0,0 +1,99 @@
+import pytest
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from selenium.common.exceptions import TimeoutException
+
+from listing_status import AVAILABLE, EXITED
+from waits import (
+    AVAILABLE_LISTING_SELECTOR,
+    VEHICLE_HEADER_SELECTOR,
+    AdaptiveTimeout,
+    listing_state,
+    scroll_settled,
+)
+
+
+class FakePage:
+    def __init__(
+        self,
+        url="https://crautos.com/autosusados/cardetail.cfm?c=1",
+        ready_state="loading",
+        selectors=(),
+        height=1000,
+        resources=10,
+    ):
+        self.current_url = url
+        self.ready_state = ready_state
+        self.selectors = set(selectors)
+        self.height = height
+        self.resources = resources
+
+    def find_elements(self, by, selector):
+        return [object()] if selector in self.selectors else []
+
+    def execute_script(self, script):
+        if "scrollHeight" in script:
+            return self.height
+        if "getEntriesByType" in script:
+            return self.resources if self.ready_state == "complete" else -1
+        return self.ready_state
+
+
+def test_adaptive_timeout_uses_initial_until_enough_samples():
+    wait = AdaptiveTimeout("test", initial=10, minimum=1, maximum=20)
+    for _ in range(5):
+        wait.record(0.5)
+    assert wait.timeout == 10
+
+
+def test_adaptive_timeout_follows_latency_percentile():
+    wait = AdaptiveTimeout("test", initial=10, minimum=1, maximum=20)
+    for latency in [1] * 19 + [3]:
+        wait.record(latency)
+    assert wait.latency_percentile() == 1
+    assert wait.timeout == 2
+
+    for _ in range(20):
+        wait.record(50)
+    assert wait.timeout == 20
+
+
+def test_adaptive_timeout_records_latency_and_timeouts():
+    wait = AdaptiveTimeout("test", initial=0.2, minimum=0.1, maximum=1)
+
+    assert wait.until(FakePage(), lambda driver: "ready") == "ready"
+    with pytest.raises(TimeoutException):
+        wait.until(FakePage(), lambda driver: False)
+
+    assert len(wait._samples) == 2
+    assert wait._samples[-1] == 0.2
+
+
+@pytest.mark.parametrize(
+    "page, state",
+    [
+        (FakePage(selectors=[AVAILABLE_LISTING_SELECTOR]), AVAILABLE),
+        (FakePage(url="https://crautos.com/autosusados/"), EXITED),
+        (FakePage(ready_state="complete"), EXITED),
+        (FakePage(ready_state="interactive"), False),
+        (FakePage(ready_state="complete", selectors=[VEHICLE_HEADER_SELECTOR]), False),
+    ],
+)
+def test_listing_state(page, state):
+    assert listing_state(page) == state
+
+
+def test_scroll_settled_returns_new_height_or_settles_when_idle():
+    page = FakePage(ready_state="complete", height=1000)
+    condition = scroll_settled(1000, quiet_period=0.05)
+
+    assert condition(page) is False
+    time.sleep(0.06)
+    assert condition(page) == 1000
+
+    page.height = 1500
+    assert scroll_settled(1000)(page) == 1500
@@ -0,0 +1,109 @@
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from work_queue import CANCELLED, DONE, FAILED, PENDING, WorkQueue
+
+
+def test_claim_complete_and_ack_results(tmp_path):
+    work_queue = WorkQueue(str(tmp_path / "queue.sqlite3"))
+    assert work_queue.put("page", [1, 2]) == 2
+    assert work_queue.put("page", [2]) == 0
+
+    task = work_queue.claim("worker-1")
+    assert (task.kind, task.payload, task.attempts) == ("page", "1", 1)
+
+    work_queue.complete(task, [("links", {"page": 1, "links": ["a", "b"]})])
+
+    results = work_queue.peek_results()
+    assert [(result.kind, result.data) for result in results] == [
+        ("links", {"page": 1, "links": ["a", "b"]})
+    ]
+    # Sin confirmar, los resultados siguen en la cola
+    assert WorkQueue(str(tmp_path / "queue.sqlite3")).peek_results() == results
+    work_queue.ack_results(results)
+    assert work_queue.peek_results() == []
+    assert work_queue.counts() == {DONE: 1, PENDING: 1}
+    assert not work_queue.is_drained()
+
+
+def test_failed_task_is_retried_until_max_attempts(tmp_path):
+    work_queue = WorkQueue(str(tmp_path / "queue.sqlite3"), max_attempts=2)
+    work_queue.put("vehicle", ["https://crautos.com/1"])
+
+    work_queue.fail(work_queue.claim("worker-1"), "timeout")
+    task = work_queue.claim("worker-2")
+    assert task.attempts == 2
+
+    work_queue.fail(task, "timeout")
+    assert work_queue.claim("worker-3") is None
+    assert work_queue.payloads("vehicle", FAILED) == ["https://crautos.com/1"]
+    assert work_queue.is_drained()
+
+
+def test_expired_lease_is_claimed_again(tmp_path):
+    work_queue = WorkQueue(str(tmp_path / "queue.sqlite3"), lease_seconds=0.05)
+    work_queue.put("page", [1])
+
+    assert work_queue.claim("worker-1").payload == "1"
+    assert work_queue.claim("worker-2") is None
+
+    time.sleep(0.1)
+    assert work_queue.claim("worker-2").payload == "1"
+
+
+def test_cancel_and_seen_payloads(tmp_path):
+    work_queue = WorkQueue(str(tmp_path / "queue.sqlite3"))
+    work_queue.put("page", range(1, 6))
+    work_queue.cancel("page", range(4, 6))
+    work_queue.put("seen", ["a", "b"], status=DONE)
+
+    assert work_queue.counts() == {PENDING: 3, CANCELLED: 2, DONE: 2}
+    assert sorted(work_queue.payloads("seen")) == ["a", "b"]
+
+
+def test_concurrent_workers_claim_each_task_once(tmp_path):
+    path = str(tmp_path / "queue.sqlite3")
+    WorkQueue(path).put("page", range(1, 101))
+    claimed = []
+    lock = threading.Lock()
+
+    def worker(name):
+        # Cada worker abre su propia cola, como lo haría otro proceso
+        work_queue = WorkQueue(path)
+        while True:
+            task = work_queue.claim(name)
+            if task is None:
+                break
+            work_queue.complete(task, [("page", int(task.payload))])
+            with lock:
+                claimed.append(int(task.payload))
+        work_queue.close()
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    work_queue = WorkQueue(path)
+    assert sorted(claimed) == list(range(1, 101))
+    assert sorted(result.data for result in work_queue.peek_results()) == list(
+        range(1, 101)
+    )
+    assert work_queue.is_drained()
+
+
+def test_meta_and_reset(tmp_path):
+    path = str(tmp_path / "queue.sqlite3")
+    work_queue = WorkQueue(path)
+    work_queue.set_meta("brands", ["Audi", "Volvo"])
+    assert work_queue.get_meta("brands") == ["Audi", "Volvo"]
+    assert work_queue.get_meta("missing", 0) == 0
+    work_queue.close()
+
+    WorkQueue.reset(path)
+    assert WorkQueue(path).get_meta("brands") is None
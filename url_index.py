@@ -0,0 +1,48 @@
+import hashlib
+import threading
+
+
+class UrlIndex:
+    """Conjunto de URLs conocidos con búsquedas O(1), compartido entre hilos.
+
+    Con compact=True solo se guarda un hash de 64 bits por URL, lo que
+    reduce la memoria a una fracción a cambio de una probabilidad ínfima
+    de colisión.
+    """
+
+    def __init__(self, urls=(), compact=False):
+        self.compact = compact
+        self._keys = set()
+        self._lock = threading.Lock()
+        self.load(urls)
+
+    def _key(self, url):
+        if not self.compact:
+            return url
+        digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def load(self, urls):
+        keys = {self._key(url) for url in urls}
+        with self._lock:
+            self._keys.update(keys)
+
+    def add(self, url):
+        """Agregar el URL y devolver True si no estaba en el índice."""
+        key = self._key(url)
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            return True
+
+    def discard(self, url):
+        key = self._key(url)
+        with self._lock:
+            self._keys.discard(key)
+
+    def __contains__(self, url):
+        return self._key(url) in self._keys
+
+    def __len__(self):
+        return len(self._keys)
@@ -0,0 +1,324 @@
+import logging
+import re
+from datetime import datetime
+from functools import lru_cache
+
+from bs4 import BeautifulSoup
+
+
+VEHICLE_FIELDS = [
+    "Cilindrada",
+    "Estilo",
+    "# de pasajeros",
+    "Combustible",
+    "Transmisión",
+    "Estado",
+    "Kilometraje",
+    "Color exterior",
+    "Color interior",
+    "# de puertas",
+    "Ya pagó impuestos",
+    "Precio negociable",
+    "Se recibe vehículo",
+    "Provincia",
+    "Fecha de ingreso",
+    "Autonomía",
+    "Batería",
+]
+
+# Busca ¢ seguido de un número, delimitado por un espacio, paréntesis o fin de línea
+COLONES_PRICE_PATTERN = r"¢\s*([\d,]+)(?=\s|\)|$)"
+# Busca $ seguido de un número, delimitado por un espacio, paréntesis o fin de línea
+DOLARES_PRICE_PATTERN = r"\$\s*([\d,]+)(?=\s|\)|$)"
+
+COLONES_PRICE_RE = re.compile(COLONES_PRICE_PATTERN)
+DOLARES_PRICE_RE = re.compile(DOLARES_PRICE_PATTERN)
+# Ambas monedas en una sola búsqueda: el grupo 1 es el símbolo
+PRICE_RE = re.compile(r"([¢$])\s*([\d,]+)(?=\s|\)|$)")
+
+MIN_YEAR = 1900
+MAX_YEAR = 2050
+
+# Analizadores de BeautifulSoup; lxml es opcional y más rápido
+HTML_PARSER = "html.parser"
+LXML_PARSER = "lxml"
+
+logger = logging.getLogger(__name__)
+
+
+def parse_vehicle_html(html, brands, features=HTML_PARSER):
+    """Extraer encabezado y campos de una página de detalle en una sola pasada."""
+    soup = BeautifulSoup(html, features)
+    vehicle_details = {}
+
+    header_element = soup.select_one(".carheader")
+    if header_element is None:
+        logger.error("Header element not found in HTML.")
+    else:
+        vehicle_details.update(parse_header_element(header_element, brands))
+
+    vehicle_details.update(parse_fields_table(soup))
+
+    return vehicle_details
+
+
+def parse_header_element(header_element, brands):
+    h1_texts = []
+    h3_texts = []
+    for element in header_element.find_all(["h1", "h3"]):
+        if element.name == "h1":
+            h1_texts.append(element_text(element))
+        else:
+            h3_texts.append(element_text(element))
+
+    return get_header_parser(brands).parse(h1_texts, h3_texts)
+
+
+# Llave del trie que marca el final de una marca; nunca choca con un carácter
+_BRAND_END = ""
+
+
+class BrandTrie:
+    """Trie de las marcas para encontrar la marca más larga al inicio de un texto."""
+
+    def __init__(self, brands):
+        self._root = {}
+        for brand in brands:
+            node = self._root
+            for character in brand:
+                node = node.setdefault(character, {})
+            node[_BRAND_END] = brand
+
+    def longest_prefix(self, text):
+        node = self._root
+        match = None
+        for character in text:
+            node = node.get(character)
+            if node is None:
+                break
+            match = node.get(_BRAND_END, match)
+        return match
+
+
+class HeaderParser:
+    """Extrae marca, modelo, año y precios del encabezado de un vehículo.
+
+    El trie de marcas se construye una sola vez por lista de marcas; cada
+    encabezado se resuelve con un recorrido del título y una búsqueda de
+    precios por texto.
+    """
+
+    def __init__(self, brands):
+        self.brands = tuple(brands)
+        self.trie = BrandTrie(self.brands)
+
+    def parse(self, h1_texts, h3_texts=()):
+        vehicle_details = self.parse_title(h1_texts[0].strip()) if h1_texts else {}
+
+        # Mismo orden que el navegador: primero los h1 y luego los h3
+        vehicle_details.update(self.parse_prices([*h1_texts, *h3_texts]))
+        return vehicle_details
+
+    def parse_title(self, brand_model_year):
+        brand = self.trie.longest_prefix(brand_model_year)
+        if brand is None:
+            return {}
+
+        vehicle_details = {"Marca": brand}
+        year = find_year(brand_model_year)
+        if year is not None:
+            vehicle_details["Año"] = year
+            # El modelo es el texto restante después de quitar marca y año
+            remaining_text = brand_model_year[len(brand) :].strip()
+            vehicle_details["Modelo"] = remaining_text.replace(year, "").strip()
+        return vehicle_details
+
+    @staticmethod
+    def parse_prices(price_texts):
+        lowest = {}
+        for text in price_texts:
+            for symbol, amount in PRICE_RE.findall(text.strip()):
+                price = int(amount.replace(",", ""))
+                if symbol not in lowest or price < lowest[symbol]:
+                    lowest[symbol] = price
+
+        vehicle_details = {}
+        if "¢" in lowest:
+            vehicle_details["PrecioColones"] = lowest["¢"]
+        if "$" in lowest:
+            vehicle_details["PrecioDolares"] = lowest["$"]
+        return vehicle_details
+
+
+def get_header_parser(brands):
+    return _header_parser(tuple(brands))
+
+
+@lru_cache(maxsize=8)
+def _header_parser(brands):
+    return HeaderParser(brands)
+
+
+def find_year(text):
+    for word in text.split():
+        if word.isdigit() and MIN_YEAR <= int(word) <= MAX_YEAR:
+            return word
+    return None
+
+
+def parse_fields_table(soup):
+    vehicle_details = dict.fromkeys(VEHICLE_FIELDS)
+    pending_fields = list(VEHICLE_FIELDS)
+
+    for cell in soup.find_all("td"):
+        if not pending_fields:
+            break
+
+        # Igual que contains(text(), ...): solo el primer nodo de texto de la celda
+        label = next(cell.strings, "")
+        # Iterar sobre una copia: una celda puede completar varios campos
+        for field in list(pending_fields):
+            if field in label:
+                value = cell.find_next_sibling("td")
+                vehicle_details[field] = element_text(value) if value else None
+                pending_fields.remove(field)
+
+    return vehicle_details
+
+
+def parse_brand_model_year(brand_model_year, brands):
+    return get_header_parser(brands).parse_title(brand_model_year)
+
+
+def parse_card_prices(card_texts):
+    """Precios de la tarjeta de un vehículo en la página de resultados."""
+    return {
+        "PrecioColones": find_price_colones(card_texts),
+        "PrecioDolares": find_price_dolares(card_texts),
+    }
+
+
+def find_price_colones(price_texts):
+    colones_prices = []
+    for text in price_texts:
+        text = text.strip()
+        matches = COLONES_PRICE_RE.findall(text)
+
+        for match in matches:
+            try:
+                # Convertir el precio encontrado a un número entero
+                colones_price = int(match.replace(",", ""))  # Eliminar comas
+                colones_prices.append(colones_price)
+                logger.info(f"Found colones price: {colones_price}")
+            except ValueError as e:
+                logger.error(f"Error converting price to int: {e}")
+
+    # Si hay precios en colones, devolver el más bajo
+    if colones_prices:
+        min_price = min(colones_prices)
+        logger.info(f"Lowest colones price found: {min_price}")
+        return min_price
+    else:
+        logger.warning("No colones prices found.")
+        return None
+
+
+def find_price_dolares(price_texts):
+    dolares_prices = []
+    for text in price_texts:
+        text = text.strip()
+        matches = DOLARES_PRICE_RE.findall(text)
+
+        for match in matches:
+            # Convertir el precio encontrado a un número entero
+            dolares_price = int(match.replace(",", ""))  # Eliminar comas
+            dolares_prices.append(dolares_price)
+            logger.info(f"Found dollar price: {dolares_price}")
+
+    # Si hay precios en dólares, devolver el más bajo
+    if dolares_prices:
+        min_price = min(dolares_prices)
+        logger.info(f"Lowest dollar price found: {min_price}")
+        return min_price
+
+    logger.warning("No dollar prices found.")
+    return None
+
+
+def element_text(element):
+    # Normalizar espacios como lo hace el texto visible del navegador
+    return " ".join(element.get_text().split())
+
+
+def reformat_vehicle_details(vehicle_details):
+    # Reformatear Cilindrada
+    logger.info(f"Reformating Vehicle details: {vehicle_details}")
+
+    if "Cilindrada" in vehicle_details and vehicle_details["Cilindrada"] is not None:
+        logger.info("Reformating engine Capacity")
+        vehicle_details["Cilindrada"] = vehicle_details["Cilindrada"].replace(" cc", "")
+
+    # Reformatear Fecha de ingreso
+    if "Fecha de ingreso" in vehicle_details:
+        logger.info("Reformating DateEntered")
+        date_str = vehicle_details["Fecha de ingreso"]
+        # Convertir a formato de fecha
+        try:
+            # Intenta convertir la fecha en el formato actual
+            date_object = datetime.strptime(date_str, "%d de %B del %Y")
+            # Reformatea a 'YYYY-MM-DD' que es el formato estándar para SQL
+            vehicle_details["Fecha de ingreso"] = date_object.strftime("%Y-%m-%d")
+        except ValueError:
+            print(f"Date format error for: {date_str}")
+            # Si hay un error, asigna None o un valor predeterminado
+            vehicle_details["Fecha de ingreso"] = None
+
+    # Reformatear Kilometraje
+
+    if "Kilometraje" in vehicle_details:
+        logger.info("Reformating Mileage")
+        mileage_value = re.search(
+            r"([\d,]+)\s*(kms|millas)", vehicle_details["Kilometraje"], re.IGNORECASE
+        )
+
+        if mileage_value:
+            try:
+                # Convertir a entero, manejando posibles errores
+                mileage = int(mileage_value.group(1).replace(",", ""))
+                if "millas" in mileage_value.group(2).lower():  # Si está en millas
+                    mileage = int(mileage * 1.60934)  # Convertir millas a kilómetros
+                vehicle_details["Kilometraje"] = mileage  # Guardar en kilómetros
+            except ValueError:
+                print(f"Invalid mileage value: {vehicle_details['Kilometraje']}")
+                vehicle_details["Kilometraje"] = (
+                    None  # O asignar un valor predeterminado
+                )
+        else:
+            print(f"Kilometraje format error: {vehicle_details['Kilometraje']}")
+            vehicle_details["Kilometraje"] = None  # O asignar un valor predeterminado
+
+    if "Autonomía" in vehicle_details and vehicle_details["Autonomía"] is not None:
+        logger.info("Reformating Autonomy")
+        autonomy_value = re.search(
+            r"([\d,]+)\s*(kms|millas)", vehicle_details["Autonomía"], re.IGNORECASE
+        )
+
+        if autonomy_value:
+            try:
+                # Convertir a entero, manejando posibles errores
+                autonomy = int(autonomy_value.group(1).replace(",", ""))
+                if "millas" in autonomy_value.group(2).lower():  # Si está en millas
+                    autonomy = int(autonomy * 1.60934)  # Convertir millas a kilómetros
+                vehicle_details["Autonomía"] = autonomy  # Guardar en kilómetros
+            except ValueError:
+                print(f"Invalid autonomy value: {vehicle_details['Autonomía']}")
+                vehicle_details["Autonomía"] = None  # O asignar un valor predeterminado
+        else:
+            print(f"Autonomy format error: {vehicle_details['Autonomía']}")
+            vehicle_details["Autonomía"] = None  # O asignar un valor predeterminado
+
+    if "Batería" in vehicle_details and vehicle_details["Batería"] is not None:
+        logger.info("Reformating Battery")
+        vehicle_details["Batería"] = vehicle_details["Batería"].replace(" kWh", "")
+
+    return vehicle_details
@@ -0,0 +1,171 @@
+import logging
+import math
+import threading
+import time
+from collections import deque
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from listing_status import AVAILABLE, EXITED
+
+logger = logging.getLogger(__name__)
+
+POLL_FREQUENCY = 0.1
+
+# Muestras de latencia que se conservan para calcular el percentil
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 10
+
+# La pestaña "Información" solo existe mientras el anuncio está publicado
+AVAILABLE_LISTING_SELECTOR = (
+    "a[href='#tab-1'].active[data-bs-toggle='tab']" "[aria-selected='true'][role='tab']"
+)
+VEHICLE_HEADER_SELECTOR = ".carheader"
+VEHICLE_DETAIL_PATH = "cardetail"
+
+
+class AdaptiveTimeout:
+    """Timeout de espera calculado a partir de las latencias observadas.
+
+    Mientras no haya suficientes muestras se usa initial. Después, el
+    timeout es el percentil indicado de las últimas latencias multiplicado
+    por factor, acotado entre minimum y maximum.
+    """
+
+    def __init__(
+        self,
+        name,
+        initial,
+        minimum,
+        maximum,
+        percentile=0.95,
+        factor=2.0,
+        window=LATENCY_WINDOW,
+    ):
+        self.name = name
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.percentile = percentile
+        self.factor = factor
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def latency_percentile(self):
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        index = max(math.ceil(self.percentile * len(samples)) - 1, 0)
+        return samples[index]
+
+    @property
+    def timeout(self):
+        latency = self.latency_percentile()
+        if latency is None:
+            return self.initial
+        return min(max(latency * self.factor, self.minimum), self.maximum)
+
+    def until(self, driver, condition, message=""):
+        """Esperar a que condition devuelva un valor verdadero y registrar la latencia."""
+        timeout = self.timeout
+        start = time.monotonic()
+        try:
+            result = WebDriverWait(
+                driver, timeout, poll_frequency=POLL_FREQUENCY
+            ).until(condition, message)
+        except TimeoutException:
+            # Una espera agotada también cuenta, para que el timeout crezca si
+            # el sitio se pone lento
+            self.record(timeout)
+            logger.debug(f"{self.name} wait timed out after {timeout:.1f}s.")
+            raise
+        self.record(time.monotonic() - start)
+        return result
+
+
+PAGINATION_WAIT = AdaptiveTimeout("pagination", initial=10, minimum=2, maximum=30)
+RESULTS_WAIT = AdaptiveTimeout("results", initial=10, minimum=2, maximum=30)
+VEHICLE_DETAIL_WAIT = AdaptiveTimeout(
+    "vehicle_detail", initial=5, minimum=1, maximum=15
+)
+LISTING_STATE_WAIT = AdaptiveTimeout("listing_state", initial=5, minimum=1, maximum=15)
+SEARCH_WAIT = AdaptiveTimeout("search", initial=30, minimum=5, maximum=120)
+SCROLL_WAIT = AdaptiveTimeout("scroll", initial=1, minimum=0.2, maximum=3)
+
+
+class network_idle:
+    """Condición que se cumple cuando la página terminó de cargar y no pidió
+    recursos nuevos durante quiet_period segundos."""
+
+    def __init__(self, quiet_period=0.5):
+        self.quiet_period = quiet_period
+        self._resources = None
+        self._since = None
+
+    def __call__(self, driver):
+        resources = driver.execute_script(
+            "return document.readyState === 'complete'"
+            " ? performance.getEntriesByType('resource').length : -1"
+        )
+        now = time.monotonic()
+        if resources < 0 or resources != self._resources:
+            self._resources = resources
+            self._since = now
+            return False
+        return now - self._since >= self.quiet_period
+
+
+class scroll_settled:
+    """Condición para desplazamientos con carga diferida: devuelve la nueva
+    altura de la página si creció, o la altura anterior si la red quedó
+    inactiva sin que llegara contenido nuevo."""
+
+    def __init__(self, previous_height, quiet_period=0.3):
+        self.previous_height = previous_height
+        self._network_idle = network_idle(quiet_period)
+
+    def __call__(self, driver):
+        height = driver.execute_script("return document.body.scrollHeight")
+        if height != self.previous_height:
+            return height
+        if self._network_idle(driver):
+            return self.previous_height
+        return False
+
+
+def listing_state(driver):
+    """Devolver AVAILABLE o EXITED en cuanto la página del anuncio lo indique.
+
+    Se da el anuncio por retirado sin esperar el timeout completo si el
+    sitio redirigió fuera del detalle del vehículo o si la página terminó
+    de cargar sin el encabezado del vehículo.
+    """
+    if driver.find_elements(By.CSS_SELECTOR, AVAILABLE_LISTING_SELECTOR):
+        return AVAILABLE
+    if VEHICLE_DETAIL_PATH not in driver.current_url:
+        return EXITED
+    if driver.execute_script(
+        "return document.readyState"
+    ) == "complete" and not driver.find_elements(
+        By.CSS_SELECTOR, VEHICLE_HEADER_SELECTOR
+    ):
+        return EXITED
+    return False
+
+
+def vehicle_page_state(driver):
+    """Esperar el encabezado del vehículo o detectar que el anuncio no existe."""
+    if driver.find_elements(By.CSS_SELECTOR, VEHICLE_HEADER_SELECTOR):
+        return AVAILABLE
+    if VEHICLE_DETAIL_PATH not in driver.current_url:
+        return EXITED
+    if driver.execute_script("return document.readyState") == "complete":
+        return EXITED
+    return False
@@ -0,0 +1,247 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Segundos que un worker tiene para terminar una tarea antes de que se le
+# entregue a otro (por ejemplo si el proceso murió)
+TASK_LEASE_SECONDS = 300
+TASK_MAX_ATTEMPTS = 3
+
+Task = namedtuple("Task", ["id", "kind", "payload", "attempts"])
+Result = namedtuple("Result", ["id", "task_id", "kind", "data"])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    worker TEXT,
+    error TEXT,
+    UNIQUE (kind, payload)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, id);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class WorkQueue:
+    """Cola de tareas en un archivo SQLite compartida entre procesos.
+
+    Un coordinador encola tareas (páginas de resultados o URLs de vehículos)
+    y los workers, en este u otros procesos, las reclaman con un lease,
+    las procesan y devuelven los resultados en la misma transacción en que
+    marcan la tarea como terminada. El coordinador borra cada resultado solo
+    después de guardarlo.
+    """
+
+    def __init__(
+        self,
+        path,
+        lease_seconds=TASK_LEASE_SECONDS,
+        max_attempts=TASK_MAX_ATTEMPTS,
+    ):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self):
+        # sqlite3 no permite compartir una conexión entre hilos
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        connection = self._connection()
+        # IMMEDIATE toma el bloqueo de escritura desde el inicio para que dos
+        # workers no reclamen la misma tarea
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def put(self, kind, payloads, status=PENDING):
+        """Encolar tareas; las que ya existían con el mismo payload se ignoran.
+
+        Con status=DONE solo se registra el payload, por ejemplo para
+        recordar elementos ya vistos si el recorrido se reanuda.
+        """
+        with self._transaction() as connection:
+            cursor = connection.executemany(
+                "INSERT OR IGNORE INTO tasks (kind, payload, status) VALUES (?, ?, ?)",
+                [(kind, str(payload), status) for payload in payloads],
+            )
+            return cursor.rowcount
+
+    def claim(self, worker, kinds=None):
+        """Reclamar la siguiente tarea pendiente o con el lease vencido."""
+        now = time.time()
+        query = (
+            "SELECT id, kind, payload, attempts FROM tasks "
+            "WHERE (status = ? OR (status = ? AND lease_until < ?))"
+        )
+        params = [PENDING, LEASED, now]
+        if kinds:
+            query += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        query += " ORDER BY id LIMIT 1"
+
+        with self._transaction() as connection:
+            row = connection.execute(query, params).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE tasks SET status = ?, lease_until = ?, worker = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (LEASED, now + self.lease_seconds, worker, row[0]),
+            )
+        return Task(row[0], row[1], row[2], row[3] + 1)
+
+    def complete(self, task, results=()):
+        """Marcar la tarea como terminada y guardar sus resultados (kind, data)."""
+        with self._transaction() as connection:
+            connection.executemany(
+                "INSERT INTO results (task_id, kind, data) VALUES (?, ?, ?)",
+                [
+                    (task.id, kind, json.dumps(data, ensure_ascii=False))
+                    for kind, data in results
+                ],
+            )
+            connection.execute(
+                "UPDATE tasks SET status = ?, lease_until = NULL WHERE id = ?",
+                (DONE, task.id),
+            )
+
+    def fail(self, task, error):
+        """Devolver la tarea a la cola o descartarla si agotó sus intentos."""
+        status = FAILED if task.attempts >= self.max_attempts else PENDING
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE tasks SET status = ?, lease_until = NULL, error = ? "
+                "WHERE id = ?",
+                (status, str(error), task.id),
+            )
+        if status == FAILED:
+            logger.error(
+                f"Giving up on {task.kind} task {task.payload} "
+                f"after {task.attempts} attempts: {error}"
+            )
+
+    def cancel(self, kind, payloads):
+        with self._transaction() as connection:
+            connection.executemany(
+                "UPDATE tasks SET status = ? "
+                "WHERE kind = ? AND payload = ? AND status = ?",
+                [(CANCELLED, kind, str(payload), PENDING) for payload in payloads],
+            )
+
+    def peek_results(self, limit=500):
+        """Leer los resultados más antiguos sin sacarlos de la cola.
+
+        Siguen en la cola hasta ack_results: si el coordinador se cae antes de
+        guardarlos, la siguiente ejecución los vuelve a leer.
+        """
+        rows = (
+            self._connection()
+            .execute(
+                "SELECT id, task_id, kind, data FROM results ORDER BY id LIMIT ?",
+                (limit,),
+            )
+            .fetchall()
+        )
+        return [
+            Result(row_id, task_id, kind, json.loads(data))
+            for row_id, task_id, kind, data in rows
+        ]
+
+    def ack_results(self, results):
+        """Borrar los resultados ya guardados."""
+        if not results:
+            return
+        with self._transaction() as connection:
+            connection.executemany(
+                "DELETE FROM results WHERE id = ?",
+                [(result.id,) for result in results],
+            )
+
+    def counts(self):
+        rows = self._connection().execute(
+            "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+        )
+        return dict(rows.fetchall())
+
+    def payloads(self, kind, status=None):
+        query = "SELECT payload FROM tasks WHERE kind = ?"
+        params = [kind]
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        return [row[0] for row in self._connection().execute(query, params)]
+
+    def is_drained(self):
+        """True si no quedan tareas pendientes ni en proceso."""
+        counts = self.counts()
+        return not counts.get(PENDING) and not counts.get(LEASED)
+
+    def set_meta(self, key, value):
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                (key, json.dumps(value, ensure_ascii=False)),
+            )
+
+    def get_meta(self, key, default=None):
+        row = (
+            self._connection()
+            .execute("SELECT value FROM meta WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return default if row is None else json.loads(row[0])
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    @classmethod
+    def reset(cls, path):
+        """Borrar una cola anterior para empezar un recorrido nuevo."""
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)